@@ -1,27 +1,23 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import List, Sequence
+from typing import List, Optional, Sequence
 
 import random
 
+import numpy as np
+
+from .sampling import Sampler, cumulative_choice
+
+# plain cumulative-sum draws, no timing
+_DEFAULT_SAMPLER = Sampler()
+
 @dataclass
 class AntResult:
     tour: List[int]
     length: float
 
 def _roulette_choice(items: Sequence[int], weights: Sequence[float]) -> int:
-    total = 0.0
-    for w in weights:
-        total += w
-    if total <= 0.0:
-        return random.choice(list(items))
-    r = random.random() * total
-    acc = 0.0
-    for item, w in zip(items, weights):
-        acc += w
-        if r <= acc:
-            return item
-    return items[-1]
+    return cumulative_choice(items, weights)
 
 def construct_tour(
     n: int,
@@ -30,7 +26,12 @@ def construct_tour(
     alpha: float,
     beta: float,
     p_random: float,
+    candidate_lists: Optional[Sequence[Sequence[int]]] = None,
+    q0: float = 0.0,
+    sampler: Optional[Sampler] = None,
 ) -> List[int]:
+    pick = sampler.roulette if sampler is not None else _roulette_choice
+    counting = sampler is not None and sampler.timed
     start = random.randrange(n)
     tour = [start]
     visited = [False] * n
@@ -38,9 +39,17 @@ def construct_tour(
 
     while len(tour) < n:
         i = tour[-1]
-        candidates = [j for j in range(n) if not visited[j]]
+        candidates: List[int] = []
+        if candidate_lists is not None:
+            candidates = [j for j in candidate_lists[i] if not visited[j]]
+        if not candidates:
+            if counting and candidate_lists is not None:
+                sampler.candidate_misses += 1
+            candidates = [j for j in range(n) if not visited[j]]
 
         if p_random > 0.0 and random.random() < p_random:
+            if counting:
+                sampler.random_moves += 1
             nxt = random.choice(candidates)
             tour.append(nxt)
             visited[nxt] = True
@@ -53,8 +62,133 @@ def construct_tour(
             w = (pher[i][j] ** alpha) * (inv_d ** beta)
             weights.append(w)
 
-        nxt = _roulette_choice(candidates, weights)
+        if q0 > 0.0 and random.random() < q0:
+            # ACS pseudo-random-proportional rule: exploit the best edge
+            nxt = candidates[max(range(len(weights)), key=weights.__getitem__)]
+        else:
+            nxt = pick(candidates, weights)
         tour.append(nxt)
         visited[nxt] = True
 
-    return tour
\ No newline at end of file
+    return tour
+
+def _next_city(
+    i: int,
+    choice: np.ndarray,
+    unvisited: np.ndarray,
+    p_random: float,
+    rng: np.random.Generator,
+    cand: Optional[np.ndarray],
+    cand_choice: Optional[np.ndarray],
+    q0: float,
+    n_free: int,
+    sampler: Sampler,
+) -> int:
+    random_move = p_random > 0.0 and rng.random() < p_random
+    greedy = not random_move and q0 > 0.0 and rng.random() < q0
+    if random_move and sampler.timed:
+        sampler.random_moves += 1
+
+    if cand is not None:
+        row = cand[i]
+        mask = unvisited[row]
+        if mask.any():
+            if random_move:
+                weights = mask.astype(np.float64)
+            else:
+                weights = cand_choice[i] * mask
+            if greedy and weights.max() > 0.0:
+                return int(row[np.argmax(weights)])
+            return int(row[sampler.choice(weights, mask, rng)])
+        if sampler.timed:
+            sampler.candidate_misses += 1
+
+    if random_move:
+        free = np.flatnonzero(unvisited)
+        return int(free[rng.integers(len(free))])
+    if greedy:
+        weights = choice[i] * unvisited
+        if weights.max() > 0.0:
+            return int(np.argmax(weights))
+        return sampler.choice(weights, unvisited, rng)
+    return sampler.row_choice(i, choice[i], unvisited, n_free, rng)
+
+def construct_tour_np(
+    n: int,
+    choice: np.ndarray,
+    p_random: float,
+    rng: np.random.Generator,
+    cand: Optional[np.ndarray] = None,
+    cand_choice: Optional[np.ndarray] = None,
+    q0: float = 0.0,
+    sampler: Optional[Sampler] = None,
+) -> List[int]:
+    # choice[i][j] = tau_ij^alpha * eta_ij^beta, precomputed once per iteration
+    # (or a RowCache building the rows on demand for compact problems);
+    # cand_choice[i][k] is the same value for the edge (i, cand[i][k])
+    start = int(rng.integers(n))
+    tour = [start]
+    unvisited = np.ones(n, dtype=bool)
+    unvisited[start] = False
+
+    sampler = sampler if sampler is not None else _DEFAULT_SAMPLER
+    i = start
+    while len(tour) < n:
+        nxt = _next_city(i, choice, unvisited, p_random, rng, cand, cand_choice, q0, n - len(tour), sampler)
+        tour.append(nxt)
+        unvisited[nxt] = False
+        i = nxt
+
+    return tour
+
+def construct_tours_batched(
+    m: int,
+    n: int,
+    choice: np.ndarray,
+    p_random: float,
+    rng: np.random.Generator,
+    cand: Optional[np.ndarray] = None,
+    cand_choice: Optional[np.ndarray] = None,
+    q0: float = 0.0,
+    sampler: Optional[Sampler] = None,
+) -> np.ndarray:
+    # all m ants move in lockstep: one (m, n) masked lookup and one draw per step
+    sampler = sampler if sampler is not None else _DEFAULT_SAMPLER
+    rows = np.arange(m)
+    tours = np.empty((m, n), dtype=np.intp)
+    cur = rng.integers(n, size=m)
+    tours[:, 0] = cur
+    unvisited = np.ones((m, n), dtype=bool)
+    unvisited[rows, cur] = False
+
+    for k in range(1, n):
+        u = rng.random(m)
+        uniform = rng.random(m) < p_random if p_random > 0.0 else np.zeros(m, dtype=bool)
+        greedy = (rng.random(m) < q0) & ~uniform if q0 > 0.0 else np.zeros(m, dtype=bool)
+        if sampler.timed:
+            sampler.random_moves += int(uniform.sum())
+        nxt = np.empty(m, dtype=np.intp)
+        full = np.ones(m, dtype=bool)
+
+        if cand is not None:
+            cc = cand[cur]
+            cmask = unvisited[rows[:, None], cc]
+            hit = cmask.any(axis=1)
+            if hit.any():
+                w = cand_choice[cur[hit]] * cmask[hit]
+                w[uniform[hit]] = cmask[hit][uniform[hit]]
+                nxt[hit] = cc[hit, sampler.rows(w, cmask[hit], u[hit], greedy[hit])]
+            full = ~hit
+            if sampler.timed:
+                sampler.candidate_misses += int(full.sum())
+
+        if full.any():
+            w = choice[cur[full]] * unvisited[full]
+            w[uniform[full]] = unvisited[full][uniform[full]]
+            nxt[full] = sampler.rows(w, unvisited[full], u[full], greedy[full])
+
+        tours[:, k] = nxt
+        unvisited[rows, nxt] = False
+        cur = nxt
+
+    return tours
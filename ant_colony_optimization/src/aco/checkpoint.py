@@ -0,0 +1,112 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import json
+import os
+import threading
+
+import numpy as np
+
+# bump when the set of saved arrays or their meaning changes
+CHECKPOINT_VERSION = 3
+
+def encode(value: Any) -> np.ndarray:
+    # JSON-able values (RNG states, configs) are stored as 0-d unicode arrays
+    return np.array(json.dumps(value))
+
+def decode(value: np.ndarray) -> Any:
+    return json.loads(str(value))
+
+def save_checkpoint(path: str | Path, state: Dict[str, np.ndarray]) -> None:
+    # written next to the target and moved into place, so a crash never leaves a torn file
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with tmp.open("wb") as f:
+        np.savez(f, version=np.array(CHECKPOINT_VERSION), **state)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def load_checkpoint(path: str | Path) -> Dict[str, np.ndarray]:
+    with np.load(Path(path), allow_pickle=False) as data:
+        state = {key: data[key] for key in data.files}
+    if int(state.pop("version")) != CHECKPOINT_VERSION:
+        raise ValueError(f"unsupported checkpoint version in {path}")
+    return state
+
+class CheckpointWriter:
+    # writes snapshots on a background thread; a snapshot submitted while the previous one is
+    # still being written replaces any snapshot that is waiting, so the solver never blocks.
+    # Arrays named in copies are copied into buffers owned by the writer (one, or two while a
+    # write is in progress), so large arrays are not reallocated for every snapshot
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._cond = threading.Condition()
+        self._pending: Optional[Dict[str, np.ndarray]] = None
+        self._writing: Optional[Dict[str, np.ndarray]] = None
+        self._buffers: Dict[str, List[np.ndarray]] = {}
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="aco-checkpoint", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._pending is None:
+                    return
+                self._writing, self._pending = self._pending, None
+            try:
+                save_checkpoint(self.path, self._writing)
+            except BaseException as e:
+                self._error = e
+            finally:
+                with self._cond:
+                    self._writing = None
+                    self._cond.notify_all()
+
+    def _buffer(self, name: str, like: np.ndarray) -> np.ndarray:
+        # any buffer the snapshot being written does not use; called with the lock held
+        busy = self._writing.get(name) if self._writing is not None else None
+        buffers = self._buffers.setdefault(name, [])
+        for i, buf in enumerate(buffers):
+            if buf is busy:
+                continue
+            if buf.shape != like.shape or buf.dtype != like.dtype:
+                buf = buffers[i] = np.empty_like(like)
+            return buf
+        buf = np.empty_like(like)
+        buffers.append(buf)
+        return buf
+
+    def submit(self, state: Dict[str, np.ndarray], copies: Tuple[str, ...] = ()) -> None:
+        if self._error is not None:
+            raise self._error
+        with self._cond:
+            # a waiting snapshot is dropped, which frees its buffers
+            self._pending = None
+            state = dict(state)
+            for name in copies:
+                buf = self._buffer(name, state[name])
+                np.copyto(buf, state[name])
+                state[name] = buf
+            self._pending = state
+            self._cond.notify_all()
+
+    def flush(self) -> None:
+        with self._cond:
+            while self._pending is not None or self._writing is not None:
+                self._cond.wait()
+        if self._error is not None:
+            raise self._error
+
+    def close(self) -> None:
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
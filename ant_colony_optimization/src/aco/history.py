@@ -0,0 +1,124 @@
+from __future__ import annotations
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .checkpoint import decode, encode
+
+HISTORY_MODES = ("full", "decimate", "reservoir")
+COLUMNS = ("best_length", "iter_best", "iter_mean", "iter_worst")
+
+class History:
+    # per-iteration statistics in preallocated arrays:
+    #   "full"      - every iteration (capacity grows by doubling if the run outlives it)
+    #   "decimate"  - at most max_points rows; when full every other row is dropped and
+    #                 only every stride-th iteration is kept from then on
+    #   "reservoir" - a uniform random sample of max_points iterations (algorithm R)
+    # the most recent iteration is always reported, so the final best length is never lost
+    def __init__(
+        self,
+        capacity: int,
+        mode: str = "full",
+        max_points: int = 0,
+        seed: Optional[int] = None,
+        columns: Sequence[str] = COLUMNS,
+    ):
+        if mode not in HISTORY_MODES:
+            raise ValueError(f"history must be one of {HISTORY_MODES}")
+        if mode != "full" and max_points < 2:
+            raise ValueError("history_points must be at least 2 for a downsampled history")
+        size = max(capacity if mode == "full" else max_points, 1)
+        self.mode = mode
+        self.columns = tuple(columns)
+        self.iters = np.empty(size, dtype=np.int64)
+        self.values = np.empty((size, len(self.columns)), dtype=np.float64)
+        self.size = 0
+        self.count = 0
+        self.stride = 1
+        self.last_iter = 0
+        self.last_row = np.full(len(self.columns), np.nan)
+        # own stream, so downsampling never changes the solver's draws
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _store(self, slot: int, iteration: int, row: np.ndarray) -> None:
+        self.iters[slot] = iteration
+        self.values[slot] = row
+
+    def append(self, iteration: int, row: Sequence[float]) -> None:
+        row = np.asarray(row, dtype=np.float64)
+        self.count += 1
+        self.last_iter = iteration
+        self.last_row = row
+        cap = len(self.iters)
+
+        if self.mode == "full":
+            if self.size == cap:
+                self.iters = np.concatenate([self.iters, np.empty(cap, dtype=np.int64)])
+                self.values = np.concatenate([self.values, np.empty_like(self.values)])
+        elif self.mode == "decimate":
+            if (self.count - 1) % self.stride:
+                return
+            if self.size == cap:
+                kept = (self.size + 1) // 2
+                self.iters[:kept] = self.iters[: self.size : 2]
+                self.values[:kept] = self.values[: self.size : 2]
+                self.size = kept
+                self.stride *= 2
+                if (self.count - 1) % self.stride:
+                    return
+        elif self.size == cap:
+            j = int(self.rng.integers(self.count))
+            if j < cap:
+                self._store(j, iteration, row)
+            return
+
+        self._store(self.size, iteration, row)
+        self.size += 1
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        # (iterations, values) in iteration order
+        iters = self.iters[: self.size]
+        values = self.values[: self.size]
+        if self.mode == "reservoir":
+            order = np.argsort(iters, kind="stable")
+            iters, values = iters[order], values[order]
+        if self.count and (not len(iters) or iters[-1] != self.last_iter):
+            iters = np.append(iters, self.last_iter)
+            values = np.vstack([values, self.last_row])
+        return iters, values
+
+    def column(self, name: str) -> np.ndarray:
+        return self.arrays()[1][:, self.columns.index(name)]
+
+    def as_lists(self) -> Dict[str, List[float]]:
+        iters, values = self.arrays()
+        out: Dict[str, List[float]] = {name: values[:, k].tolist() for k, name in enumerate(self.columns)}
+        out["iters"] = iters.tolist()
+        return out
+
+    def state_dict(self) -> Dict[str, np.ndarray]:
+        return {
+            "history_iters": self.iters[: self.size].copy(),
+            "history_values": self.values[: self.size].copy(),
+            "history_meta": np.array([self.count, self.stride, self.last_iter], dtype=np.int64),
+            "history_last": self.last_row.copy(),
+            "history_rng": encode(self.rng.bit_generator.state),
+        }
+
+    def load_state(self, state: Dict[str, np.ndarray]) -> None:
+        iters, values = state["history_iters"], state["history_values"]
+        size = len(iters)
+        if size > len(self.iters):
+            if self.mode != "full":
+                raise ValueError("checkpoint holds more history rows than history_points")
+            self.iters = np.empty(size, dtype=np.int64)
+            self.values = np.empty((size, len(self.columns)), dtype=np.float64)
+        self.iters[:size] = iters
+        self.values[:size] = values
+        self.size = size
+        self.count, self.stride, self.last_iter = (int(v) for v in state["history_meta"])
+        self.last_row = state["history_last"].copy()
+        self.rng.bit_generator.state = decode(state["history_rng"])
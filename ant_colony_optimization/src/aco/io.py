@@ -1,7 +1,9 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List
+from typing import List, Tuple
+
+import numpy as np
 
 @dataclass(frozen=True)
 class Node:
@@ -25,4 +27,13 @@ def load_nodes(path: str | Path) -> List[Node]:
             x = float(parts[1])
             y = float(parts[2])
             nodes.append(Node(idx=internal_idx, label=label, x=x, y=y))
-    return nodes
\ No newline at end of file
+    return nodes
+
+def load_coords(path: str | Path) -> Tuple[np.ndarray, np.ndarray]:
+    # same "label x y" format as load_nodes, without one Node object per city
+    data = np.loadtxt(path, dtype=np.float64, ndmin=2, encoding="utf-8")
+    if data.shape[1] != 3:
+        raise ValueError(f"Zły format pliku: {path}")
+    labels = data[:, 0].astype(np.int64)
+    xy = np.ascontiguousarray(data[:, 1:])
+    return labels, xy
@@ -0,0 +1,179 @@
+from __future__ import annotations
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import multiprocessing as mp
+import random
+import traceback
+
+import numpy as np
+
+from .parallel import _shared, _shutdown, _view
+from .problem import CompactTSPProblem, TSPProblem
+from .solver import ACOConfig, ACOResult, ACOSolver, pheromone_shape
+
+MIGRATIONS = ("best", "pheromone")
+
+@dataclass
+class IslandResult:
+    # one result per island, in island order
+    results: List[ACOResult]
+    best_island: int
+    exchanges: int
+    # tours adopted from the neighbouring island ("best" migration), per island
+    adopted: List[int]
+
+    @property
+    def best(self) -> ACOResult:
+        return self.results[self.best_island]
+
+def island_configs(cfg: ACOConfig, islands: int) -> List[ACOConfig]:
+    # same parameters, independent seeds spawned from cfg.seed
+    if cfg.seed is None:
+        return [cfg] * islands
+    seeds = np.random.SeedSequence(cfg.seed).spawn(islands)
+    return [replace(cfg, seed=int(s.generate_state(1, np.uint64)[0] >> 1)) for s in seeds]
+
+def _island(
+    idx: int,
+    conn: Any,
+    problem: TSPProblem | CompactTSPProblem,
+    cfg: ACOConfig,
+    migrate_every: int,
+    migration: str,
+    weight: float,
+    exports: Optional[List[Tuple[Any, Tuple[int, ...], str]]],
+) -> None:
+    try:
+        # the python engine draws from the random module, which forked islands would share
+        random.seed(cfg.seed)
+        solver = ACOSolver(problem, cfg)
+        views = None
+        if exports is not None:
+            views = [_view(raw, shape, dtype) for raw, shape, dtype in exports]
+        adopted = 0
+        for stats in solver.iterate():
+            if stats["stop_reason"] is not None or stats["iter"] % migrate_every:
+                continue
+            rnd = stats["iter"] // migrate_every
+            if views is not None:
+                # two slots per island: a neighbour still reading round r never sees round r + 1
+                np.copyto(views[idx][rnd % 2], solver.pher.values())
+            conn.send(("exchange", rnd, solver.best_length, solver.best_tour))
+            msg = conn.recv()
+            if msg is None:
+                continue
+            src, length, tour = msg
+            if views is not None:
+                solver.mix_pheromone(views[src][rnd % 2], weight)
+            elif solver.immigrate(tour, length):
+                adopted += 1
+        conn.send(("done", solver.result(), adopted))
+    except BaseException:
+        conn.send(("error", traceback.format_exc()))
+    finally:
+        conn.close()
+
+class IslandModel:
+    # independent colonies in separate processes; every migrate_every iterations each island
+    # receives the best tour ("best") or a share of the trails ("pheromone") of the previous
+    # island in a ring. Exchanges are synchronous, so seeded runs are reproducible
+    def __init__(
+        self,
+        problem: TSPProblem | CompactTSPProblem,
+        configs: List[ACOConfig],
+        migrate_every: int = 10,
+        migration: str = "best",
+        weight: float = 0.1,
+    ):
+        if len(configs) < 2:
+            raise ValueError("the island model needs at least two islands")
+        if migrate_every < 1:
+            raise ValueError("migrate_every must be at least 1")
+        if migration not in MIGRATIONS:
+            raise ValueError(f"migration must be one of {MIGRATIONS}")
+        if not 0.0 <= weight <= 1.0:
+            raise ValueError("migration weight must be in [0, 1]")
+        for cfg in configs:
+            if cfg.workers > 1:
+                raise ValueError("islands construct in-process; set workers to 0")
+            if cfg.checkpoint_path is not None:
+                raise ValueError("checkpointing is not supported by the island model")
+        if migration == "pheromone" and len({pheromone_shape(problem, cfg.n_candidates) for cfg in configs}) > 1:
+            raise ValueError("pheromone migration needs the same pheromone layout on every island")
+        self.problem = problem
+        self.configs = configs
+        self.migrate_every = migrate_every
+        self.migration = migration
+        self.weight = weight
+
+    def solve(self, on_exchange: Optional[Callable[[int, Dict[int, float]], Any]] = None) -> IslandResult:
+        # on_exchange(round, {island: best length}) is called after every exchange
+        ctx = mp.get_context()
+        p = self.problem
+        k = len(self.configs)
+
+        exports = None
+        if self.migration == "pheromone":
+            shape = (2, *pheromone_shape(p, self.configs[0].n_candidates))
+            exports = [(_shared(ctx, shape, p.dtype)[0], shape, np.dtype(p.dtype).str) for _ in range(k)]
+        problem = p
+        if isinstance(p, CompactTSPProblem):
+            problem = CompactTSPProblem(labels=p.labels, xy=p.xy, cache_rows=p.cache_rows)
+
+        conns: List[Any] = []
+        procs: List[Any] = []
+        try:
+            for idx, cfg in enumerate(self.configs):
+                parent, child = ctx.Pipe()
+                proc = ctx.Process(
+                    target=_island,
+                    args=(idx, child, problem, cfg, self.migrate_every, self.migration, self.weight, exports),
+                    daemon=True,
+                )
+                proc.start()
+                child.close()
+                conns.append(parent)
+                procs.append(proc)
+            results, adopted, exchanges = self._coordinate(conns, on_exchange)
+        except BaseException:
+            for proc in procs:
+                proc.terminate()
+            raise
+        finally:
+            _shutdown(procs, [])
+
+        best = min(range(k), key=lambda i: results[i].best_length)
+        return IslandResult(results=[results[i] for i in range(k)], best_island=best, exchanges=exchanges, adopted=adopted)
+
+    def _coordinate(
+        self, conns: List[Any], on_exchange: Optional[Callable[[int, Dict[int, float]], Any]]
+    ) -> Tuple[Dict[int, ACOResult], List[int], int]:
+        results: Dict[int, ACOResult] = {}
+        adopted = [0] * len(conns)
+        active = list(range(len(conns)))
+        exchanges = 0
+
+        while active:
+            # every active island either reaches the next exchange or finishes
+            offers: Dict[int, Tuple[float, List[int]]] = {}
+            for idx in active:
+                msg = conns[idx].recv()
+                if msg[0] == "error":
+                    raise RuntimeError(f"island {idx} failed:\n{msg[1]}")
+                if msg[0] == "done":
+                    results[idx], adopted[idx] = msg[1], msg[2]
+                else:
+                    rnd = msg[1]
+                    offers[idx] = (msg[2], msg[3])
+            active = sorted(offers)
+            if not active:
+                break
+
+            for pos, idx in enumerate(active):
+                src = active[pos - 1]
+                conns[idx].send(None if src == idx else (src, *offers[src]))
+            exchanges += 1
+            if on_exchange is not None:
+                on_exchange(rnd, {idx: offers[idx][0] for idx in active})
+        return results, adopted, exchanges
@@ -0,0 +1,187 @@
+from __future__ import annotations
+from collections import deque
+from typing import Any, Callable, List, Sequence
+
+import numpy as np
+
+METHODS = ("none", "2opt", "oropt", "2opt+oropt")
+
+_EPS = 1e-9
+
+def _dist_fn(dist: Any) -> Callable[[int, int], float]:
+    # dist: a matrix (ndarray or nested lists) or a callable d(a, b)
+    if callable(dist):
+        return dist
+    if isinstance(dist, np.ndarray):
+        return dist.item
+    return lambda a, b: dist[a][b]
+
+def _positions(tour: List[int]) -> List[int]:
+    pos = [0] * len(tour)
+    for i, c in enumerate(tour):
+        pos[c] = i
+    return pos
+
+def _reverse(tour: List[int], pos: List[int], i: int, j: int) -> None:
+    # reverse tour[i..j] (circular, inclusive); the shorter side is reversed instead when
+    # that is cheaper, which gives the same cycle
+    n = len(tour)
+    length = (j - i) % n + 1
+    if 2 * length > n:
+        i, j = (j + 1) % n, (i - 1) % n
+        length = n - length
+    for _ in range(length // 2):
+        ci, cj = tour[i], tour[j]
+        tour[i], tour[j] = cj, ci
+        pos[cj], pos[ci] = i, j
+        i = (i + 1) % n
+        j = (j - 1) % n
+
+def _move_segment(tour: List[int], pos: List[int], i: int, length: int, g: int, flip: bool) -> None:
+    # move tour[i..i+length-1] (circular) into the gap after position g, reversed when flip;
+    # only the cities on the shorter side between the segment and the gap are shifted
+    n = len(tour)
+    seg = [tour[(i + k) % n] for k in range(length)]
+    if flip:
+        seg.reverse()
+    after = (g - i - length + 1) % n
+    before = (i - 1 - g) % n
+    if after <= before:
+        # tour[i+length..g] moves back over the segment, which is put behind it
+        moved = [tour[(i + length + k) % n] for k in range(after)] + seg
+        step = 1
+    else:
+        # tour[g+1..i-1] moves forward over the segment, which is put in front of it
+        moved = [tour[(i - 1 - k) % n] for k in range(before)] + seg[::-1]
+        i, step = (i + length - 1) % n, -1
+    for city in moved:
+        tour[i] = city
+        pos[city] = i
+        i = (i + step) % n
+
+def two_opt(tour: Sequence[int], dist: Any, neighbors: Sequence[Sequence[int]]) -> List[int]:
+    # 2-opt with neighbour lists and don't-look bits (cities whose bit is off wait in the queue)
+    tour = list(tour)
+    n = len(tour)
+    if n < 4:
+        return tour
+    d = _dist_fn(dist)
+    pos = _positions(tour)
+    queue = deque(tour)
+    queued = [True] * n
+
+    while queue:
+        a = queue.popleft()
+        queued[a] = False
+        for forward in (True, False):
+            pa = pos[a]
+            b = tour[(pa + 1) % n] if forward else tour[pa - 1]
+            d_ab = d(a, b)
+            moved = False
+            for c in neighbors[a]:
+                d_ac = d(a, c)
+                if d_ac >= d_ab:
+                    break
+                pc = pos[c]
+                e = tour[(pc + 1) % n] if forward else tour[pc - 1]
+                if c == b or e == a:
+                    continue
+                delta = d_ac + d(b, e) - d_ab - d(c, e)
+                if delta < -_EPS:
+                    if forward:
+                        # a b ... c e  ->  a c ... b e
+                        _reverse(tour, pos, (pa + 1) % n, pc)
+                    else:
+                        # e c ... b a  ->  e b ... c a
+                        _reverse(tour, pos, pc, (pa - 1) % n)
+                    for city in (a, b, c, e):
+                        if not queued[city]:
+                            queued[city] = True
+                            queue.append(city)
+                    moved = True
+                    break
+            if moved:
+                break
+    return tour
+
+def or_opt(
+    tour: Sequence[int],
+    dist: Any,
+    neighbors: Sequence[Sequence[int]],
+    max_segment: int = 3,
+) -> List[int]:
+    # moves segments of 1..max_segment cities next to one of the nearest neighbours of an end
+    tour = list(tour)
+    n = len(tour)
+    if n < 5:
+        return tour
+    d = _dist_fn(dist)
+    pos = _positions(tour)
+    queue = deque(tour)
+    queued = [True] * n
+
+    while queue:
+        a = queue.popleft()
+        queued[a] = False
+        move = None
+        for seg_len in range(1, min(max_segment, n - 3) + 1):
+            pa = pos[a]
+            seg = [tour[(pa + k) % n] for k in range(seg_len)]
+            first, last = seg[0], seg[-1]
+            p = tour[pa - 1]
+            nx = tour[(pa + seg_len) % n]
+            gain = d(p, first) + d(last, nx) - d(p, nx)
+            if gain <= _EPS:
+                continue
+            for end, other in ((first, last), (last, first)):
+                for c in neighbors[end]:
+                    d_ce = d(c, end)
+                    if d_ce >= gain:
+                        break
+                    if c in seg:
+                        continue
+                    pc = pos[c]
+                    for e in (tour[(pc + 1) % n], tour[pc - 1]):
+                        if e in seg or {c, e} == {p, nx}:
+                            continue
+                        if d_ce + d(other, e) - d(c, e) < gain - _EPS:
+                            move = (seg, end, c, e, p, nx)
+                            break
+                    if move:
+                        break
+                if move:
+                    break
+            if move:
+                break
+
+        if move is None:
+            continue
+        seg, end, c, e, p, nx = move
+        pc = pos[c]
+        # c is followed by end and e by the other end of the segment
+        if tour[(pc + 1) % n] == e:
+            _move_segment(tour, pos, pos[seg[0]], len(seg), pc, end != seg[0])
+        else:
+            _move_segment(tour, pos, pos[seg[0]], len(seg), (pc - 1) % n, end == seg[0])
+        for city in (p, nx, c, e, seg[0], seg[-1]):
+            if not queued[city]:
+                queued[city] = True
+                queue.append(city)
+    return tour
+
+def improve_tour(
+    tour: Sequence[int],
+    dist: Any,
+    neighbors: Sequence[Sequence[int]],
+    method: str,
+) -> List[int]:
+    if method not in METHODS:
+        raise ValueError(f"local search must be one of {METHODS}")
+    tour = list(tour)
+    if method in ("2opt", "2opt+oropt"):
+        tour = two_opt(tour, dist, neighbors)
+    if method in ("oropt", "2opt+oropt"):
+        tour = or_opt(tour, dist, neighbors)
+        if method == "2opt+oropt":
+            tour = two_opt(tour, dist, neighbors)
+    return tour
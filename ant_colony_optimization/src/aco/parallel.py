@@ -0,0 +1,163 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Tuple
+
+import ctypes
+import multiprocessing as mp
+import weakref
+
+import numpy as np
+
+from .ant import construct_tour_np, construct_tours_batched
+from .pheromone import expand_row
+from .problem import CompactTSPProblem, RowCache
+from .sampling import Sampler
+
+def _shared(ctx: Any, shape: Tuple[int, ...], dtype: Any) -> Tuple[Any, np.ndarray]:
+    # lock-free shared buffer, handed to the workers once when they start
+    dtype = np.dtype(dtype)
+    raw = ctx.RawArray(ctypes.c_char, max(1, int(np.prod(shape)) * dtype.itemsize))
+    return raw, _view(raw, shape, dtype)
+
+def _view(raw: Any, shape: Tuple[int, ...], dtype: Any) -> np.ndarray:
+    return np.frombuffer(raw, dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+
+def _worker(
+    wid: int,
+    conn: Any,
+    buffers: Dict[str, Tuple[Any, Tuple[int, ...], str]],
+    settings: Dict[str, Any],
+    problem: Optional[CompactTSPProblem],
+) -> None:
+    arrays = {name: _view(raw, shape, dtype) for name, (raw, shape, dtype) in buffers.items()}
+    n = settings["n"]
+    tours = arrays["tours"]
+    cand = arrays.get("cand")
+    cand_choice = arrays.get("cand_choice")
+    eta = problem.heuristic(settings["beta"]) if problem is not None else None
+    sampler = Sampler(settings["sampler"], timed=settings["profile"])
+
+    while True:
+        msg = conn.recv()
+        if msg is None:
+            break
+        iteration, lo, hi, scale, rest = msg
+        if eta is None:
+            choice = arrays["choice"]
+        else:
+            raw = arrays["pher"]
+            if settings["candidate_pheromone"]:
+                tau = lambda i: expand_row(raw[i], cand[i], rest, n) * scale
+            else:
+                tau = lambda i: raw[i] * scale
+            choice = RowCache(n, lambda i: tau(i) ** settings["alpha"] * eta.row(i), problem.cache_rows)
+
+        # one stream per (seed, iteration, worker): reproducible for a given seed and worker count
+        rng = np.random.default_rng([settings["seed"], iteration, wid])
+        sampler.reset(hi - lo)
+        before = sampler.counters()
+        kwargs = dict(p_random=settings["p_random"], rng=rng, cand=cand, cand_choice=cand_choice, q0=settings["q0"], sampler=sampler)
+        if settings["engine"] == "batched":
+            tours[lo:hi] = construct_tours_batched(m=hi - lo, n=n, choice=choice, **kwargs)
+        else:
+            for a in range(lo, hi):
+                tours[a] = construct_tour_np(n=n, choice=choice, **kwargs)
+        # sampling time and counters of this slice, merged into the parent's sampler
+        conn.send({c: v - before[c] for c, v in sampler.counters().items()})
+    conn.close()
+
+def _shutdown(procs: List[Any], conns: List[Any]) -> None:
+    for conn in conns:
+        try:
+            conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+    for proc in procs:
+        proc.join(timeout=5)
+        if proc.is_alive():
+            proc.terminate()
+
+class ParallelColony:
+    # persistent worker processes, each constructing a fixed slice of the colony
+    # against the choice (or pheromone) matrix held in shared memory
+    def __init__(
+        self,
+        problem: Any,
+        m: int,
+        workers: int,
+        settings: Dict[str, Any],
+        cand: Optional[np.ndarray],
+        pher_shape: Optional[Tuple[int, ...]] = None,
+    ):
+        # pher_shape: layout of the trails shared with the workers of a compact problem
+        # (default: dense n x n)
+        ctx = mp.get_context()
+        n = problem.n
+        self.m = m
+        self.compact = isinstance(problem, CompactTSPProblem)
+        self.slices = [(int(s[0]), int(s[-1]) + 1) for s in np.array_split(np.arange(m), workers) if len(s)]
+
+        buffers: Dict[str, Tuple[Any, Tuple[int, ...], str]] = {}
+        self.arrays: Dict[str, np.ndarray] = {}
+
+        def add(name: str, shape: Tuple[int, ...], dtype: Any) -> None:
+            raw, arr = _shared(ctx, shape, dtype)
+            buffers[name] = (raw, shape, np.dtype(dtype).str)
+            self.arrays[name] = arr
+
+        add("tours", (m, n), np.intp)
+        if self.compact:
+            add("pher", pher_shape or (n, n), problem.dtype)
+        else:
+            add("choice", (n, n), np.float64)
+        if cand is not None:
+            add("cand", cand.shape, np.intp)
+            add("cand_choice", cand.shape, np.float64)
+            self.arrays["cand"][:] = cand
+
+        worker_problem = None
+        if self.compact:
+            worker_problem = CompactTSPProblem(labels=problem.labels, xy=problem.xy, cache_rows=problem.cache_rows)
+
+        self.conns: List[Any] = []
+        self.procs: List[Any] = []
+        for wid in range(len(self.slices)):
+            parent, child = ctx.Pipe()
+            proc = ctx.Process(
+                target=_worker,
+                args=(wid, child, buffers, settings, worker_problem),
+                daemon=True,
+            )
+            proc.start()
+            child.close()
+            self.conns.append(parent)
+            self.procs.append(proc)
+        self._finalizer = weakref.finalize(self, _shutdown, self.procs, self.conns)
+
+    @property
+    def pher_buffer(self) -> Optional[np.ndarray]:
+        return self.arrays.get("pher")
+
+    def construct(
+        self,
+        iteration: int,
+        choice: Optional[np.ndarray],
+        cand_choice: Optional[np.ndarray],
+        scale: float,
+        rest: float = 0.0,
+        sampler: Optional[Sampler] = None,
+    ) -> np.ndarray:
+        # sampler: receives the summed sampling time and counters of the workers
+        if not self.compact:
+            np.copyto(self.arrays["choice"], choice)
+        if cand_choice is not None:
+            np.copyto(self.arrays["cand_choice"], cand_choice)
+        for conn, (lo, hi) in zip(self.conns, self.slices):
+            conn.send((iteration, lo, hi, scale, rest))
+        for conn in self.conns:
+            counters = conn.recv()
+            if sampler is not None:
+                sampler.add(counters)
+        return self.arrays["tours"].copy()
+
+    def close(self) -> None:
+        self._finalizer()
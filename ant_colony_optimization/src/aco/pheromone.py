@@ -0,0 +1,135 @@
+from __future__ import annotations
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+# largest dense n x n pheromone matrix allocated for a compact problem; larger compact
+# problems keep their trails on the candidate edges only (CandidatePheromone)
+DENSE_LIMIT_BYTES = 1 << 30
+
+class PheromoneMatrix:
+    # tau = raw * scale; evaporation only shrinks the global scale factor
+    dense = True
+
+    def __init__(self, n: int, tau0: float, dtype: type = np.float64):
+        self.n = n
+        self.raw = np.full((n, n), tau0, dtype=dtype)
+        self.scale = 1.0
+        # below this factor the scale is folded back into the stored values
+        self.min_scale = float(np.sqrt(np.finfo(dtype).tiny))
+
+    def values(self) -> np.ndarray:
+        return self.raw * self.scale
+
+    def __getitem__(self, i: int) -> np.ndarray:
+        return self.raw[i] * self.scale
+
+    def candidate_values(self, cand: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        # trails of the candidate edges, aligned with cand (or with cand[rows])
+        if rows is None:
+            return np.take_along_axis(self.raw, cand, axis=1) * self.scale
+        return self.raw[rows[:, None], cand[rows]] * self.scale
+
+    def renormalize(self) -> None:
+        self.raw *= self.scale
+        self.scale = 1.0
+
+    def evaporate(self, rho: float) -> None:
+        self.scale *= 1.0 - rho
+        if self.scale < self.min_scale:
+            self.renormalize()
+
+    def reset(self, value: float) -> None:
+        self.raw.fill(value)
+        self.scale = 1.0
+
+    def clamp(self, lo: float, hi: float) -> None:
+        np.clip(self.raw, lo / self.scale, hi / self.scale, out=self.raw)
+
+    def blend(self, tour: Sequence[int], rate: float, target: float) -> None:
+        # tau = (1 - rate) * tau + rate * target on the edges of one closed tour
+        # (ACS local update with target tau0, ACS global update with target Q / L)
+        src = np.asarray(tour, dtype=np.intp)
+        dst = np.roll(src, -1)
+        add = rate * target / self.scale
+        self.raw[src, dst] = (1.0 - rate) * self.raw[src, dst] + add
+        self.raw[dst, src] = (1.0 - rate) * self.raw[dst, src] + add
+
+    def deposit(self, tours: np.ndarray, amounts: Sequence[float]) -> None:
+        # closed tours, both edge directions, all ants in one scatter-add
+        tours = np.asarray(tours)
+        if tours.size == 0:
+            return
+        src = tours.ravel()
+        dst = np.roll(tours, -1, axis=1).ravel()
+        add = np.repeat(np.asarray(amounts, dtype=np.float64) / self.scale, tours.shape[1]).astype(self.raw.dtype)
+        np.add.at(self.raw, (src, dst), add)
+        np.add.at(self.raw, (dst, src), add)
+
+class CandidatePheromone(PheromoneMatrix):
+    # trails on the (n, k) candidate edges only, for compact problems: every other edge shares
+    # one level (rest) that evaporates, is clamped and reset with the candidate trails but
+    # never receives deposits, so construction falls back to the heuristic off the lists
+    dense = False
+
+    def __init__(self, cand: np.ndarray, tau0: float, dtype: type = np.float32):
+        self.n = cand.shape[0]
+        self.cand = cand
+        self.raw = np.full(cand.shape, tau0, dtype=dtype)
+        self.rest = float(tau0)
+        self.scale = 1.0
+        self.min_scale = float(np.sqrt(np.finfo(dtype).tiny))
+
+    def __getitem__(self, i: int) -> np.ndarray:
+        return expand_row(self.raw[i], self.cand[i], self.rest, self.n) * self.scale
+
+    def candidate_values(self, cand: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        raw = self.raw if rows is None else self.raw[rows]
+        return raw * self.scale
+
+    def renormalize(self) -> None:
+        self.rest *= self.scale
+        super().renormalize()
+
+    def reset(self, value: float) -> None:
+        super().reset(value)
+        self.rest = float(value)
+
+    def clamp(self, lo: float, hi: float) -> None:
+        super().clamp(lo, hi)
+        self.rest = min(max(self.rest, lo / self.scale), hi / self.scale)
+
+    def _slots(self, src: np.ndarray, dst: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # (rows, columns) in raw of the edges src -> dst that are candidate edges, and which
+        # of the edges those are
+        hit = self.cand[src] == dst[:, None]
+        found = hit.any(axis=1)
+        return src[found], np.argmax(hit[found], axis=1), found
+
+    def blend(self, tour: Sequence[int], rate: float, target: float) -> None:
+        src = np.asarray(tour, dtype=np.intp)
+        dst = np.roll(src, -1)
+        add = rate * target / self.scale
+        for a, b in ((src, dst), (dst, src)):
+            rows, cols, _ = self._slots(a, b)
+            self.raw[rows, cols] = (1.0 - rate) * self.raw[rows, cols] + add
+
+    def deposit(self, tours: np.ndarray, amounts: Sequence[float]) -> None:
+        tours = np.asarray(tours)
+        if tours.size == 0:
+            return
+        src = tours.ravel()
+        dst = np.roll(tours, -1, axis=1).ravel()
+        add = np.repeat(np.asarray(amounts, dtype=np.float64) / self.scale, tours.shape[1]).astype(self.raw.dtype)
+        for a, b in ((src, dst), (dst, src)):
+            rows, cols, found = self._slots(a, b)
+            np.add.at(self.raw, (rows, cols), add[found])
+
+def expand_row(raw_row: np.ndarray, cand_row: np.ndarray, rest: float, n: int) -> np.ndarray:
+    # full row of raw trails from the candidate trails of one city
+    row = np.full(n, rest, dtype=raw_row.dtype)
+    row[cand_row] = raw_row
+    return row
+
+def dense_bytes(n: int, dtype: type) -> int:
+    return n * n * np.dtype(dtype).itemsize
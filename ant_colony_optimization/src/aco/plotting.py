@@ -1,19 +1,85 @@
 from __future__ import annotations
 from pathlib import Path
-from typing import List
-import matplotlib.pyplot as plt
+from typing import Any, List, Optional, Sequence, Tuple
 
-from .problem import TSPProblem
+import numpy as np
 
-def plot_tour(problem: TSPProblem, tour: List[int], out_path: str | Path, title: str = "") -> None:
-    xs = [problem.nodes[i].x for i in tour] + [problem.nodes[tour[0]].x]
-    ys = [problem.nodes[i].y for i in tour] + [problem.nodes[tour[0]].y]
+from .problem import CompactTSPProblem, TSPProblem
+
+# above this many cities tours are drawn as one line collection without labels
+LARGE_TOUR = 1000
+# longer histories are downsampled to about this many points before plotting
+MAX_POINTS = 2000
+
+def _pyplot() -> Any:
+    # imported on first use, so processes that only compute never load matplotlib
+    import matplotlib.pyplot as plt
+    return plt
+
+def _coords(problem: TSPProblem | CompactTSPProblem) -> Tuple[np.ndarray, np.ndarray]:
+    if isinstance(problem, CompactTSPProblem):
+        return problem.labels, problem.xy
+    labels = np.array([node.label for node in problem.nodes])
+    xy = np.array([[node.x, node.y] for node in problem.nodes], dtype=np.float64).reshape(-1, 2)
+    return labels, xy
+
+def _downsample(n: int, max_points: int) -> np.ndarray:
+    # indices of about max_points evenly spaced entries, always keeping the first and last one
+    if max_points <= 0 or n <= max_points:
+        return np.arange(n)
+    return np.unique(np.linspace(0, n - 1, max_points).round().astype(np.int64))
+
+def _bucket_band(
+    x: np.ndarray, mean: np.ndarray, lo: np.ndarray, hi: np.ndarray, max_points: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    # about max_points consecutive buckets: the mean of the mean, the minimum of the lower and
+    # the maximum of the upper edge per bucket, so no extreme of the band is lost; each bucket
+    # is drawn from its first iteration and the last point is kept as it is
+    n = len(x)
+    if max_points <= 0 or n <= max_points:
+        return x, mean, lo, hi
+    starts = np.unique(np.linspace(0, n - 1, max_points - 1).astype(np.int64))
+    counts = np.diff(np.append(starts, n))
+    return (
+        np.append(x[starts], x[-1]),
+        np.append(np.add.reduceat(mean, starts) / counts, mean[-1]),
+        np.append(np.minimum.reduceat(lo, starts), lo[-1]),
+        np.append(np.maximum.reduceat(hi, starts), hi[-1]),
+    )
+
+def plot_tour(
+    problem: TSPProblem | CompactTSPProblem,
+    tour: List[int],
+    out_path: str | Path,
+    title: str = "",
+    labels: Optional[int] = None,
+) -> None:
+    # labels: at most this many city labels, spread along the tour (default: all of them on
+    # small instances, none above LARGE_TOUR cities)
+    plt = _pyplot()
+    names, xy = _coords(problem)
+    order = np.asarray(tour, dtype=np.intp)
+    pts = xy[np.append(order, order[:1])]
+    large = len(order) > LARGE_TOUR
+    if labels is None:
+        labels = 0 if large else len(order)
 
     plt.figure()
-    plt.plot(xs, ys, marker="o")
-    for i in tour:
-        node = problem.nodes[i]
-        plt.text(node.x, node.y, str(node.label))
+    if large:
+        from matplotlib.collections import LineCollection
+
+        ax = plt.gca()
+        # one collection for all edges and one scatter for all cities, rasterized so vector
+        # outputs stay small
+        ax.add_collection(LineCollection(np.stack([pts[:-1], pts[1:]], axis=1), linewidths=0.5, rasterized=True))
+        ax.scatter(pts[:-1, 0], pts[:-1, 1], s=2, rasterized=True)
+        ax.autoscale_view()
+    else:
+        plt.plot(pts[:, 0], pts[:, 1], marker="o")
+    if labels > 0:
+        step = -(-len(order) // labels)
+        for i in order[::step]:
+            plt.text(xy[i, 0], xy[i, 1], str(names[i]))
     if title:
         plt.title(title)
     plt.xlabel("x")
@@ -22,9 +88,20 @@ def plot_tour(problem: TSPProblem, tour: List[int], out_path: str | Path, title:
     plt.savefig(out_path)
     plt.close()
 
-def plot_convergence(best_history: List[float], out_path: str | Path, title: str = "") -> None:
+def plot_convergence(
+    best_history: List[float],
+    out_path: str | Path,
+    title: str = "",
+    iters: Optional[List[int]] = None,
+    max_points: int = MAX_POINTS,
+) -> None:
+    plt = _pyplot()
+    y = np.asarray(best_history, dtype=np.float64)
+    x = np.asarray(iters) if iters else np.arange(len(y))
+    keep = _downsample(len(y), max_points)
+
     plt.figure()
-    plt.plot(best_history)
+    plt.plot(x[keep], y[keep])
     if title:
         plt.title(title)
     plt.xlabel("iteracja")
@@ -33,41 +110,54 @@ def plot_convergence(best_history: List[float], out_path: str | Path, title: str
     plt.savefig(out_path)
     plt.close()
 
+def align_histories(
+    histories: Sequence[Sequence[float]], iters: Optional[Sequence[Sequence[int]]] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    # (iterations, values) on the union of the recorded iterations of all runs: each run keeps
+    # its last recorded value until its next row (downsampled histories are irregular), runs
+    # stopped early keep their final best length, NaN before a run's first row. Without iters
+    # row k of every run is iteration k
+    if iters is None:
+        iters = [np.arange(len(h)) for h in histories]
+    grid = np.unique(np.concatenate([np.asarray(it, dtype=np.int64) for it in iters]))
+    values = np.empty((len(histories), len(grid)), dtype=np.float64)
+    for k, (h, it) in enumerate(zip(histories, iters)):
+        pos = np.searchsorted(np.asarray(it), grid, side="right") - 1
+        values[k] = np.asarray(h, dtype=np.float64)[np.maximum(pos, 0)]
+        values[k, pos < 0] = np.nan
+    return grid, values
+
+def band_stats(
+    histories: Sequence[Sequence[float]],
+    band: str = "minmax",
+    iters: Optional[Sequence[Sequence[int]]] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    # (iterations, mean, lower, upper) over the runs, see align_histories
+    if band not in ("minmax", "std"):
+        raise ValueError("band must be 'minmax' or 'std'")
+    grid, values = align_histories(histories, iters)
+    mean = np.nanmean(values, axis=0)
+    if band == "minmax":
+        return grid, mean, np.nanmin(values, axis=0), np.nanmax(values, axis=0)
+    std = np.nanstd(values, axis=0)
+    return grid, mean, mean - std, mean + std
+
 def plot_convergence_band(
     histories: List[List[float]],
     out_path: str | Path,
     title: str = "",
     band: str = "minmax",
+    max_points: int = MAX_POINTS,
+    iters: Optional[List[List[int]]] = None,
 ) -> None:
-    import math
-    T = len(histories[0])
-    for h in histories:
-        if len(h) != T:
-            raise ValueError("Różne długości historii")
-
-    mean = []
-    lo = []
-    hi = []
-
-    for t in range(T):
-        vals = [h[t] for h in histories]
-        m = sum(vals) / len(vals)
-        mean.append(m)
-
-        if band == "minmax":
-            lo.append(min(vals))
-            hi.append(max(vals))
-        elif band == "std":
-            var = sum((x - m) ** 2 for x in vals) / len(vals)
-            s = math.sqrt(var)
-            lo.append(m - s)
-            hi.append(m + s)
-        else:
-            raise ValueError("band must be 'minmax' or 'std'")
+    # iters: the iteration of every history row (ACOResult.history_iters), per run
+    plt = _pyplot()
+    x, mean, lo, hi = _bucket_band(*band_stats(histories, band, iters), max_points)
 
     plt.figure()
-    plt.plot(mean)
-    plt.fill_between(range(T), lo, hi, alpha=0.2)
+    # the values hold until the next recorded iteration
+    plt.plot(x, mean, drawstyle="steps-post")
+    plt.fill_between(x, lo, hi, alpha=0.2, step="post")
     if title:
         plt.title(title)
     plt.xlabel("iteracja")
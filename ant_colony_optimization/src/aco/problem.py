@@ -1,21 +1,34 @@
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import List
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, ClassVar, Dict, Iterator, List, Sequence
 
 import math
 
+import numpy as np
+
 from .io import Node
 
 @dataclass(frozen=True)
 class TSPProblem:
+    dtype: ClassVar[type] = np.float64
+
     nodes: List[Node]
-    dist: List[List[float]]
+    # nested lists (build_problem), or an ndarray / read-only memmap (TSPLIB loaders)
+    dist: List[List[float]] | np.ndarray
+    _cache: Dict[Any, np.ndarray] = field(default_factory=dict, init=False, repr=False, compare=False)
 
     @property
     def n(self) -> int:
         return len(self.nodes)
 
     def tour_length(self, tour: List[int], close_cycle: bool = True) -> float:
+        if isinstance(self.dist, np.ndarray):
+            t = np.asarray(tour, dtype=np.intp)
+            total = float(self.dist[t[:-1], t[1:]].sum())
+            if close_cycle and len(t) > 1:
+                total += float(self.dist[t[-1], t[0]])
+            return total
         total = 0.0
         for i in range(1, len(tour)):
             total += self.dist[tour[i - 1]][tour[i]]
@@ -23,7 +36,49 @@ class TSPProblem:
             total += self.dist[tour[-1]][tour[0]]
         return total
 
-def build_problem(nodes: List[Node]) -> TSPProblem:
+    def tour_lengths(self, tours: np.ndarray) -> np.ndarray:
+        tours = np.asarray(tours)
+        d = self.dist_array()
+        return d[tours, np.roll(tours, -1, axis=1)].sum(axis=1)
+
+    def dist_array(self) -> np.ndarray:
+        arr = self._cache.get("dist")
+        if arr is None:
+            arr = np.asarray(self.dist, dtype=np.float64)
+            self._cache["dist"] = arr
+        return arr
+
+    def heuristic(self, beta: float) -> np.ndarray:
+        # eta^beta with the same 1e9 substitute for zero-length edges as construct_tour
+        key = ("eta", beta)
+        eta = self._cache.get(key)
+        if eta is None:
+            eta = _eta(self.dist_array(), beta)
+            self._cache[key] = eta
+        return eta
+
+    def candidate_lists(self, k: int) -> np.ndarray:
+        # (n, k) indices of the k nearest neighbours of every city, closest first
+        k = max(0, min(k, self.n - 1))
+        key = ("cand", k)
+        cand = self._cache.get(key)
+        if cand is None:
+            d = self.dist_array().copy()
+            np.fill_diagonal(d, np.inf)
+            if k == 0:
+                cand = np.empty((self.n, 0), dtype=np.intp)
+            else:
+                part = np.argpartition(d, k - 1, axis=1)[:, :k]
+                order = np.argsort(np.take_along_axis(d, part, axis=1), axis=1, kind="stable")
+                cand = np.take_along_axis(part, order, axis=1)
+            self._cache[key] = cand
+        return cand
+
+    def candidate_heuristic(self, k: int, beta: float) -> np.ndarray:
+        # eta^beta on the candidate edges, aligned with candidate_lists(k)
+        return np.take_along_axis(self.heuristic(beta), self.candidate_lists(k), axis=1)
+
+def build_problem(nodes: List[Node], n_candidates: int = 0) -> TSPProblem:
     n = len(nodes)
     dist = [[0.0] * n for _ in range(n)]
     for i in range(n):
@@ -33,4 +88,202 @@ def build_problem(nodes: List[Node]) -> TSPProblem:
             d = math.hypot(xi - xj, yi - yj)
             dist[i][j] = d
             dist[j][i] = d
-    return TSPProblem(nodes=nodes, dist=dist)
\ No newline at end of file
+    problem = TSPProblem(nodes=nodes, dist=dist)
+    if n_candidates > 0:
+        problem.candidate_lists(n_candidates)
+    return problem
+
+def _eta(d: np.ndarray, beta: float) -> np.ndarray:
+    d = np.asarray(d, dtype=np.float64)
+    with np.errstate(divide="ignore"):
+        eta = np.where(d > 0.0, 1.0 / d, 1e9)
+    eta **= beta
+    return eta
+
+def _grid_knn(xy: np.ndarray, k: int) -> np.ndarray:
+    # exact k nearest neighbours without the n^2 distance matrix: cities are bucketed
+    # into a uniform grid and each cell searches a growing box of neighbouring cells
+    n = len(xy)
+    cand = np.empty((n, k), dtype=np.intp)
+    if k == 0:
+        return cand
+
+    lo = xy.min(axis=0)
+    span = float((xy.max(axis=0) - lo).max()) or 1.0
+    g = max(1, int(math.sqrt(n / (2.0 * k))))
+    cell = span / g
+    gx = np.minimum(((xy[:, 0] - lo[0]) / cell).astype(np.intp), g - 1)
+    gy = np.minimum(((xy[:, 1] - lo[1]) / cell).astype(np.intp), g - 1)
+    cid = gx * g + gy
+    order = np.argsort(cid, kind="stable")
+    starts = np.searchsorted(cid[order], np.arange(g * g + 1))
+
+    for c in np.unique(cid):
+        cx, cy = divmod(int(c), g)
+        todo = order[starts[c]:starts[c + 1]]
+        r = 1
+        while len(todo):
+            x0, x1 = max(0, cx - r), min(g - 1, cx + r)
+            y0, y1 = max(0, cy - r), min(g - 1, cy + r)
+            nb = np.concatenate([order[starts[x * g + y0]:starts[x * g + y1 + 1]] for x in range(x0, x1 + 1)])
+            if len(nb) > k:
+                d = np.hypot(xy[todo, 0, None] - xy[None, nb, 0], xy[todo, 1, None] - xy[None, nb, 1])
+                d[todo[:, None] == nb[None, :]] = np.inf
+                part = np.argpartition(d, k - 1, axis=1)[:, :k]
+                dk = np.take_along_axis(d, part, axis=1)
+                srt = np.argsort(dk, axis=1, kind="stable")
+                dk = np.take_along_axis(dk, srt, axis=1)
+                # the box covers every city closer than r cells to the center cell
+                whole = x0 == 0 and y0 == 0 and x1 == g - 1 and y1 == g - 1
+                ok = np.ones(len(todo), dtype=bool) if whole else dk[:, -1] <= r * cell
+                cand[todo[ok]] = nb[np.take_along_axis(part, srt, axis=1)[ok]]
+                todo = todo[~ok]
+            r += 1
+    return cand
+
+class RowCache:
+    # rows produced on demand and kept in a bounded LRU cache
+    def __init__(self, n: int, make_row: Callable[[int], np.ndarray], max_rows: int):
+        self.n = n
+        self._make_row = make_row
+        self._max_rows = max(1, max_rows)
+        self._rows: OrderedDict[int, np.ndarray] = OrderedDict()
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __getitem__(self, i: Any) -> np.ndarray:
+        if isinstance(i, (int, np.integer)):
+            return self.row(int(i))
+        return np.stack([self.row(int(j)) for j in np.asarray(i)])
+
+    def invalidate(self, rows: Sequence[int]) -> None:
+        for i in rows:
+            self._rows.pop(int(i), None)
+
+    def row(self, i: int) -> np.ndarray:
+        row = self._rows.get(i)
+        if row is None:
+            row = self._make_row(i)
+            self._rows[i] = row
+            if len(self._rows) > self._max_rows:
+                self._rows.popitem(last=False)
+        else:
+            self._rows.move_to_end(i)
+        return row
+
+class NodeView(Sequence[Node]):
+    # Node records materialized on access from the coordinate arrays
+    def __init__(self, labels: np.ndarray, xy: np.ndarray):
+        self._labels = labels
+        self._xy = xy
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def __getitem__(self, i: Any) -> Any:
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        i = int(i)
+        return Node(idx=i, label=int(self._labels[i]), x=float(self._xy[i, 0]), y=float(self._xy[i, 1]))
+
+    def __iter__(self) -> Iterator[Node]:
+        for i in range(len(self)):
+            yield self[i]
+
+@dataclass(frozen=True)
+class CompactTSPProblem:
+    # coordinates in contiguous arrays, float32 distance rows computed on demand
+    dtype: ClassVar[type] = np.float32
+
+    labels: np.ndarray
+    xy: np.ndarray
+    cache_rows: int = 1024
+    _cache: Dict[Any, Any] = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    @property
+    def n(self) -> int:
+        return len(self.labels)
+
+    @property
+    def nodes(self) -> NodeView:
+        return NodeView(self.labels, self.xy)
+
+    @property
+    def dist(self) -> RowCache:
+        rows = self._cache.get("dist")
+        if rows is None:
+            rows = RowCache(self.n, self.dist_row, self.cache_rows)
+            self._cache["dist"] = rows
+        return rows
+
+    def dist_row(self, i: int) -> np.ndarray:
+        return np.hypot(self.xy[:, 0] - self.xy[i, 0], self.xy[:, 1] - self.xy[i, 1]).astype(np.float32)
+
+    def distance_fn(self) -> Callable[[int, int], float]:
+        # single distances for the local search: the move evaluations jump between rows, which
+        # would thrash the row cache
+        fn = self._cache.get("distance_fn")
+        if fn is None:
+            xs = self.xy[:, 0].tolist()
+            ys = self.xy[:, 1].tolist()
+            hypot = math.hypot
+
+            def fn(a: int, b: int) -> float:
+                return hypot(xs[a] - xs[b], ys[a] - ys[b])
+            self._cache["distance_fn"] = fn
+        return fn
+
+    def tour_length(self, tour: List[int], close_cycle: bool = True) -> float:
+        pts = self.xy[np.asarray(tour, dtype=np.intp)]
+        if close_cycle and len(pts) > 1:
+            pts = np.vstack([pts, pts[:1]])
+        return float(np.hypot(*np.diff(pts, axis=0).T).sum())
+
+    def tour_lengths(self, tours: np.ndarray) -> np.ndarray:
+        pts = self.xy[np.asarray(tours, dtype=np.intp)]
+        seg = np.roll(pts, -1, axis=1) - pts
+        return np.hypot(seg[..., 0], seg[..., 1]).sum(axis=1)
+
+    def heuristic(self, beta: float) -> RowCache:
+        key = ("eta", beta)
+        rows = self._cache.get(key)
+        if rows is None:
+            dist = self.dist
+            rows = RowCache(self.n, lambda i: _eta(dist.row(i), beta), self.cache_rows)
+            self._cache[key] = rows
+        return rows
+
+    def candidate_lists(self, k: int) -> np.ndarray:
+        k = max(0, min(k, self.n - 1))
+        key = ("cand", k)
+        cand = self._cache.get(key)
+        if cand is None:
+            cand = _grid_knn(self.xy, k)
+            self._cache[key] = cand
+        return cand
+
+    def candidate_heuristic(self, k: int, beta: float) -> np.ndarray:
+        cand = self.candidate_lists(k)
+        key = ("cand_eta", cand.shape[1], beta)
+        eta = self._cache.get(key)
+        if eta is None:
+            seg = self.xy[cand] - self.xy[:, None, :]
+            eta = _eta(np.hypot(seg[..., 0], seg[..., 1]), beta)
+            self._cache[key] = eta
+        return eta
+
+def build_compact_problem(
+    labels: np.ndarray,
+    xy: np.ndarray,
+    n_candidates: int = 0,
+    cache_rows: int = 1024,
+) -> CompactTSPProblem:
+    problem = CompactTSPProblem(
+        labels=np.ascontiguousarray(labels, dtype=np.int64),
+        xy=np.ascontiguousarray(xy, dtype=np.float64),
+        cache_rows=cache_rows,
+    )
+    if n_candidates > 0:
+        problem.candidate_lists(n_candidates)
+    return problem
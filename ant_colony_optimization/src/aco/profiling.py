@@ -0,0 +1,65 @@
+from __future__ import annotations
+from contextlib import contextmanager, nullcontext
+from typing import Any, ContextManager, Dict, Iterator, List, Optional
+
+import time
+
+from .history import History
+
+# sampling is part of construction; the other phases do not overlap
+PHASES = ("choice", "construction", "sampling", "evaluation", "local_search", "evaporation", "deposit")
+COUNTERS = ("random_moves", "zero_weight_fallbacks", "candidate_misses")
+
+# shared no-op context for the disabled profiler
+NO_PHASE: ContextManager[None] = nullcontext()
+
+def profile_fields() -> List[str]:
+    return ["iter"] + [f"{p}_s" for p in PHASES] + list(COUNTERS)
+
+class Profiler:
+    # per-iteration phase timers and hot-path counters; the counters themselves are
+    # kept by the (timed) Sampler and read back once per iteration. Rows are kept in a
+    # History, so long runs can bound them like the other histories; the totals cover
+    # every iteration either way
+    def __init__(self, capacity: int = 1, mode: str = "full", max_points: int = 0, seed: Optional[Any] = None):
+        self.fields = profile_fields()[1:]
+        self.rows = History(capacity, mode, max_points, seed, columns=self.fields)
+        self._totals: Dict[str, float] = dict.fromkeys(self.fields, 0.0)
+        self._current: Dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self._seen: Dict[str, float] = {"sampling": 0.0, **dict.fromkeys(COUNTERS, 0)}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._current[name] += time.perf_counter() - t0
+
+    def end_iteration(self, iteration: int, sampler: Any) -> Dict[str, float]:
+        now = {"sampling": sampler.elapsed_s, **{c: getattr(sampler, c) for c in COUNTERS}}
+        self._current["sampling"] = now["sampling"] - self._seen["sampling"]
+        row: Dict[str, float] = {"iter": iteration}
+        row.update({f"{p}_s": self._current[p] for p in PHASES})
+        row.update({c: now[c] - self._seen[c] for c in COUNTERS})
+        self._seen = now
+        self._current = dict.fromkeys(PHASES, 0.0)
+        self.rows.append(iteration, [row[f] for f in self.fields])
+        for f in self.fields:
+            self._totals[f] += row[f]
+        return row
+
+    @property
+    def history(self) -> List[Dict[str, float]]:
+        iters, values = self.rows.arrays()
+        out = []
+        for it, vals in zip(iters.tolist(), values.tolist()):
+            row: Dict[str, float] = {"iter": it, **dict(zip(self.fields, vals))}
+            row.update({c: int(row[c]) for c in COUNTERS})
+            out.append(row)
+        return out
+
+    def totals(self) -> Dict[str, float]:
+        out = dict(self._totals)
+        out.update({c: int(out[c]) for c in COUNTERS})
+        return out
@@ -0,0 +1,198 @@
+from __future__ import annotations
+from bisect import bisect_left
+from itertools import accumulate
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import random
+import time
+
+import numpy as np
+
+SAMPLERS = ("cumsum", "alias")
+# what a timed Sampler accumulates; worker processes send theirs back to the parent
+SAMPLER_COUNTERS = ("elapsed_s", "calls", "random_moves", "zero_weight_fallbacks", "candidate_misses")
+
+# alias draws are rejected when they land on a visited city; below this share of
+# unvisited cities the cumulative-sum draw is cheaper than the expected retries
+_ALIAS_MIN_FREE = 0.5
+_ALIAS_TRIES = 4
+# a table costs about as much as this many cumulative-sum draws from its row, so it is
+# only built when at least that many ants are expected to draw from the row with it
+_ALIAS_MIN_REUSE = 20
+
+def cumulative_choice(items: Sequence[int], weights: Iterable[float]) -> int:
+    # running sums + binary search; the zero-weight fallback draws from items directly
+    cum = list(accumulate(weights))
+    total = cum[-1] if cum else 0.0
+    if total <= 0.0:
+        return random.choice(items)
+    idx = bisect_left(cum, random.random() * total)
+    return items[idx] if idx < len(items) else items[-1]
+
+def cumsum_choice(weights: np.ndarray, mask: np.ndarray, rng: np.random.Generator) -> int:
+    cum = np.cumsum(weights)
+    total = cum[-1]
+    if total <= 0.0:
+        free = np.flatnonzero(mask)
+        return int(free[rng.integers(len(free))])
+    idx = int(np.searchsorted(cum, rng.random() * total, side="right"))
+    if idx >= len(cum):
+        # r rounded up to the total: take the last item with a positive weight
+        idx = int(np.flatnonzero(weights)[-1])
+    return idx
+
+def sample_rows(
+    w: np.ndarray, mask: np.ndarray, u: np.ndarray, greedy: Optional[np.ndarray] = None
+) -> np.ndarray:
+    # one cumulative-sum draw per row; rows without positive weight fall back to uniform over mask
+    cum = np.cumsum(w, axis=1)
+    empty = cum[:, -1] <= 0.0
+    if empty.any():
+        w[empty] = mask[empty]
+        cum[empty] = np.cumsum(w[empty], axis=1)
+
+    idx = np.argmax(cum > (u * cum[:, -1])[:, None], axis=1)
+    bad = w[np.arange(len(idx)), idx] <= 0.0
+    if bad.any():
+        # r rounded up to the row total: take the last item with a positive weight
+        idx[bad] = w.shape[1] - 1 - np.argmax(w[bad, ::-1] > 0.0, axis=1)
+    if greedy is not None and greedy.any():
+        idx[greedy] = np.argmax(w[greedy], axis=1)
+    return idx
+
+class AliasTable:
+    # Walker alias method, O(1) per draw. Built without a Python loop: instead of Vose's work
+    # lists a sweep over prefix sums gives each small column (scaled weight < 1) the large
+    # column whose excess covers the start of its deficit, and each large column, once
+    # drained below 1, the next large column
+    def __init__(self, weights: np.ndarray):
+        w = np.asarray(weights, dtype=np.float64)
+        n = len(w)
+        total = float(w.sum())
+        self.n = n
+        prob = np.ones(n)
+        alias = np.arange(n)
+        q = w * (n / total) if total > 0.0 else prob
+        small = np.flatnonzero(q < 1.0)
+        large = np.flatnonzero(q >= 1.0)
+        # no small or no large column: all weights are equal up to rounding
+        if len(small) and len(large):
+            deficit = np.cumsum(1.0 - q[small])
+            excess = np.cumsum(q[large] - 1.0)
+            starts = np.concatenate(([0.0], deficit[:-1]))
+            owner = np.minimum(np.searchsorted(excess, starts, side="right"), len(large) - 1)
+            prob[small] = q[small]
+            alias[small] = large[owner]
+            # a large column has covered the deficits up to the first small end at or above its excess sum
+            end = deficit[np.minimum(np.searchsorted(deficit, excess[:-1]), len(deficit) - 1)]
+            prob[large[:-1]] = np.clip(1.0 - (end - excess[:-1]), 0.0, 1.0)
+            alias[large[:-1]] = large[1:]
+        self.prob: List[float] = prob.tolist()
+        self.alias: List[int] = alias.tolist()
+
+    def sample(self, rng: np.random.Generator) -> int:
+        # a single uniform picks the column and decides between it and its alias
+        u = rng.random() * self.n
+        i = int(u)
+        if i >= self.n:
+            i = self.n - 1
+        return i if u - i < self.prob[i] else self.alias[i]
+
+class Sampler:
+    # draws the next city for the numpy engines; "alias" keeps one alias table per row of a
+    # frozen choice matrix and reuses it for every ant of the iteration, rejecting visited
+    # cities, and falls back to the cumulative draw once most of the row has been visited.
+    # With timed=True the time spent drawing is accumulated in elapsed_s and the construction
+    # code counts random moves, zero-weight fallbacks and candidate-list misses here.
+    def __init__(self, method: str = "cumsum", timed: bool = False):
+        if method not in SAMPLERS:
+            raise ValueError(f"sampler must be one of {SAMPLERS}")
+        self.method = method
+        self.timed = timed
+        self.elapsed_s = 0.0
+        self.calls = 0
+        self.random_moves = 0
+        self.zero_weight_fallbacks = 0
+        self.candidate_misses = 0
+        self._tables: Dict[int, AliasTable] = {}
+        self._alias = False
+
+    def reset(self, ants: int = 0) -> None:
+        # new choice matrix, drawn from by this many ants: the alias tables of the previous one
+        # are stale, and new ones are only built when enough of the ants reuse each of them
+        self._tables.clear()
+        self._alias = self.method == "alias" and ants * _ALIAS_MIN_FREE >= _ALIAS_MIN_REUSE
+
+    def invalidate(self, rows: Iterable[int]) -> None:
+        for i in rows:
+            self._tables.pop(int(i), None)
+
+    def counters(self) -> Dict[str, float]:
+        return {c: getattr(self, c) for c in SAMPLER_COUNTERS}
+
+    def add(self, counters: Dict[str, float]) -> None:
+        for c, v in counters.items():
+            setattr(self, c, getattr(self, c) + v)
+
+    def choice(self, weights: np.ndarray, mask: np.ndarray, rng: np.random.Generator) -> int:
+        if not self.timed:
+            return cumsum_choice(weights, mask, rng)
+        t0 = time.perf_counter()
+        idx = cumsum_choice(weights, mask, rng)
+        self.elapsed_s += time.perf_counter() - t0
+        self.calls += 1
+        if not (weights > 0.0).any():
+            self.zero_weight_fallbacks += 1
+        return idx
+
+    def row_choice(
+        self, i: int, row: np.ndarray, unvisited: np.ndarray, n_free: int, rng: np.random.Generator
+    ) -> int:
+        # row is the unmasked choice row of city i
+        t0 = time.perf_counter() if self.timed else 0.0
+        idx = -1
+        if self._alias and n_free >= _ALIAS_MIN_FREE * len(row):
+            table = self._tables.get(i)
+            if table is None:
+                # the current city (zero distance, huge weight) is never a valid draw
+                w = np.array(row, dtype=np.float64)
+                w[i] = 0.0
+                table = self._tables[i] = AliasTable(w)
+            for _ in range(_ALIAS_TRIES):
+                j = table.sample(rng)
+                if unvisited[j]:
+                    idx = j
+                    break
+        weights = None
+        if idx < 0:
+            weights = row * unvisited
+            idx = cumsum_choice(weights, unvisited, rng)
+        if self.timed:
+            self.elapsed_s += time.perf_counter() - t0
+            self.calls += 1
+            if weights is not None and not (weights > 0.0).any():
+                self.zero_weight_fallbacks += 1
+        return idx
+
+    def rows(
+        self, w: np.ndarray, mask: np.ndarray, u: np.ndarray, greedy: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        if not self.timed:
+            return sample_rows(w, mask, u, greedy)
+        self.zero_weight_fallbacks += int((~(w > 0.0).any(axis=1)).sum())
+        t0 = time.perf_counter()
+        idx = sample_rows(w, mask, u, greedy)
+        self.elapsed_s += time.perf_counter() - t0
+        self.calls += len(idx)
+        return idx
+
+    def roulette(self, items: Sequence[int], weights: Sequence[float]) -> int:
+        if not self.timed:
+            return cumulative_choice(items, weights)
+        t0 = time.perf_counter()
+        item = cumulative_choice(items, weights)
+        self.elapsed_s += time.perf_counter() - t0
+        self.calls += 1
+        if not any(w > 0.0 for w in weights):
+            self.zero_weight_fallbacks += 1
+        return item
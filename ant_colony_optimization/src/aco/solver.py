@@ -1,11 +1,30 @@
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
+import dataclasses
+import random
 import time
 
-from .problem import TSPProblem
-from .ant import construct_tour, AntResult
+import numpy as np
+
+from .problem import CompactTSPProblem, RowCache, TSPProblem
+from .pheromone import DENSE_LIMIT_BYTES, CandidatePheromone, PheromoneMatrix, dense_bytes
+from .ant import construct_tour, construct_tour_np, construct_tours_batched, AntResult
+from .local_search import METHODS as LOCAL_SEARCH_METHODS, improve_tour
+from .parallel import ParallelColony
+from .sampling import SAMPLERS, Sampler
+from .profiling import NO_PHASE, Profiler
+from .termination import STAGNATION_MEASURES, stagnation_measure
+from .checkpoint import CheckpointWriter, decode, encode, load_checkpoint
+from .history import HISTORY_MODES, History
+
+ENGINES = ("python", "numpy", "batched")
+VARIANTS = ("as", "rank", "mmas", "acs")
+# settings that may differ when a run is resumed from a checkpoint (to extend it)
+RESUMABLE_FIELDS = (
+    "T", "time_limit_s", "max_evals", "patience", "target_length", "checkpoint_path", "checkpoint_every", "profile",
+)
 
 @dataclass
 class ACOConfig:
@@ -17,6 +36,53 @@ class ACOConfig:
     p_random: float
     tau0: float = 1.0
     deposit_q: float = 1.0
+    engine: str = "numpy"
+    n_candidates: int = 0
+    seed: Optional[int] = None
+    variant: str = "as"
+    # rank-based AS: the best rank_w - 1 ants of the iteration and the best-so-far tour deposit
+    rank_w: int = 6
+    # MMAS: iteration-best deposit, global-best every mmas_gb_every iterations (1 = global-best only,
+    # 0 = never), trails re-initialized after mmas_stagnation iterations without improvement
+    mmas_p_best: float = 0.05
+    mmas_gb_every: int = 0
+    mmas_stagnation: int = 100
+    # ACS: probability of the greedy move and local evaporation rate
+    q0: float = 0.9
+    xi: float = 0.1
+    # local search on the constructed tours: "none", "2opt", "oropt" or "2opt+oropt",
+    # applied to the iteration-best ant ("best") or to every ant ("all")
+    local_search: str = "none"
+    ls_scope: str = "best"
+    ls_neighbors: int = 10
+    # > 1: the colony is split between this many persistent worker processes
+    workers: int = 0
+    # next-city draws of the numpy engine: "cumsum" (cumulative sums + binary search) or
+    # "alias" (per-row alias tables reused by all ants of an iteration, from 40 ants up)
+    sampler: str = "cumsum"
+    # per-phase timers and construction counters per iteration (ACOResult.profile)
+    profile: bool = False
+    # early termination, checked after every iteration (0 / None = off): wall-clock budget,
+    # budget of constructed tours, iterations without improvement, known target length
+    time_limit_s: float = 0.0
+    max_evals: int = 0
+    patience: int = 0
+    target_length: Optional[float] = None
+    # pheromone stagnation: "branching" (lambda-branching factor) or "entropy" (perplexity of
+    # the trails leaving a city), averaged over cities and checked every stagnation_every
+    # iterations; the run stops once it drops below stagnation_threshold (2 = converged)
+    stagnation: str = "none"
+    stagnation_threshold: float = 2.5
+    stagnation_lambda: float = 0.05
+    stagnation_every: int = 10
+    # full solver state saved to checkpoint_path every checkpoint_every iterations (0 = off)
+    # and when the run ends; written in the background
+    checkpoint_path: Optional[str] = None
+    checkpoint_every: int = 0
+    # per-iteration histories: "full", or at most history_points rows kept by "decimate"
+    # (every 2^k-th iteration) or "reservoir" (uniform sample) for very long runs
+    history: str = "full"
+    history_points: int = 10_000
 
 @dataclass
 class ACOResult:
@@ -27,90 +93,576 @@ class ACOResult:
     iter_best: List[float]
     iter_mean: List[float]
     iter_worst: List[float]
+    # iteration numbers (1-based) of the history entries; 1..T unless downsampled
+    history_iters: List[int] = field(default_factory=list)
+    # with ACOConfig.profile: time spent drawing next cities, per-iteration phase timers and
+    # counters (profiling.profile_fields) and their totals
+    sampling_s: Optional[float] = None
+    profile: Optional[List[Dict[str, float]]] = None
+    profile_totals: Optional[Dict[str, float]] = None
+    # why the run ended (termination.STOP_REASONS), iterations run and tours constructed
+    stop_reason: str = "max_iterations"
+    iterations: int = 0
+    evaluations: int = 0
 
 class ACOSolver:
-    def __init__(self, problem: TSPProblem, cfg: ACOConfig):
+    def __init__(
+        self,
+        problem: TSPProblem | CompactTSPProblem,
+        cfg: ACOConfig,
+        callback: Optional[Callable[[Dict[str, Any]], Any]] = None,
+    ):
+        if cfg.engine not in ENGINES:
+            raise ValueError(f"engine must be one of {ENGINES}")
+        if cfg.engine == "python" and isinstance(problem, CompactTSPProblem):
+            raise ValueError("the python engine needs a dense TSPProblem")
+        if cfg.variant not in VARIANTS:
+            raise ValueError(f"variant must be one of {VARIANTS}")
+        if cfg.local_search not in LOCAL_SEARCH_METHODS:
+            raise ValueError(f"local_search must be one of {LOCAL_SEARCH_METHODS}")
+        if cfg.ls_scope not in ("best", "all"):
+            raise ValueError("ls_scope must be 'best' or 'all'")
+        if cfg.sampler not in SAMPLERS:
+            raise ValueError(f"sampler must be one of {SAMPLERS}")
+        if cfg.stagnation not in STAGNATION_MEASURES:
+            raise ValueError(f"stagnation must be one of {STAGNATION_MEASURES}")
+        if cfg.history not in HISTORY_MODES:
+            raise ValueError(f"history must be one of {HISTORY_MODES}")
+        if cfg.workers > 1 and cfg.engine == "python":
+            raise ValueError("parallel construction needs the numpy or batched engine")
         self.problem = problem
         self.cfg = cfg
+        self.rng = np.random.default_rng(cfg.seed)
+        if cfg.engine == "python" and cfg.seed is not None:
+            # the python engine draws from the random module; without this a seeded run would
+            # depend on whatever used it before (e.g. the previous job of a pool worker)
+            random.seed(cfg.seed)
         n = problem.n
-        self.pher = [[cfg.tau0] * n for _ in range(n)]
+        self.tau0 = cfg.tau0
+        self.tau_min = 0.0
+        self.tau_max = float("inf")
+        if cfg.variant == "mmas":
+            # initial trails at the tau_max estimate from a nearest-neighbour tour
+            self.tau0 = self.tau_max = cfg.deposit_q / (cfg.rho * nearest_neighbour_length(problem))
+            self.tau_min = self._mmas_tau_min(self.tau_max)
+        elif cfg.variant == "acs":
+            self.tau0 = 1.0 / (n * nearest_neighbour_length(problem))
+        self.cand: Optional[np.ndarray] = None
+        self.cand_lists: Optional[List[List[int]]] = None
+        if cfg.n_candidates > 0:
+            self.cand = problem.candidate_lists(cfg.n_candidates)
+            self.cand_lists = self.cand.tolist()
+        self.pher = make_pheromone(problem, self.cand, self.tau0)
+        self.ls_neighbors: Optional[List[List[int]]] = None
+        if cfg.local_search != "none":
+            self.ls_neighbors = problem.candidate_lists(cfg.ls_neighbors).tolist()
         self.best_tour: List[int] = []
         self.best_length: float = float("inf")
-        self.best_history: List[float] = []
+        self.history = History(
+            max(cfg.T, 1), cfg.history, cfg.history_points, seed=None if cfg.seed is None else [cfg.seed, 1]
+        )
+        # statistics of the last iteration, as passed to the callback and yielded by iterate()
+        self.stats: Dict[str, Any] = {}
+        self.reason: Optional[str] = None
+        # time spent before the last resume
+        self.elapsed_s = 0.0
+        self.iteration = 0
+        self.last_improvement = 0
+        # unlike last_improvement, not moved by MMAS re-initializations
+        self.best_iteration = 0
+        self.evaluations = 0
+        self.colony: Optional[ParallelColony] = None
+        self.parallel_seed: Optional[int] = None
+        self.writer: Optional[CheckpointWriter] = None
+        self.sampler = Sampler(cfg.sampler, timed=cfg.profile)
+        self.profiler: Optional[Profiler] = None
+        if cfg.profile:
+            self.profiler = Profiler(
+                max(cfg.T, 1), cfg.history, cfg.history_points, seed=None if cfg.seed is None else [cfg.seed, 2]
+            )
+        # called after every iteration with its statistics (and profile row, if enabled)
+        self.callback = callback
 
-    def step(self) -> Tuple[List[AntResult], AntResult]:
+    def _phase(self, name: str) -> Any:
+        return self.profiler.phase(name) if self.profiler is not None else NO_PHASE
+
+    def _construct_sequential(
+        self, choice: Optional[np.ndarray], cand_choice: Optional[np.ndarray]
+    ) -> List[List[int]]:
         cfg = self.cfg
         p = self.problem
+        pher = self.pher.values().tolist() if choice is None else None
+        tours: List[List[int]] = []
+        for _ in range(cfg.m):
+            if choice is None:
+                tour = construct_tour(
+                    n=p.n,
+                    dist=p.dist,
+                    pher=pher,
+                    alpha=cfg.alpha,
+                    beta=cfg.beta,
+                    p_random=cfg.p_random,
+                    candidate_lists=self.cand_lists,
+                    q0=self.q0,
+                    sampler=self.sampler,
+                )
+            else:
+                tour = construct_tour_np(
+                    n=p.n,
+                    choice=choice,
+                    p_random=cfg.p_random,
+                    rng=self.rng,
+                    cand=self.cand,
+                    cand_choice=cand_choice,
+                    q0=self.q0,
+                    sampler=self.sampler,
+                )
+            tours.append(tour)
+            if cfg.variant == "acs":
+                self._acs_local_update(tour, pher, choice, cand_choice)
+        return tours
 
-        ants: List[AntResult] = []
-        iter_best: Optional[AntResult] = None
+    def _construct_batched(
+        self, choice: np.ndarray, cand_choice: Optional[np.ndarray]
+    ) -> np.ndarray:
+        cfg = self.cfg
+        p = self.problem
+        tours = construct_tours_batched(
+            m=cfg.m,
+            n=p.n,
+            choice=choice,
+            p_random=cfg.p_random,
+            rng=self.rng,
+            cand=self.cand,
+            cand_choice=cand_choice,
+            q0=self.q0,
+            sampler=self.sampler,
+        )
+        return self._finish_batch(tours)
 
-        for _ in range(cfg.m):
-            tour = construct_tour(
-                n=p.n,
-                dist=p.dist,
-                pher=self.pher,
-                alpha=cfg.alpha,
-                beta=cfg.beta,
-                p_random=cfg.p_random,
-            )
+    def _parallel_colony(self) -> ParallelColony:
+        if self.colony is None:
+            cfg = self.cfg
+            settings = {
+                "n": self.problem.n,
+                "alpha": cfg.alpha,
+                "beta": cfg.beta,
+                "p_random": cfg.p_random,
+                "q0": self.q0,
+                "engine": cfg.engine,
+                "sampler": cfg.sampler,
+                "profile": cfg.profile,
+                "seed": self._parallel_seed(),
+                "candidate_pheromone": not self.pher.dense,
+            }
+            self.colony = ParallelColony(self.problem, cfg.m, cfg.workers, settings, self.cand, self.pher.raw.shape)
+            shared = self.colony.pher_buffer
+            if shared is not None:
+                # compact problems: workers read the pheromone matrix itself
+                shared[:] = self.pher.raw
+                self.pher.raw = shared
+        return self.colony
+
+    def _construct_parallel(
+        self, choice: np.ndarray, cand_choice: Optional[np.ndarray]
+    ) -> np.ndarray:
+        colony = self._parallel_colony()
+        rest = 0.0 if self.pher.dense else self.pher.rest
+        tours = colony.construct(self.iteration, choice, cand_choice, self.pher.scale, rest, self.sampler)
+        return self._finish_batch(tours)
+
+    def _finish_batch(self, tours: np.ndarray) -> np.ndarray:
+        if self.cfg.variant == "acs":
+            # ants built together: the local update is applied once the whole colony has finished
+            for tour in tours:
+                self.pher.blend(tour, self.cfg.xi, self.tau0)
+        return tours
+
+    def _evaluate(self, tours: List[List[int]] | np.ndarray) -> List[AntResult]:
+        p = self.problem
+        if isinstance(tours, np.ndarray):
+            lengths = p.tour_lengths(tours)
+            return [AntResult(tour=t, length=float(l)) for t, l in zip(tours.tolist(), lengths)]
+        return [AntResult(tour=t, length=p.tour_length(t, close_cycle=True)) for t in tours]
+
+    def _parallel_seed(self) -> int:
+        if self.parallel_seed is None:
+            cfg = self.cfg
+            self.parallel_seed = cfg.seed if cfg.seed is not None else int(self.rng.integers(2**63))
+        return self.parallel_seed
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        if self.colony is not None:
+            if self.colony.pher_buffer is not None:
+                self.pher.raw = self.pher.raw.copy()
+            self.colony.close()
+            self.colony = None
+
+    def __enter__(self) -> "ACOSolver":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    @property
+    def q0(self) -> float:
+        return self.cfg.q0 if self.cfg.variant == "acs" else 0.0
+
+    def _mmas_tau_min(self, tau_max: float) -> float:
+        n = self.problem.n
+        p_dec = self.cfg.mmas_p_best ** (1.0 / n)
+        avg = max(n / 2.0, 2.0)
+        return tau_max * (1.0 - p_dec) / ((avg - 1.0) * p_dec)
+
+    def _build_choice(self) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        cfg = self.cfg
+        p = self.problem
+        if cfg.engine == "python":
+            return None, None
+
+        eta = p.heuristic(cfg.beta)
+        if isinstance(eta, np.ndarray):
+            choice = self.pher.values() ** cfg.alpha * eta
+        else:
+            # compact problems: choice rows are built on demand and shared by the ants
+            pher = self.pher
+            choice = RowCache(p.n, lambda i: pher[i] ** cfg.alpha * eta.row(i), p.cache_rows)
+        cand_choice = None
+        if self.cand is not None:
+            tau = self.pher.candidate_values(self.cand)
+            cand_choice = tau ** cfg.alpha * p.candidate_heuristic(cfg.n_candidates, cfg.beta)
+        self.sampler.reset(cfg.m)
+        return choice, cand_choice
+
+    def _acs_local_update(
+        self,
+        tour: List[int],
+        pher: Optional[List[List[float]]],
+        choice: Optional[np.ndarray],
+        cand_choice: Optional[np.ndarray],
+    ) -> None:
+        # the ants that follow in this iteration see the locally evaporated trails
+        cfg = self.cfg
+        p = self.problem
+        self.pher.blend(tour, cfg.xi, self.tau0)
+        src = np.asarray(tour, dtype=np.intp)
+        dst = np.roll(src, -1)
+        self.sampler.invalidate(tour)
+        if pher is not None:
+            for i, j in zip(src.tolist(), dst.tolist()):
+                pher[i][j] = pher[j][i] = float(self.pher.raw[i, j] * self.pher.scale)
+            return
+        if isinstance(choice, RowCache):
+            choice.invalidate(np.concatenate([src, dst]))
+        else:
+            eta = p.heuristic(cfg.beta)
+            for a, b in ((src, dst), (dst, src)):
+                choice[a, b] = (self.pher.raw[a, b] * self.pher.scale) ** cfg.alpha * eta[a, b]
+        if cand_choice is not None:
+            rows = np.unique(np.concatenate([src, dst]))
+            tau = self.pher.candidate_values(self.cand, rows)
+            cand_eta = p.candidate_heuristic(cfg.n_candidates, cfg.beta)[rows]
+            cand_choice[rows] = tau ** cfg.alpha * cand_eta
+
+    def _local_search(self, ants: List[AntResult]) -> None:
+        cfg = self.cfg
+        p = self.problem
+        if cfg.ls_scope == "all":
+            targets = ants
+        else:
+            targets = [min(ants, key=lambda a: a.length)]
+        dist = p.distance_fn() if isinstance(p, CompactTSPProblem) else p.dist
+        for ant in targets:
+            tour = improve_tour(ant.tour, dist, self.ls_neighbors, cfg.local_search)
             length = p.tour_length(tour, close_cycle=True)
-            ar = AntResult(tour=tour, length=length)
-            ants.append(ar)
-            if iter_best is None or ar.length < iter_best.length:
-                iter_best = ar
+            if length < ant.length:
+                ant.tour = tour
+                ant.length = length
 
-        assert iter_best is not None
+    def _update_pheromone(self, ants: List[AntResult], iter_best: AntResult) -> None:
+        cfg = self.cfg
+        q = cfg.deposit_q
+
+        if cfg.variant == "acs":
+            # global update on the best-so-far tour only
+            with self._phase("deposit"):
+                self.pher.blend(self.best_tour, cfg.rho, q / self.best_length)
+            return
+
+        with self._phase("evaporation"):
+            self.pher.evaporate(cfg.rho)
+        with self._phase("deposit"):
+            self._deposit(ants, iter_best)
+
+    def _deposit(self, ants: List[AntResult], iter_best: AntResult) -> None:
+        cfg = self.cfg
+        q = cfg.deposit_q
+        if cfg.variant == "as":
+            self.pher.deposit(np.array([ant.tour for ant in ants]), [q / ant.length for ant in ants])
+        elif cfg.variant == "rank":
+            w = cfg.rank_w
+            ranked = sorted(ants, key=lambda a: a.length)[: max(w - 1, 0)]
+            tours = [ant.tour for ant in ranked] + [self.best_tour]
+            amounts = [(w - r) * q / ant.length for r, ant in enumerate(ranked, start=1)]
+            amounts.append(w * q / self.best_length)
+            self.pher.deposit(np.array(tours), amounts)
+        else:
+            k = cfg.mmas_gb_every
+            use_global = k > 0 and self.iteration % k == 0
+            tour, length = (self.best_tour, self.best_length) if use_global else (iter_best.tour, iter_best.length)
+            self.pher.deposit(np.array([tour]), [q / length])
+
+            self.tau_max = q / (cfg.rho * self.best_length)
+            self.tau_min = self._mmas_tau_min(self.tau_max)
+            if self.iteration - self.last_improvement >= cfg.mmas_stagnation:
+                self.pher.reset(self.tau_max)
+                self.last_improvement = self.iteration
+            else:
+                self.pher.clamp(self.tau_min, self.tau_max)
+
+    def step(self) -> Tuple[List[AntResult], AntResult]:
+        cfg = self.cfg
+        self.iteration += 1
 
-        evap = 1.0 - cfg.rho
-        n = p.n
-        for i in range(n):
-            row = self.pher[i]
-            for j in range(n):
-                row[j] *= evap
+        with self._phase("choice"):
+            choice, cand_choice = self._build_choice()
+        with self._phase("construction"):
+            if cfg.workers > 1:
+                tours = self._construct_parallel(choice, cand_choice)
+            elif cfg.engine == "batched":
+                tours = self._construct_batched(choice, cand_choice)
+            else:
+                tours = self._construct_sequential(choice, cand_choice)
+        with self._phase("evaluation"):
+            ants = self._evaluate(tours)
+        self.evaluations += len(ants)
 
-        for ant in ants:
-            delta = cfg.deposit_q / ant.length
-            tour = ant.tour
+        if cfg.local_search != "none":
+            with self._phase("local_search"):
+                self._local_search(ants)
 
-            for k in range(len(tour) - 1):
-                i, j = tour[k], tour[k + 1]
-                self.pher[i][j] += delta
-                self.pher[j][i] += delta
+        iter_best: Optional[AntResult] = None
+        for ar in ants:
+            if iter_best is None or ar.length < iter_best.length:
+                iter_best = ar
 
-            i, j = tour[-1], tour[0]
-            self.pher[i][j] += delta
-            self.pher[j][i] += delta
+        assert iter_best is not None
 
         if iter_best.length < self.best_length:
             self.best_length = iter_best.length
             self.best_tour = list(iter_best.tour)
+            self.last_improvement = self.iteration
+            self.best_iteration = self.iteration
+
+        self._update_pheromone(ants, iter_best)
+
+        lengths = [a.length for a in ants]
+        mean = sum(lengths) / len(lengths)
+        worst = max(lengths)
+        self.history.append(self.iteration, (self.best_length, iter_best.length, mean, worst))
 
-        self.best_history.append(self.best_length)
+        self.stats = {
+            "iter": self.iteration,
+            "best_length": self.best_length,
+            "iter_best": iter_best.length,
+            "iter_mean": mean,
+            "iter_worst": worst,
+            "evaluations": self.evaluations,
+        }
+        if self.profiler is not None:
+            self.stats.update(self.profiler.end_iteration(self.iteration, self.sampler))
+        if self.callback is not None:
+            self.callback(self.stats)
         return ants, iter_best
 
-    def solve(self) -> ACOResult:
-        t0 = time.perf_counter()
+    def immigrate(self, tour: List[int], length: float) -> bool:
+        # a tour from another colony: adopted as best-so-far and reinforced when it beats ours
+        if length >= self.best_length:
+            return False
+        cfg = self.cfg
+        self.best_tour = list(tour)
+        self.best_length = length
+        self.last_improvement = self.best_iteration = self.iteration
+        if cfg.variant == "acs":
+            self.pher.blend(self.best_tour, cfg.rho, cfg.deposit_q / length)
+            return True
+        self.pher.deposit(np.array([self.best_tour]), [cfg.deposit_q / length])
+        if cfg.variant == "mmas":
+            self.tau_max = cfg.deposit_q / (cfg.rho * length)
+            self.tau_min = self._mmas_tau_min(self.tau_max)
+            self.pher.clamp(self.tau_min, self.tau_max)
+        return True
+
+    def mix_pheromone(self, values: np.ndarray, weight: float) -> None:
+        # tau = (1 - weight) * tau + weight * values, in place (the matrix may be shared); with
+        # candidate trails the level of the other edges is kept, it only differs between
+        # islands through MMAS clamping
+        raw = self.pher.raw
+        raw *= 1.0 - weight
+        raw += (weight / self.pher.scale) * values
+        if self.cfg.variant == "mmas":
+            self.pher.clamp(self.tau_min, self.tau_max)
+
+    @property
+    def best_history(self) -> List[float]:
+        return self.history.column("best_length").tolist()
+
+    def stop_reason(self, elapsed_s: float) -> Optional[str]:
+        cfg = self.cfg
+        if cfg.target_length is not None and self.best_length <= cfg.target_length:
+            return "target_length"
+        if cfg.time_limit_s > 0.0 and elapsed_s >= cfg.time_limit_s:
+            return "time_limit"
+        if cfg.max_evals > 0 and self.evaluations >= cfg.max_evals:
+            return "max_evals"
+        if cfg.patience > 0 and self.iteration - self.best_iteration >= cfg.patience:
+            return "patience"
+        if cfg.stagnation != "none" and self.iteration % cfg.stagnation_every == 0:
+            measure = stagnation_measure(cfg.stagnation, self.pher.raw, cfg.stagnation_lambda, self.pher.dense)
+            if measure < cfg.stagnation_threshold:
+                return "stagnation"
+        if self.iteration >= cfg.T:
+            return "max_iterations"
+        return None
+
+    def state_dict(self, copy_pheromone: bool = True) -> Dict[str, np.ndarray]:
+        # everything needed to continue the run exactly; arrays are copies, so the snapshot
+        # can be written while the solver moves on (the trails only with copy_pheromone)
+        return {
+            "n": np.array(self.problem.n),
+            "config": encode(dataclasses.asdict(self.cfg)),
+            "pher_raw": self.pher.raw.copy() if copy_pheromone else self.pher.raw,
+            "pher_scale": np.array(self.pher.scale),
+            "pher_rest": np.array(np.nan if self.pher.dense else self.pher.rest),
+            "tau": np.array([self.tau0, self.tau_min, self.tau_max]),
+            "best_tour": np.array(self.best_tour, dtype=np.int64),
+            "best_length": np.array(self.best_length),
+            **self.history.state_dict(),
+            "counters": np.array(
+                [self.iteration, self.last_improvement, self.best_iteration, self.evaluations], dtype=np.int64
+            ),
+            "elapsed_s": np.array(self.elapsed_s),
+            "parallel_seed": np.array(-1 if self.parallel_seed is None else self.parallel_seed, dtype=np.int64),
+            "rng_state": encode(self.rng.bit_generator.state),
+            # the python engine draws from the random module
+            "py_random_state": encode(random.getstate()),
+        }
+
+    def load_state(self, state: Dict[str, np.ndarray]) -> None:
+        if int(state["n"]) != self.problem.n:
+            raise ValueError("checkpoint was saved for a problem of a different size")
+        saved = decode(state["config"])
+        current = dataclasses.asdict(self.cfg)
+        changed = sorted(k for k in current if k not in RESUMABLE_FIELDS and saved.get(k) != current[k])
+        if changed:
+            raise ValueError(f"checkpoint was saved with a different configuration: {', '.join(changed)}")
+        if state["pher_raw"].shape != self.pher.raw.shape:
+            raise ValueError("checkpoint was saved with a different pheromone layout (candidate lists)")
+        self.pher.raw[...] = state["pher_raw"]
+        self.pher.scale = float(state["pher_scale"])
+        if not self.pher.dense:
+            self.pher.rest = float(state["pher_rest"])
+        self.tau0, self.tau_min, self.tau_max = (float(v) for v in state["tau"])
+        self.best_tour = state["best_tour"].tolist()
+        self.best_length = float(state["best_length"])
+        self.history.load_state(state)
+        self.iteration, self.last_improvement, self.best_iteration, self.evaluations = (
+            int(v) for v in state["counters"]
+        )
+        self.elapsed_s = float(state["elapsed_s"])
+        seed = int(state["parallel_seed"])
+        self.parallel_seed = None if seed < 0 else seed
+        self.rng.bit_generator.state = decode(state["rng_state"])
+        version, internal, gauss = decode(state["py_random_state"])
+        random.setstate((version, tuple(internal), gauss))
 
-        iter_best: List[float] = []
-        iter_mean: List[float] = []
-        iter_worst: List[float] = []
+    def load_checkpoint(self, path: str) -> None:
+        self.load_state(load_checkpoint(path))
 
-        for _ in range(self.cfg.T):
-            ants, _ = self.step()
-            lengths = [a.length for a in ants]
-            iter_best.append(min(lengths))
-            iter_mean.append(sum(lengths) / len(lengths))
-            iter_worst.append(max(lengths))
+    def _checkpoint(self) -> None:
+        if self.writer is None:
+            self.writer = CheckpointWriter(self.cfg.checkpoint_path)
+        # the trails are copied into a buffer owned by the writer instead of a fresh array
+        self.writer.submit(self.state_dict(copy_pheromone=False), copies=("pher_raw",))
 
-        elapsed = time.perf_counter() - t0
+    def iterate(self) -> Iterator[Dict[str, Any]]:
+        # runs the solver, yielding the statistics of every iteration as soon as it is done;
+        # the last one carries the stop reason ("stop_reason" is None before that)
+        cfg = self.cfg
+        t0 = time.perf_counter() - self.elapsed_s
+        saving = cfg.checkpoint_path is not None and cfg.checkpoint_every > 0
+
+        if self.iteration > 0 or cfg.T <= 0:
+            # resumed run: it may already be over
+            self.reason = self.stop_reason(self.elapsed_s)
+        else:
+            self.reason = None
+        try:
+            while self.reason is None:
+                self.step()
+                self.elapsed_s = time.perf_counter() - t0
+                self.reason = self.stop_reason(self.elapsed_s)
+                if saving and (self.reason is not None or self.iteration % cfg.checkpoint_every == 0):
+                    self._checkpoint()
+                yield {**self.stats, "elapsed_s": self.elapsed_s, "stop_reason": self.reason}
+        finally:
+            self.close()
 
+    def result(self) -> ACOResult:
+        hist = self.history.as_lists()
         return ACOResult(
             best_tour=self.best_tour,
             best_length=self.best_length,
-            best_history=self.best_history,
-            elapsed_s=elapsed,
-            iter_best=iter_best,
-            iter_mean=iter_mean,
-            iter_worst=iter_worst,
-        )
\ No newline at end of file
+            best_history=hist["best_length"],
+            elapsed_s=self.elapsed_s,
+            iter_best=hist["iter_best"],
+            iter_mean=hist["iter_mean"],
+            iter_worst=hist["iter_worst"],
+            history_iters=hist["iters"],
+            sampling_s=self.sampler.elapsed_s if self.profiler is not None else None,
+            profile=self.profiler.history if self.profiler is not None else None,
+            profile_totals=self.profiler.totals() if self.profiler is not None else None,
+            stop_reason=self.reason or "max_iterations",
+            iterations=self.iteration,
+            evaluations=self.evaluations,
+        )
+
+    def solve(self) -> ACOResult:
+        for _ in self.iterate():
+            pass
+        return self.result()
+
+def pheromone_shape(problem: TSPProblem | CompactTSPProblem, n_candidates: int) -> Tuple[int, int]:
+    # layout of the trails of a solver: (n, k) on the candidate edges of compact problems,
+    # a dense (n, n) matrix otherwise
+    if isinstance(problem, CompactTSPProblem) and n_candidates > 0:
+        return problem.candidate_lists(n_candidates).shape
+    return problem.n, problem.n
+
+def make_pheromone(
+    problem: TSPProblem | CompactTSPProblem, cand: Optional[np.ndarray], tau0: float
+) -> PheromoneMatrix:
+    if isinstance(problem, CompactTSPProblem):
+        if cand is not None:
+            return CandidatePheromone(cand, tau0, dtype=problem.dtype)
+        if dense_bytes(problem.n, problem.dtype) > DENSE_LIMIT_BYTES:
+            raise ValueError(
+                f"a dense pheromone matrix for {problem.n} cities exceeds {DENSE_LIMIT_BYTES >> 20} MiB;"
+                " use candidate lists (n_candidates > 0) with compact problems this large"
+            )
+    return PheromoneMatrix(problem.n, tau0, dtype=problem.dtype)
+
+def nearest_neighbour_length(problem: TSPProblem | CompactTSPProblem) -> float:
+    n = problem.n
+    unvisited = np.ones(n, dtype=bool)
+    tour = [0]
+    unvisited[0] = False
+    for _ in range(n - 1):
+        row = np.asarray(problem.dist[tour[-1]], dtype=np.float64)
+        nxt = int(np.argmin(np.where(unvisited, row, np.inf)))
+        tour.append(nxt)
+        unvisited[nxt] = False
+    return problem.tour_length(tour, close_cycle=True)
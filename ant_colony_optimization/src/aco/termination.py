@@ -0,0 +1,53 @@
+from __future__ import annotations
+from typing import Iterator
+
+import numpy as np
+
+STAGNATION_MEASURES = ("none", "branching", "entropy")
+
+# values of ACOResult.stop_reason
+STOP_REASONS = ("max_iterations", "time_limit", "max_evals", "patience", "stagnation", "target_length")
+
+def _row_blocks(values: np.ndarray, dense: bool = True) -> Iterator[np.ndarray]:
+    # float64 copies of a few rows at a time with the diagonal masked out (nan); trails on
+    # candidate edges (dense=False) have no diagonal
+    n = values.shape[0]
+    block = max(1, (1 << 22) // max(values.shape[1], 1))
+    for lo in range(0, n, block):
+        hi = min(n, lo + block)
+        v = np.array(values[lo:hi], dtype=np.float64)
+        if dense:
+            v[np.arange(hi - lo), np.arange(lo, hi)] = np.nan
+        yield v
+
+def branching_factor(values: np.ndarray, lam: float = 0.05, dense: bool = True) -> float:
+    # average lambda-branching factor: per city, the number of edges whose trail is at least
+    # tau_min + lam * (tau_max - tau_min) of that city; about 2 once the colony has converged
+    total = 0
+    for v in _row_blocks(values, dense):
+        lo = np.nanmin(v, axis=1, keepdims=True)
+        hi = np.nanmax(v, axis=1, keepdims=True)
+        with np.errstate(invalid="ignore"):
+            total += int((v >= lo + lam * (hi - lo)).sum())
+    return total / values.shape[0]
+
+def pheromone_entropy(values: np.ndarray, dense: bool = True) -> float:
+    # average perplexity exp(H) of the per-city trail distributions: the effective number of
+    # edges leaving a city, on the same scale as branching_factor
+    total = 0.0
+    for v in _row_blocks(values, dense):
+        v = np.nan_to_num(v)
+        p = v / v.sum(axis=1, keepdims=True)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            h = -np.where(p > 0.0, p * np.log(p), 0.0).sum(axis=1)
+        total += float(np.exp(h).sum())
+    return total / values.shape[0]
+
+def stagnation_measure(measure: str, values: np.ndarray, lam: float = 0.05, dense: bool = True) -> float:
+    # both measures are scale invariant, so the raw (lazily evaporated) trails can be passed;
+    # with dense=False they are measured over the (n, k) candidate edges
+    if measure == "branching":
+        return branching_factor(values, lam, dense)
+    if measure == "entropy":
+        return pheromone_entropy(values, dense)
+    raise ValueError(f"stagnation must be one of {STAGNATION_MEASURES}")
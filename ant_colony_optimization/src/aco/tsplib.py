@@ -0,0 +1,271 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import hashlib
+import os
+
+import numpy as np
+
+from .io import Node, load_nodes
+from .problem import TSPProblem, build_problem
+
+# bump when the on-disk cache layout or a metric implementation changes
+CACHE_VERSION = 2
+
+# TSPLIB defines GEO distances with this truncated value of pi, not math.pi
+GEO_PI = 3.141592
+
+COORD_METRICS = ("EUC_2D", "CEIL_2D", "ATT", "GEO")
+EXPLICIT_FORMATS = (
+    "FULL_MATRIX",
+    "UPPER_ROW",
+    "LOWER_ROW",
+    "UPPER_DIAG_ROW",
+    "LOWER_DIAG_ROW",
+    "UPPER_COL",
+    "LOWER_COL",
+    "UPPER_DIAG_COL",
+    "LOWER_DIAG_COL",
+)
+# plain "label x y" files use unrounded Euclidean distances, like build_problem
+PLAIN_METRIC = "EUC_FLOAT"
+
+@dataclass
+class TSPLIBInstance:
+    name: str
+    dimension: int
+    edge_weight_type: str
+    edge_weight_format: str = ""
+    spec: Dict[str, str] = field(default_factory=dict)
+    node_ids: Optional[np.ndarray] = None
+    coords: Optional[np.ndarray] = None
+    display: Optional[np.ndarray] = None
+    weights: Optional[np.ndarray] = None
+
+    @property
+    def metric(self) -> str:
+        if self.edge_weight_type == "EXPLICIT":
+            return f"EXPLICIT-{self.edge_weight_format}"
+        return self.edge_weight_type
+
+def is_tsplib(path: str | Path) -> bool:
+    path = Path(path)
+    if path.suffix.lower() in (".tsp", ".vrp", ".atsp"):
+        return True
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                return ":" in line or line.upper().endswith("_SECTION")
+    return False
+
+def _is_number(token: str) -> bool:
+    try:
+        float(token)
+    except ValueError:
+        return False
+    return True
+
+def parse_tsplib(path: str | Path) -> TSPLIBInstance:
+    spec: Dict[str, str] = {}
+    sections: Dict[str, List[List[str]]] = {}
+    current: Optional[str] = None
+
+    with Path(path).open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line == "EOF":
+                break
+            tokens = line.split()
+            if current is not None and _is_number(tokens[0]):
+                sections[current].append(tokens)
+            elif ":" in line and not line.split(":", 1)[0].strip().upper().endswith("_SECTION"):
+                key, value = line.split(":", 1)
+                spec[key.strip().upper()] = value.strip()
+                current = None
+            else:
+                current = line.split(":", 1)[0].strip().upper()
+                sections[current] = []
+
+    if "DIMENSION" not in spec:
+        raise ValueError(f"Brak DIMENSION w pliku: {path}")
+    n = int(spec["DIMENSION"])
+    inst = TSPLIBInstance(
+        name=spec.get("NAME", Path(path).stem),
+        dimension=n,
+        edge_weight_type=spec.get("EDGE_WEIGHT_TYPE", "EUC_2D").upper(),
+        edge_weight_format=spec.get("EDGE_WEIGHT_FORMAT", "").upper(),
+        spec=spec,
+    )
+
+    if "NODE_COORD_SECTION" in sections:
+        rows = sections["NODE_COORD_SECTION"][:n]
+        inst.node_ids = np.array([int(r[0]) for r in rows], dtype=np.int64)
+        inst.coords = np.array([[float(r[1]), float(r[2])] for r in rows], dtype=np.float64)
+    if "DISPLAY_DATA_SECTION" in sections:
+        rows = sections["DISPLAY_DATA_SECTION"][:n]
+        inst.display = np.array([[float(r[1]), float(r[2])] for r in rows], dtype=np.float64)
+        if inst.node_ids is None:
+            inst.node_ids = np.array([int(r[0]) for r in rows], dtype=np.int64)
+    if "EDGE_WEIGHT_SECTION" in sections:
+        values = np.array([float(t) for r in sections["EDGE_WEIGHT_SECTION"] for t in r], dtype=np.float64)
+        inst.weights = _explicit_matrix(values, n, inst.edge_weight_format)
+
+    if inst.node_ids is None:
+        inst.node_ids = np.arange(1, n + 1, dtype=np.int64)
+    if inst.edge_weight_type == "EXPLICIT":
+        if inst.weights is None:
+            raise ValueError(f"Brak EDGE_WEIGHT_SECTION w pliku: {path}")
+    elif inst.edge_weight_type in COORD_METRICS:
+        if inst.coords is None:
+            raise ValueError(f"Brak NODE_COORD_SECTION w pliku: {path}")
+    else:
+        raise ValueError(f"Nieobsługiwany EDGE_WEIGHT_TYPE: {inst.edge_weight_type}")
+    return inst
+
+def _explicit_matrix(values: np.ndarray, n: int, fmt: str) -> np.ndarray:
+    if fmt == "FULL_MATRIX":
+        return values[: n * n].reshape(n, n).copy()
+    if fmt not in EXPLICIT_FORMATS:
+        raise ValueError(f"Nieobsługiwany EDGE_WEIGHT_FORMAT: {fmt}")
+
+    # column-wise formats are the row-wise ones of the transposed triangle
+    fmt = {
+        "UPPER_COL": "LOWER_ROW",
+        "LOWER_COL": "UPPER_ROW",
+        "UPPER_DIAG_COL": "LOWER_DIAG_ROW",
+        "LOWER_DIAG_COL": "UPPER_DIAG_ROW",
+    }.get(fmt, fmt)
+    diag = "DIAG" in fmt
+    if fmt.startswith("UPPER"):
+        rows, cols = np.triu_indices(n, k=0 if diag else 1)
+    else:
+        rows, cols = np.tril_indices(n, k=0 if diag else -1)
+    w = np.zeros((n, n), dtype=np.float64)
+    w[rows, cols] = values[: len(rows)]
+    w[cols, rows] = values[: len(rows)]
+    return w
+
+def _nint(x: np.ndarray) -> np.ndarray:
+    return np.floor(x + 0.5)
+
+def _geo_radians(coords: np.ndarray) -> np.ndarray:
+    deg = np.trunc(coords)
+    return GEO_PI * (deg + 5.0 * (coords - deg) / 3.0) / 180.0
+
+def _row_block_fn(inst: TSPLIBInstance) -> Callable[[int, int], np.ndarray]:
+    t = inst.edge_weight_type
+    if t == "EXPLICIT":
+        return lambda lo, hi: inst.weights[lo:hi]
+
+    xy = inst.coords
+    if t == "GEO":
+        rad = _geo_radians(xy)
+
+        def geo(lo: int, hi: int) -> np.ndarray:
+            lat, lon = rad[lo:hi, 0, None], rad[lo:hi, 1, None]
+            q1 = np.cos(lon - rad[None, :, 1])
+            q2 = np.cos(lat - rad[None, :, 0])
+            q3 = np.cos(lat + rad[None, :, 0])
+            arg = np.clip(0.5 * ((1.0 + q1) * q2 - (1.0 - q1) * q3), -1.0, 1.0)
+            d = np.trunc(6378.388 * np.arccos(arg) + 1.0)
+            d[np.arange(hi - lo), np.arange(lo, hi)] = 0.0
+            return d
+        return geo
+
+    def euclid(lo: int, hi: int) -> np.ndarray:
+        dx = xy[lo:hi, 0, None] - xy[None, :, 0]
+        dy = xy[lo:hi, 1, None] - xy[None, :, 1]
+        if t == "ATT":
+            r = np.sqrt((dx * dx + dy * dy) / 10.0)
+            tij = _nint(r)
+            return np.where(tij < r, tij + 1.0, tij)
+        d = np.hypot(dx, dy)
+        if t == "EUC_2D":
+            return _nint(d)
+        if t == "CEIL_2D":
+            return np.ceil(d)
+        return d
+    return euclid
+
+def _write_matrix(path: Path, n: int, block_fn: Callable[[int, int], np.ndarray]) -> None:
+    # rows are written block by block straight into the .npy file, then moved into place
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    out = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float64, shape=(n, n))
+    block = max(1, (1 << 22) // max(n, 1))
+    for lo in range(0, n, block):
+        hi = min(n, lo + block)
+        out[lo:hi] = block_fn(lo, hi)
+    out.flush()
+    del out
+    os.replace(tmp, path)
+
+def file_digest(path: str | Path) -> str:
+    h = hashlib.sha256()
+    with Path(path).open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def cached_distance_matrix(
+    path: str | Path,
+    metric: str,
+    n: int,
+    block_fn: Callable[[int, int], np.ndarray],
+    cache_dir: str | Path,
+) -> np.ndarray:
+    # read-only memory map, so concurrent processes share the same page-cache pages
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    digest = file_digest(path)
+    key = hashlib.sha256(f"{digest}:{metric}:{CACHE_VERSION}".encode()).hexdigest()[:20]
+    cache_path = cache_dir / f"{Path(path).stem}-{metric}-{key}.npy"
+    if not cache_path.exists():
+        _write_matrix(cache_path, n, block_fn)
+    return np.load(cache_path, mmap_mode="r")
+
+def distance_matrix(inst: TSPLIBInstance) -> np.ndarray:
+    out = np.empty((inst.dimension, inst.dimension), dtype=np.float64)
+    out[:] = _row_block_fn(inst)(0, inst.dimension)
+    return out
+
+def _nodes(inst: TSPLIBInstance) -> List[Node]:
+    xy = inst.coords if inst.coords is not None else inst.display
+    if xy is None:
+        xy = np.zeros((inst.dimension, 2), dtype=np.float64)
+    return [
+        Node(idx=i, label=int(label), x=float(x), y=float(y))
+        for i, (label, (x, y)) in enumerate(zip(inst.node_ids, xy))
+    ]
+
+def load_tsplib_problem(path: str | Path, cache_dir: Optional[str | Path] = None) -> TSPProblem:
+    inst = parse_tsplib(path)
+    if cache_dir is None:
+        dist = distance_matrix(inst)
+    else:
+        dist = cached_distance_matrix(path, inst.metric, inst.dimension, _row_block_fn(inst), cache_dir)
+    return TSPProblem(nodes=_nodes(inst), dist=dist)
+
+def load_problem(
+    path: str | Path,
+    cache_dir: Optional[str | Path] = None,
+    n_candidates: int = 0,
+) -> TSPProblem:
+    # TSPLIB/CVRPLIB files or plain "label x y" files, optionally with the distance cache
+    if is_tsplib(path):
+        problem = load_tsplib_problem(path, cache_dir)
+    elif cache_dir is None:
+        return build_problem(load_nodes(path), n_candidates=n_candidates)
+    else:
+        nodes = load_nodes(path)
+        xy = np.array([[nd.x, nd.y] for nd in nodes], dtype=np.float64).reshape(-1, 2)
+        plain = TSPLIBInstance(name=Path(path).stem, dimension=len(nodes), edge_weight_type=PLAIN_METRIC, coords=xy)
+        dist = cached_distance_matrix(path, PLAIN_METRIC, len(nodes), _row_block_fn(plain), cache_dir)
+        problem = TSPProblem(nodes=nodes, dist=dist)
+    if n_candidates > 0:
+        problem.candidate_lists(n_candidates)
+    return problem
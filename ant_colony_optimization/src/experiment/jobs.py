@@ -0,0 +1,123 @@
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, replace
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from ..aco.problem import TSPProblem
+from ..aco.solver import ACOConfig, ACOResult, ACOSolver
+from ..aco.tsplib import load_problem
+
+# bump when a change to the solver makes cached results stale
+RESULT_CACHE_VERSION = 2
+
+def config_json(cfg: ACOConfig, with_seed: bool = True) -> str:
+    d = asdict(cfg)
+    if not with_seed:
+        d.pop("seed")
+    return json.dumps(d, sort_keys=True)
+
+def job_seed(base_seed: int, cfg: ACOConfig, repeat: int) -> int:
+    # depends only on the config and the repeat, so growing or reordering a grid keeps the
+    # seeds (and the cached results) of the cells that were already there
+    h = int(hashlib.sha256(config_json(cfg, with_seed=False).encode()).hexdigest()[:16], 16)
+    return int(np.random.SeedSequence([base_seed, h, repeat]).generate_state(1, np.uint64)[0])
+
+class ResultCache:
+    # one JSON file per finished job, keyed by instance digest, config and seed
+    def __init__(self, cache_dir: str | Path, instance_digest: str):
+        self.dir = Path(cache_dir)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.digest = instance_digest
+
+    def path(self, cfg: ACOConfig) -> Path:
+        key = hashlib.sha256(f"{self.digest}:{RESULT_CACHE_VERSION}:{config_json(cfg)}".encode()).hexdigest()
+        return self.dir / f"{key[:32]}.json"
+
+    def get(self, cfg: ACOConfig) -> Optional[ACOResult]:
+        path = self.path(cfg)
+        if not path.exists():
+            return None
+        with path.open("r", encoding="utf-8") as f:
+            return ACOResult(**json.load(f))
+
+    def put(self, cfg: ACOConfig, res: ACOResult) -> None:
+        path = self.path(cfg)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(asdict(res), f)
+        os.replace(tmp, path)
+
+# problem of the current worker process, loaded once by the pool initializer
+_PROBLEM: Optional[TSPProblem] = None
+
+def _init_worker(data_file: str, cache_dir: Optional[str], n_candidates: int) -> None:
+    global _PROBLEM
+    _PROBLEM = load_problem(data_file, cache_dir=cache_dir, n_candidates=n_candidates)
+
+def _run_job(cfg: ACOConfig) -> ACOResult:
+    return ACOSolver(_PROBLEM, cfg).solve()
+
+def run_jobs(
+    jobs: List[Tuple[int, int, ACOConfig]],
+    problem: TSPProblem,
+    data_file: str,
+    cache_dir: Optional[str],
+    n_candidates: int,
+    workers: int,
+    cache: Optional[ResultCache] = None,
+    run_local: Optional[Callable[[ACOConfig, int, int], ACOResult]] = None,
+    on_result: Optional[Callable[[int, int, ACOResult, bool], None]] = None,
+) -> Dict[Tuple[int, int], ACOResult]:
+    # jobs are (config index, repeat, seeded config); cached ones are not run again and every
+    # finished one is cached immediately, so an interrupted sweep resumes where it stopped
+    results: Dict[Tuple[int, int], ACOResult] = {}
+    todo: List[Tuple[int, int, ACOConfig]] = []
+    for ci, r, cfg in jobs:
+        res = cache.get(cfg) if cache is not None else None
+        if res is None:
+            todo.append((ci, r, cfg))
+        else:
+            results[(ci, r)] = res
+            if on_result is not None:
+                on_result(ci, r, res, True)
+
+    def done(ci: int, r: int, cfg: ACOConfig, res: ACOResult) -> None:
+        if cache is not None:
+            cache.put(cfg, res)
+        results[(ci, r)] = res
+        if on_result is not None:
+            on_result(ci, r, res, False)
+
+    if workers <= 1:
+        for ci, r, cfg in todo:
+            if run_local is not None:
+                res = run_local(cfg, ci, r)
+            else:
+                res = ACOSolver(problem, cfg).solve()
+            done(ci, r, cfg, res)
+        return results
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(data_file, cache_dir, n_candidates),
+    ) as pool:
+        futures = {pool.submit(_run_job, cfg): (ci, r, cfg) for ci, r, cfg in todo}
+        for fut in as_completed(futures):
+            ci, r, cfg = futures[fut]
+            done(ci, r, cfg, fut.result())
+    return results
+
+def seeded_jobs(configs: List[ACOConfig], repeats: int, base_seed: int) -> List[Tuple[int, int, ACOConfig]]:
+    return [
+        (ci, r, replace(cfg, seed=job_seed(base_seed, cfg, r)))
+        for ci, cfg in enumerate(configs)
+        for r in range(repeats)
+    ]
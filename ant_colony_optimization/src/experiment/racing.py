@@ -0,0 +1,88 @@
+from __future__ import annotations
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, List
+
+import math
+import statistics
+
+from ..aco.solver import ACOConfig, ACOResult
+
+@dataclass
+class Rung:
+    index: int
+    T: int
+    repeats: int
+    # config index -> results of this rung
+    results: Dict[int, List[ACOResult]]
+    survivors: List[int]
+
+# one-sided 95% quantiles of Student's t by degrees of freedom
+_T95 = {1: 6.314, 2: 2.920, 3: 2.353, 4: 2.132, 5: 2.015, 6: 1.943, 7: 1.895, 8: 1.860, 9: 1.833,
+        10: 1.812, 12: 1.782, 15: 1.753, 20: 1.725, 30: 1.697, 60: 1.671}
+
+def t95(df: float) -> float:
+    for k in sorted(_T95):
+        if df <= k:
+            return _T95[k]
+    return 1.645
+
+def dominated(vals: List[float], leader: List[float]) -> bool:
+    # one-sided Welch t-test at 95%: is the mean of vals worse (longer) than the leader's
+    diff = statistics.fmean(vals) - statistics.fmean(leader)
+    if diff <= 0.0 or len(vals) < 2 or len(leader) < 2:
+        return False
+    a = statistics.variance(vals) / len(vals)
+    b = statistics.variance(leader) / len(leader)
+    if a + b == 0.0:
+        return True
+    df = (a + b) ** 2 / (a * a / (len(vals) - 1) + b * b / (len(leader) - 1))
+    return diff / math.sqrt(a + b) > t95(df)
+
+def successive_halving(
+    configs: List[ACOConfig],
+    evaluate: Callable[[List[ACOConfig], List[int], int], Dict[int, List[ACOResult]]],
+    min_T: int,
+    max_T: int,
+    min_repeats: int,
+    max_repeats: int,
+    eta: int = 2,
+    on_rung: Callable[[Rung], None] | None = None,
+) -> List[Rung]:
+    # every rung runs the surviving configs with T iterations and the given number of repeats;
+    # a config survives when it is among the best 1/eta by mean best length and not
+    # significantly worse than the rung leader. Survivors get eta times the iterations and
+    # repeats (up to max_T / max_repeats); the race ends when one config is left or the
+    # full budget has been raced
+    if eta < 2:
+        raise ValueError("eta must be at least 2")
+    if min(min_T, max_T, min_repeats, max_repeats) < 1:
+        raise ValueError("race iterations and repeats must be at least 1")
+    alive = list(range(len(configs)))
+    # a minimum above the maximum starts (and ends) the race at the maximum
+    T, repeats = min(min_T, max_T), min(min_repeats, max_repeats)
+    rungs: List[Rung] = []
+
+    while True:
+        cfgs = [replace(configs[ci], T=T) for ci in alive]
+        results = evaluate(cfgs, alive, repeats)
+        means = {ci: statistics.fmean(r.best_length for r in results[ci]) for ci in alive}
+        ranked = sorted(alive, key=means.__getitem__)
+        final = len(alive) == 1 or (T >= max_T and repeats >= max_repeats)
+
+        if final:
+            survivors = ranked[:1]
+        else:
+            leader = [r.best_length for r in results[ranked[0]]]
+            keep = ranked[: max(1, math.ceil(len(ranked) / eta))]
+            survivors = [ci for ci in keep if not dominated([r.best_length for r in results[ci]], leader)]
+
+        rung = Rung(index=len(rungs), T=T, repeats=repeats, results=results, survivors=survivors)
+        rungs.append(rung)
+        if on_rung is not None:
+            on_rung(rung)
+        if final:
+            return rungs
+
+        alive = survivors
+        T = min(max_T, T * eta)
+        repeats = min(max_repeats, repeats * eta)
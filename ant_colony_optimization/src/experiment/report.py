@@ -0,0 +1,183 @@
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import argparse
+import csv
+
+import numpy as np
+
+from ..aco.plotting import _pyplot, plot_convergence_band, plot_tour
+from ..aco.problem import TSPProblem
+from ..aco.tsplib import file_digest, load_problem
+from .store import ResultStore
+
+PLOT_MODES = ("now", "later", "none")
+
+# (kind, keyword arguments) of one figure
+PlotTask = Tuple[str, Dict[str, Any]]
+
+def param_means(summary_rows: List[Dict], param: str, y_key: str = "best_mean") -> Tuple[List[float], List[float]]:
+    # mean of y_key over the configs sharing each value of param
+    x = np.array([row[param] for row in summary_rows], dtype=np.float64)
+    y = np.array([row[y_key] for row in summary_rows], dtype=np.float64)
+    xs, inverse = np.unique(x, return_inverse=True)
+    means = np.bincount(inverse, weights=y) / np.bincount(inverse)
+    return xs.tolist(), means.tolist()
+
+def plot_param_comparisons(
+    summary_rows: List[Dict],
+    out_dir: Path,
+    store: Optional[ResultStore] = None,
+    config_ids: Optional[List[int]] = None,
+    repeats: Optional[int] = None,
+) -> int:
+    plt = _pyplot()
+    params = ["m", "T", "alpha", "beta", "rho", "p_random"]
+    y_key = "best_mean"
+    count = 0
+
+    for p in params:
+        if store is not None:
+            x_plot, y_plot = store.param_means(p, config_ids, repeats)
+        else:
+            x_plot, y_plot = param_means(summary_rows, p, y_key)
+        if len(x_plot) <= 1:
+            continue
+
+        plt.figure()
+        plt.plot(x_plot, y_plot, marker="o")
+        plt.xlabel(p)
+        plt.ylabel(y_key)
+        plt.title(f"Porównanie parametru {p} względem {y_key}")
+        plt.tight_layout()
+        plt.savefig(out_dir / f"compare_{p}.png")
+        plt.close()
+        count += 1
+    return count
+
+def read_summary(path: Path) -> List[Dict[str, Any]]:
+    rows: List[Dict[str, Any]] = []
+    with path.open("r", newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            for key, value in row.items():
+                for convert in (int, float):
+                    try:
+                        row[key] = convert(value)
+                        break
+                    except ValueError:
+                        pass
+            rows.append(row)
+    return rows
+
+def _csv_histories(path: Path) -> Tuple[List[List[int]], List[List[float]]]:
+    # (iterations, best lengths) per run; history.csv counts iterations from 0
+    data = np.loadtxt(path, delimiter=",", skiprows=1, ndmin=2)
+    runs = data[:, 1].astype(np.int64)
+    iters = data[:, 0].astype(np.int64) + 1
+    ids = np.unique(runs)
+    return [iters[runs == r].tolist() for r in ids], [data[runs == r, 2].tolist() for r in ids]
+
+def _csv_best_tour(path: Path, problem: TSPProblem) -> Tuple[List[int], float]:
+    with path.open("r", newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    index = {node.label: node.idx for node in problem.nodes}
+    return [index[int(label)] for label in rows[2]], float(rows[0][1])
+
+def config_tasks(row: Dict[str, Any], problem: TSPProblem, store: Optional[ResultStore]) -> List[PlotTask]:
+    # figures of one configuration, from its CSV files or from the results store
+    cfg_dir = Path(row["config_dir"])
+    tag = row["tag"]
+    if (cfg_dir / "history.csv").exists():
+        iters, histories = _csv_histories(cfg_dir / "history.csv")
+        tour, length = _csv_best_tour(cfg_dir / "best_tour_overall.csv", problem)
+    elif store is not None and "config_id" in row:
+        grid, values = store.history(int(row["config_id"]), repeats=int(row["n_runs"]))
+        # the rows of every run at its own recorded iterations
+        kept = [~np.isnan(v) for v in values]
+        iters = [grid[k].tolist() for k in kept]
+        histories = [v[k].tolist() for v, k in zip(values, kept)]
+        tour, length = store.best_tour(int(row["config_id"]), repeats=int(row["n_runs"]))
+    else:
+        return []
+    cfg_dir.mkdir(parents=True, exist_ok=True)
+    return [
+        ("band", dict(
+            histories=histories,
+            iters=iters,
+            out_path=cfg_dir / "convergence_mean_minmax.png",
+            title=f"Średnia z {row['n_runs']} uruchomień (min–max) | {tag}",
+            band="minmax",
+        )),
+        ("tour", dict(
+            tour=tour,
+            out_path=cfg_dir / "best_tour.png",
+            title=f"Najlepsza trasa overall = {length:.3f} | {tag}",
+        )),
+    ]
+
+# problem of the current report worker, loaded once by the pool initializer
+_PROBLEM: Optional[TSPProblem] = None
+
+def _init_worker(data_file: str, cache_dir: Optional[str]) -> None:
+    global _PROBLEM
+    import matplotlib
+    matplotlib.use("Agg")
+    _PROBLEM = load_problem(data_file, cache_dir=cache_dir)
+
+def _render(task: PlotTask, problem: Optional[TSPProblem] = None) -> None:
+    kind, kwargs = task
+    if kind == "tour":
+        plot_tour(problem=problem or _PROBLEM, **kwargs)
+    else:
+        plot_convergence_band(**kwargs)
+
+def render_report(
+    out_dir: str | Path,
+    data_file: str,
+    cache_dir: Optional[str] = None,
+    workers: int = 1,
+) -> int:
+    # renders every figure of a finished experiment from summary.csv and the stored results,
+    # with workers > 1 in a process pool; returns the number of figures
+    out_dir = Path(out_dir)
+    summary = read_summary(out_dir / "summary.csv")
+    problem = load_problem(data_file, cache_dir=cache_dir)
+    store = None
+    if (out_dir / "results.sqlite").exists():
+        store = ResultStore(out_dir / "results.sqlite", file_digest(data_file))
+    try:
+        tasks = [task for row in summary if row["config_dir"] for task in config_tasks(row, problem, store)]
+        ids = [int(row["config_id"]) for row in summary if "config_id" in row]
+        if store is not None and len(ids) == len(summary):
+            repeats = max(int(row["n_runs"]) for row in summary)
+            count = plot_param_comparisons(summary, out_dir, store, ids, repeats)
+        else:
+            count = plot_param_comparisons(summary, out_dir)
+    finally:
+        if store is not None:
+            store.close()
+
+    if workers <= 1:
+        for task in tasks:
+            _render(task, problem)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(data_file, cache_dir)) as pool:
+            for fut in [pool.submit(_render, task) for task in tasks]:
+                fut.result()
+    return count + len(tasks)
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--out_dir", type=str, required=True, help="output directory of run_experiments")
+    ap.add_argument("--data_file", type=str, required=True)
+    ap.add_argument("--cache_dir", type=str, default=None)
+    ap.add_argument("--workers", type=int, default=1, help="plotting processes (1 = in-process)")
+    args = ap.parse_args()
+
+    count = render_report(args.out_dir, args.data_file, args.cache_dir, args.workers)
+    print(f"Rendered {count} figures in {args.out_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,34 @@
 from __future__ import annotations
 from pathlib import Path
-from typing import Dict, List
+from dataclasses import replace
+from typing import Dict, List, Optional
 
 import argparse
 import csv
-import time
 import statistics
-import matplotlib.pyplot as plt
 
-from ..aco.io import load_nodes
-from ..aco.problem import build_problem, TSPProblem
+from ..aco.problem import TSPProblem
+from ..aco.tsplib import file_digest, load_problem
 from ..aco.solver import ACOConfig, ACOSolver, ACOResult
-from ..aco.plotting import plot_tour, plot_convergence_band
+from ..aco.profiling import profile_fields
+from .jobs import ResultCache, job_seed, run_jobs, seeded_jobs
+from .racing import Rung, successive_halving
+from .store import ResultStore, StoreCache
+from .report import PLOT_MODES, render_report
 
 def ensure_dir(p: Path) -> None:
     p.mkdir(parents=True, exist_ok=True)
 
 def cfg_to_tag(cfg: ACOConfig) -> str:
-    return (
+    tag = (
         f"m{cfg.m}_T{cfg.T}_a{cfg.alpha}_b{cfg.beta}"
         f"_rho{cfg.rho}_pr{cfg.p_random}"
     )
+    if cfg.variant != "as":
+        tag += f"_{cfg.variant}"
+    if cfg.local_search != "none":
+        tag += f"_ls{cfg.local_search}-{cfg.ls_scope}"
+    return tag
 
 def save_runs_csv(path: Path, rows: List[Dict]) -> None:
     if not rows:
@@ -31,14 +39,14 @@ def save_runs_csv(path: Path, rows: List[Dict]) -> None:
         w.writeheader()
         w.writerows(rows)
 
-def save_history_csv(path: Path, histories: List[List[float]]) -> None:
+def save_history_csv(path: Path, results: List[ACOResult]) -> None:
     ensure_dir(path.parent)
     with path.open("w", newline="", encoding="utf-8") as f:
         w = csv.writer(f)
         w.writerow(["iter", "run_id", "best_length"])
-        for run_id, hist in enumerate(histories):
-            for it, val in enumerate(hist):
-                w.writerow([it, run_id, val])
+        for run_id, res in enumerate(results):
+            for it, val in zip(res.history_iters, res.best_history):
+                w.writerow([it - 1, run_id, val])
 
 def save_population_history_csv(path: Path, results: List[ACOResult]) -> None:
     ensure_dir(path.parent)
@@ -46,9 +54,18 @@ def save_population_history_csv(path: Path, results: List[ACOResult]) -> None:
         w = csv.writer(f)
         w.writerow(["iter", "run_id", "iter_best", "iter_mean", "iter_worst"])
         for run_id, res in enumerate(results):
-            T = len(res.iter_best)
-            for it in range(T):
-                w.writerow([it, run_id, res.iter_best[it], res.iter_mean[it], res.iter_worst[it]])
+            for k, it in enumerate(res.history_iters):
+                w.writerow([it - 1, run_id, res.iter_best[k], res.iter_mean[k], res.iter_worst[k]])
+
+def save_profile_csv(path: Path, results: List[ACOResult]) -> None:
+    ensure_dir(path.parent)
+    fields = profile_fields()
+    with path.open("w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["run_id"] + fields)
+        for run_id, res in enumerate(results):
+            for row in res.profile or []:
+                w.writerow([run_id] + [row[k] for k in fields])
 
 def save_best_tour_csv(path: Path, problem: TSPProblem, tour: List[int], length: float) -> None:
     ensure_dir(path.parent)
@@ -71,37 +88,87 @@ def compute_stats(values: List[float]) -> Dict[str, float]:
         "best_max": max(values),
     }
 
-def run_one(problem: TSPProblem, cfg: ACOConfig) -> ACOResult:
+def run_one(problem: TSPProblem, cfg: ACOConfig, progress: int = 0, label: str = "") -> ACOResult:
     solver = ACOSolver(problem, cfg)
-    return solver.solve()
-
-def plot_param_comparisons(summary_rows: List[Dict], out_dir: Path) -> None:
-    params = ["m", "T", "alpha", "beta", "rho", "p_random"]
-    y_key = "best_mean"
-
-    for p in params:
-        xs = sorted(set(row[p] for row in summary_rows))
-        if len(xs) <= 1:
-            continue
-
-        x_to_vals: Dict[float, List[float]] = {x: [] for x in xs}
-        for row in summary_rows:
-            x_to_vals[row[p]].append(row[y_key])
-
-        x_plot: List[float] = []
-        y_plot: List[float] = []
-        for x in xs:
-            x_plot.append(x)
-            y_plot.append(statistics.fmean(x_to_vals[x]))
-
-        plt.figure()
-        plt.plot(x_plot, y_plot, marker="o")
-        plt.xlabel(p)
-        plt.ylabel(y_key)
-        plt.title(f"Porównanie parametru {p} względem {y_key}")
-        plt.tight_layout()
-        plt.savefig(out_dir / f"compare_{p}.png")
-        plt.close()
+    for stats in solver.iterate():
+        if progress > 0 and stats["iter"] % progress == 0:
+            print(f"{label} | iter {stats['iter']}: best={stats['best_length']:.3f} "
+                  f"elapsed={stats['elapsed_s']:.1f}s")
+    return solver.result()
+
+def run_race(
+    args: argparse.Namespace,
+    problem: TSPProblem,
+    configs: List[ACOConfig],
+    cache: Optional[ResultCache],
+    base_out: Path,
+) -> List[Dict]:
+    # successive halving over the grid; race.csv gets a row per config and rung, the summary
+    # only the configs of the final rung, so all its rows share T and the number of repeats
+    race_rows: List[Dict] = []
+    rung_rows: Dict[int, Dict[int, Dict]] = {}
+
+    def evaluate(cfgs: List[ACOConfig], indices: List[int], repeats: int) -> Dict[int, List[ACOResult]]:
+        by_job = run_jobs(
+            seeded_jobs(cfgs, repeats, args.seed),
+            problem=problem,
+            data_file=args.data_file,
+            cache_dir=args.cache_dir,
+            n_candidates=args.n_candidates,
+            workers=args.jobs,
+            cache=cache,
+        )
+        return {ci: [by_job[(k, r)] for r in range(repeats)] for k, ci in enumerate(indices)}
+
+    def on_rung(rung: Rung) -> None:
+        print(f"Rung {rung.index}: T={rung.T} repeats={rung.repeats} | "
+              f"{len(rung.results)} configs -> {len(rung.survivors)} survive")
+        for ci, results in rung.results.items():
+            cfg = replace(configs[ci], T=rung.T)
+            lengths = [res.best_length for res in results]
+            row = {
+                "config_dir": "",
+                "tag": cfg_to_tag(cfg),
+                "n_runs": rung.repeats,
+                "m": cfg.m,
+                "T": cfg.T,
+                "alpha": cfg.alpha,
+                "beta": cfg.beta,
+                "rho": cfg.rho,
+                "p_random": cfg.p_random,
+                "variant": cfg.variant,
+                **compute_stats(lengths),
+                "mean_elapsed_s": statistics.fmean([res.elapsed_s for res in results]),
+                "rung": rung.index,
+                "survived": ci in rung.survivors,
+            }
+            race_rows.append(row)
+            rung_rows.setdefault(rung.index, {})[ci] = row
+
+    rungs = successive_halving(
+        configs,
+        evaluate,
+        min_T=args.race_min_T,
+        max_T=max(args.T_list),
+        min_repeats=args.race_min_repeats,
+        max_repeats=args.repeats,
+        eta=args.race_eta,
+        on_rung=on_rung,
+    )
+    save_runs_csv(base_out / "race.csv", race_rows)
+    final = rung_rows[rungs[-1].index]
+    winner = final[rungs[-1].survivors[0]]
+    print(f"Winner: {winner['tag']} best_mean={winner['best_mean']:.3f}")
+    return [final[ci] for ci in sorted(final)]
+
+def report(args: argparse.Namespace, base_out: Path) -> None:
+    # figures are rendered from the saved results once every run has finished
+    if args.plots == "now":
+        workers = args.plot_workers if args.plot_workers is not None else args.jobs
+        count = render_report(base_out, args.data_file, args.cache_dir, workers)
+        print(f"Rendered {count} figures")
+    elif args.plots == "later":
+        print(f"Plots deferred: python -m src.experiment.report --out_dir {base_out} --data_file {args.data_file}")
 
 def main() -> None:
     ap = argparse.ArgumentParser()
@@ -115,49 +182,139 @@ def main() -> None:
     ap.add_argument("--beta_list", type=float, nargs="+", default=[5.0])
     ap.add_argument("--rho_list", type=float, nargs="+", default=[0.3])
     ap.add_argument("--p_random_list", type=float, nargs="+", default=[0.01])
+    ap.add_argument("--engine", type=str, choices=["python", "numpy", "batched"], default="numpy")
+    ap.add_argument("--n_candidates", type=int, default=0)
+    ap.add_argument("--cache_dir", type=str, default=None)
+    ap.add_argument("--variant", type=str, choices=["as", "rank", "mmas", "acs"], default="as")
+    ap.add_argument("--local_search", type=str, choices=["none", "2opt", "oropt", "2opt+oropt"], default="none")
+    ap.add_argument("--ls_scope", type=str, choices=["best", "all"], default="best")
+    ap.add_argument("--time_limit_s", type=float, default=0.0)
+    ap.add_argument("--max_evals", type=int, default=0)
+    ap.add_argument("--patience", type=int, default=0)
+    ap.add_argument("--target_length", type=float, default=None)
+    ap.add_argument("--stagnation", type=str, choices=["none", "branching", "entropy"], default="none")
+    ap.add_argument("--stagnation_threshold", type=float, default=2.5)
+    ap.add_argument("--history", type=str, choices=["full", "decimate", "reservoir"], default="full")
+    ap.add_argument("--history_points", type=int, default=10_000)
+    ap.add_argument("--progress", type=int, default=0,
+                    help="print progress every this many iterations (0 = off)")
+    ap.add_argument("--profile", action="store_true",
+                    help="per-phase timers and counters, written to profile.csv")
+    ap.add_argument("--jobs", type=int, default=1,
+                    help="worker processes running (config, repeat) jobs (1 = in-process)")
+    ap.add_argument("--seed", type=int, default=0,
+                    help="base seed; every (config, repeat) job derives its own seed from it")
+    ap.add_argument("--result_cache", type=str, default=None,
+                    help="directory of cached job results (default: <out_dir>/cache; with --store sqlite"
+                         " finished jobs are looked up in results.sqlite instead)")
+    ap.add_argument("--no_cache", action="store_true", help="always recompute every job")
+    ap.add_argument("--mode", type=str, choices=["grid", "race"], default="grid",
+                    help="full grid, or successive halving up to max(T_list) iterations and --repeats repeats")
+    ap.add_argument("--race_min_T", type=int, default=20)
+    ap.add_argument("--race_min_repeats", type=int, default=2)
+    ap.add_argument("--race_eta", type=int, default=2, help="budget growth / survivor fraction per rung")
+    ap.add_argument("--store", type=str, choices=["csv", "sqlite"], default="csv",
+                    help="per-run CSV files, or runs, histories and tours in <out_dir>/results.sqlite")
+    ap.add_argument("--plots", type=str, choices=list(PLOT_MODES), default="now",
+                    help="render the figures after the runs, leave them to src.experiment.report, or skip them")
+    ap.add_argument("--no_plots", "--no-plots", dest="plots", action="store_const", const="none")
+    ap.add_argument("--plot_workers", type=int, default=None,
+                    help="plotting processes (default: --jobs)")
 
     args = ap.parse_args()
+    if args.mode == "race" and args.store == "sqlite":
+        ap.error("--mode race writes CSV files only; it cannot be combined with --store sqlite")
 
-    nodes = load_nodes(args.data_file)
-    problem = build_problem(nodes)
+    problem = load_problem(args.data_file, cache_dir=args.cache_dir, n_candidates=args.n_candidates)
 
     base_out = Path(args.out_dir)
     ensure_dir(base_out)
 
     configs: List[ACOConfig] = []
+    # in a race T is the budget of a rung rather than a grid dimension
+    T_list = [max(args.T_list)] if args.mode == "race" else args.T_list
     for m in args.m_list:
-        for T in args.T_list:
+        for T in T_list:
             for alpha in args.alpha_list:
                 for beta in args.beta_list:
                     for rho in args.rho_list:
                         for pr in args.p_random_list:
-                            configs.append(ACOConfig(m=m, T=T, alpha=alpha, beta=beta, rho=rho, p_random=pr))
+                            configs.append(ACOConfig(m=m, T=T, alpha=alpha, beta=beta, rho=rho, p_random=pr,
+                                                           engine=args.engine, n_candidates=args.n_candidates,
+                                                           variant=args.variant, local_search=args.local_search,
+                                                           ls_scope=args.ls_scope, profile=args.profile,
+                                                           time_limit_s=args.time_limit_s, max_evals=args.max_evals,
+                                                           patience=args.patience, target_length=args.target_length,
+                                                           stagnation=args.stagnation,
+                                                           stagnation_threshold=args.stagnation_threshold,
+                                                           history=args.history,
+                                                           history_points=args.history_points))
 
     print(f"Configurations: {len(configs)} | repeats: {args.repeats}")
 
+    tags = [cfg_to_tag(cfg) for cfg in configs]
+    store = None
+    config_ids: List[int] = []
+    if args.store == "sqlite":
+        store = ResultStore(base_out / "results.sqlite", file_digest(args.data_file))
+        config_ids = [store.config_id(cfg, tag) for cfg, tag in zip(configs, tags)]
+
+    cache: Optional[ResultCache | StoreCache] = None
+    if args.no_cache:
+        pass
+    elif store is not None:
+        # finished jobs are looked up in the runs table, no per-job files
+        cache = StoreCache(store)
+    else:
+        result_cache = args.result_cache or str(base_out / "cache")
+        cache = ResultCache(result_cache, file_digest(args.data_file))
+
+    if args.mode == "race":
+        summary_rows = run_race(args, problem, configs, cache, base_out)
+        save_runs_csv(base_out / "summary.csv", summary_rows)
+        report(args, base_out)
+        print("DONE")
+        return
+
+    def on_result(ci: int, r: int, res: ACOResult, cached: bool) -> None:
+        source = "cached" if cached else f"time={res.elapsed_s:.3f}s"
+        print(f"{tags[ci]} | run {r+1}/{args.repeats}: best={res.best_length:.3f} {source}")
+        if store is not None and not cached:
+            store.add_run(config_ids[ci], r, job_seed(args.seed, configs[ci], r), res)
+
+    results_by_job = run_jobs(
+        seeded_jobs(configs, args.repeats, args.seed),
+        problem=problem,
+        data_file=args.data_file,
+        cache_dir=args.cache_dir,
+        n_candidates=args.n_candidates,
+        workers=args.jobs,
+        cache=cache,
+        run_local=lambda cfg, ci, r: run_one(problem, cfg, progress=args.progress, label=f"{tags[ci]} | run {r+1}"),
+        on_result=on_result,
+    )
+
     summary_rows: List[Dict] = []
 
-    for cfg in configs:
-        tag = cfg_to_tag(cfg)
+    for ci, cfg in enumerate(configs):
+        tag = tags[ci]
         cfg_dir = base_out / tag
-        ensure_dir(cfg_dir)
+        if store is None:
+            ensure_dir(cfg_dir)
 
         run_rows: List[Dict] = []
-        histories: List[List[float]] = []
         results: List[ACOResult] = []
 
         best_overall_len = float("inf")
         best_overall_tour: List[int] = []
 
         for r in range(args.repeats):
-            t0 = time.perf_counter()
-            res = run_one(problem, cfg)
-            elapsed = time.perf_counter() - t0
+            res = results_by_job[(ci, r)]
 
             results.append(res)
-            histories.append(res.best_history)
 
-            save_best_tour_csv(cfg_dir / f"best_tour_run_{r}.csv", problem, res.best_tour, res.best_length)
+            if store is None:
+                save_best_tour_csv(cfg_dir / f"best_tour_run_{r}.csv", problem, res.best_tour, res.best_length)
 
             if res.best_length < best_overall_len:
                 best_overall_len = res.best_length
@@ -167,36 +324,29 @@ def main() -> None:
                 {
                     "run_id": r,
                     "best_length": res.best_length,
-                    "elapsed_s": elapsed,
+                    "elapsed_s": res.elapsed_s,
                     "m": cfg.m,
                     "T": cfg.T,
                     "alpha": cfg.alpha,
                     "beta": cfg.beta,
                     "rho": cfg.rho,
                     "p_random": cfg.p_random,
+                    "variant": cfg.variant,
+                    "iterations": res.iterations,
+                    "stop_reason": res.stop_reason,
                 }
             )
 
-            print(f"{tag} | run {r+1}/{args.repeats}: best={res.best_length:.3f} time={elapsed:.3f}s")
-
-        save_runs_csv(cfg_dir / "runs.csv", run_rows)
-        save_history_csv(cfg_dir / "history.csv", histories)
-        save_population_history_csv(cfg_dir / "population_history.csv", results)
-        save_best_tour_csv(cfg_dir / "best_tour_overall.csv", problem, best_overall_tour, best_overall_len)
-
-        plot_convergence_band(
-            histories=histories,
-            out_path=cfg_dir / "convergence_mean_minmax.png",
-            title=f"Średnia z {args.repeats} uruchomień (min–max) | {tag}",
-            band="minmax",
-        )
-        plot_tour(
-            problem=problem,
-            tour=best_overall_tour,
-            out_path=cfg_dir / "best_tour.png",
-            title=f"Najlepsza trasa overall = {best_overall_len:.3f} | {tag}",
-        )
+        if store is None:
+            save_runs_csv(cfg_dir / "runs.csv", run_rows)
+            save_history_csv(cfg_dir / "history.csv", results)
+            save_population_history_csv(cfg_dir / "population_history.csv", results)
+            if args.profile:
+                save_profile_csv(cfg_dir / "profile.csv", results)
+            save_best_tour_csv(cfg_dir / "best_tour_overall.csv", problem, best_overall_tour, best_overall_len)
 
+        if store is not None:
+            continue
         best_lengths = [row["best_length"] for row in run_rows]
         stats = compute_stats(best_lengths)
 
@@ -210,13 +360,22 @@ def main() -> None:
             "beta": cfg.beta,
             "rho": cfg.rho,
             "p_random": cfg.p_random,
+            "variant": cfg.variant,
             **stats,
             "mean_elapsed_s": statistics.fmean([row["elapsed_s"] for row in run_rows]),
         }
         summary_rows.append(summary_row)
 
+    if store is not None:
+        # statistics straight from the runs table
+        dirs = {cid: str(base_out / tag) for cid, tag in zip(config_ids, tags)}
+        for row in store.summary(config_ids, args.repeats):
+            if row["config_id"] in dirs:
+                summary_rows.append({"config_dir": dirs[row["config_id"]], **row})
+        store.close()
+
     save_runs_csv(base_out / "summary.csv", summary_rows)
-    plot_param_comparisons(summary_rows, base_out)
+    report(args, base_out)
 
     print("DONE")
 
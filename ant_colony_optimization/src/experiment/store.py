@@ -0,0 +1,363 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import json
+import queue
+import sqlite3
+import threading
+
+import numpy as np
+
+from ..aco.profiling import profile_fields
+from ..aco.solver import ACOConfig, ACOResult
+from .jobs import config_json
+
+PARAMS = ("m", "T", "alpha", "beta", "rho", "p_random")
+# per-iteration profile columns after iter (profiling.profile_fields)
+PROFILE_COLUMNS = tuple(profile_fields()[1:])
+# PRAGMA user_version of the schema below; bump when it changes
+STORE_VERSION = 3
+# run_id bound when a query is not limited to a number of repeats
+_ALL_RUNS = 2**63 - 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS configs (
+    config_id INTEGER PRIMARY KEY,
+    -- file digest of the instance (tsplib.file_digest), as in the result cache
+    instance TEXT NOT NULL,
+    config TEXT NOT NULL,
+    tag TEXT NOT NULL,
+    m INTEGER, T INTEGER, alpha REAL, beta REAL, rho REAL, p_random REAL, variant TEXT,
+    UNIQUE (instance, config)
+);
+CREATE TABLE IF NOT EXISTS runs (
+    config_id INTEGER NOT NULL REFERENCES configs(config_id),
+    run_id INTEGER NOT NULL,
+    -- job seeds are 64-bit unsigned, beyond the range of an SQLite INTEGER
+    seed TEXT,
+    best_length REAL NOT NULL,
+    elapsed_s REAL,
+    iterations INTEGER,
+    evaluations INTEGER,
+    stop_reason TEXT,
+    profile_totals TEXT,
+    PRIMARY KEY (config_id, run_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS histories (
+    config_id INTEGER NOT NULL,
+    run_id INTEGER NOT NULL,
+    iter INTEGER NOT NULL,
+    best_length REAL, iter_best REAL, iter_mean REAL, iter_worst REAL,
+    PRIMARY KEY (config_id, run_id, iter)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS tours (
+    config_id INTEGER NOT NULL,
+    run_id INTEGER NOT NULL,
+    length REAL NOT NULL,
+    -- city indices as little-endian int32
+    tour BLOB NOT NULL,
+    PRIMARY KEY (config_id, run_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS profiles (
+    config_id INTEGER NOT NULL,
+    run_id INTEGER NOT NULL,
+    iter INTEGER NOT NULL,
+    {profile_columns},
+    PRIMARY KEY (config_id, run_id, iter)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS runs_by_length ON runs (config_id, best_length);
+""".replace("{profile_columns}", ", ".join(f"{c} REAL" for c in PROFILE_COLUMNS))
+
+_INSERT = {
+    "runs": "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    "histories": "INSERT OR REPLACE INTO histories VALUES (?, ?, ?, ?, ?, ?, ?)",
+    "tours": "INSERT OR REPLACE INTO tours VALUES (?, ?, ?, ?)",
+    "profiles": f"INSERT OR REPLACE INTO profiles VALUES ({', '.join('?' * (3 + len(PROFILE_COLUMNS)))})",
+}
+
+def _connect(path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(path), check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+class ResultStore:
+    # one SQLite file per experiment: configs, runs, per-iteration histories and best tours.
+    # Results are queued and written by a background thread in batched transactions, so the
+    # sweep never waits for the disk; queries read through a separate connection.
+    # Configs are keyed by the instance digest, and queries only see the configs of this
+    # store's instance; with repeats they only see runs 0 .. repeats - 1, so a rerun with
+    # fewer repeats in the same out_dir does not pick up the older runs
+    def __init__(self, path: str | Path, instance: str = "", batch_size: int = 64):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.instance = instance
+        self.conn = _connect(self.path)
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        tables = self.conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 'configs'").fetchone()[0]
+        if tables and version != STORE_VERSION:
+            self.conn.close()
+            raise ValueError(f"{self.path} was written by another version of the result store; use a new out_dir")
+        self.conn.executescript(_SCHEMA)
+        self.conn.execute(f"PRAGMA user_version = {STORE_VERSION}")
+        self.conn.commit()
+        self.batch_size = batch_size
+        self._queue: "queue.Queue[Optional[Tuple[str, List[Tuple[Any, ...]]]]]" = queue.Queue()
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="result-store", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        conn = _connect(self.path)
+        try:
+            while True:
+                item = self._queue.get()
+                batch = [item]
+                # everything already waiting goes into the same transaction
+                while item is not None and len(batch) < self.batch_size:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    batch.append(item)
+                try:
+                    with conn:
+                        for entry in batch:
+                            if entry is not None:
+                                conn.executemany(_INSERT[entry[0]], entry[1])
+                except BaseException as e:
+                    self._error = e
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+                if batch[-1] is None:
+                    return
+        finally:
+            conn.close()
+
+    def config_id(self, cfg: ACOConfig, tag: str) -> int:
+        # the seed is per run, so every (config, repeat) cell of the grid shares one row
+        key = config_json(cfg, with_seed=False)
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO configs (instance, config, tag, m, T, alpha, beta, rho, p_random, variant)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (self.instance, key, tag, cfg.m, cfg.T, cfg.alpha, cfg.beta, cfg.rho, cfg.p_random, cfg.variant),
+            )
+        return self.conn.execute(
+            "SELECT config_id FROM configs WHERE instance = ? AND config = ?", (self.instance, key)
+        ).fetchone()[0]
+
+    def add_run(self, config_id: int, run_id: int, seed: Optional[int], res: ACOResult) -> None:
+        if self._error is not None:
+            raise self._error
+        totals = json.dumps(res.profile_totals) if res.profile_totals is not None else None
+        self._queue.put(("runs", [(
+            config_id, run_id, None if seed is None else str(seed), res.best_length, res.elapsed_s, res.iterations, res.evaluations,
+            res.stop_reason, totals,
+        )]))
+        self._queue.put(("histories", list(zip(
+            [config_id] * len(res.history_iters), [run_id] * len(res.history_iters),
+            res.history_iters, res.best_history, res.iter_best, res.iter_mean, res.iter_worst,
+        ))))
+        tour = np.asarray(res.best_tour, dtype="<i4").tobytes()
+        self._queue.put(("tours", [(config_id, run_id, res.best_length, tour)]))
+        if res.profile:
+            self._queue.put(("profiles", [
+                (config_id, run_id, row["iter"], *(row[c] for c in PROFILE_COLUMNS)) for row in res.profile
+            ]))
+
+    def flush(self) -> None:
+        self._queue.join()
+        if self._error is not None:
+            raise self._error
+
+    def close(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self.conn.close()
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self) -> "ResultStore":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def query(self, sql: str, params: Sequence[Any] = ()) -> List[sqlite3.Row]:
+        self.flush()
+        self.conn.row_factory = sqlite3.Row
+        try:
+            return self.conn.execute(sql, params).fetchall()
+        finally:
+            self.conn.row_factory = None
+
+    def _runs_where(
+        self, config_ids: Optional[Sequence[int]], repeats: Optional[int], alias: str = "r"
+    ) -> Tuple[str, List[Any]]:
+        # WHERE clause over runs joined with configs (as c): this instance, the given configs
+        # and the first repeats runs
+        clauses = ["c.instance = ?"]
+        params: List[Any] = [self.instance]
+        if config_ids is not None:
+            clauses.append(f"{alias}.config_id IN ({', '.join('?' * len(config_ids))})")
+            params += list(config_ids)
+        if repeats is not None:
+            clauses.append(f"{alias}.run_id < ?")
+            params.append(repeats)
+        return " WHERE " + " AND ".join(clauses), params
+
+    def summary(
+        self, config_ids: Optional[Sequence[int]] = None, repeats: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        # one row per config with the statistics of its best lengths (compute_stats): the
+        # aggregates in SQL, medians and deviations from one sorted pass in NumPy
+        where, params = self._runs_where(config_ids, repeats)
+        rows = self.query(
+            "SELECT c.config_id, c.tag, COUNT(*) AS n_runs, c.m, c.T, c.alpha, c.beta, c.rho, c.p_random,"
+            " c.variant, MIN(r.best_length) AS best_min, AVG(r.best_length) AS best_mean,"
+            " MAX(r.best_length) AS best_max,"
+            " AVG(r.elapsed_s) AS mean_elapsed_s"
+            f" FROM runs r JOIN configs c USING (config_id){where} GROUP BY c.config_id ORDER BY c.config_id",
+            params,
+        )
+        spread = self._spread(where, params)
+        out: List[Dict[str, Any]] = []
+        for row in rows:
+            median, std = spread[row["config_id"]]
+            out.append({
+                "config_id": row["config_id"],
+                "tag": row["tag"],
+                "n_runs": row["n_runs"],
+                **{p: row[p] for p in PARAMS},
+                "variant": row["variant"],
+                "best_min": row["best_min"],
+                "best_mean": row["best_mean"],
+                "best_median": median,
+                "best_std": std,
+                "best_max": row["best_max"],
+                "mean_elapsed_s": row["mean_elapsed_s"],
+            })
+        return out
+
+    def _spread(self, where: str, params: Sequence[Any]) -> Dict[int, Tuple[float, float]]:
+        # (median, population std) of the best lengths of every config, over the runs of where
+        data = np.array(
+            self.conn.execute(
+                f"SELECT r.config_id, r.best_length FROM runs r JOIN configs c USING (config_id){where}"
+                " ORDER BY r.config_id, r.best_length",
+                params,
+            ).fetchall(),
+            dtype=np.float64,
+        ).reshape(-1, 2)
+        ids, start, count = np.unique(data[:, 0], return_index=True, return_counts=True)
+        lo = data[start + (count - 1) // 2, 1]
+        hi = data[start + count // 2, 1]
+        mean = np.add.reduceat(data[:, 1], start) / count
+        dev = data[:, 1] - np.repeat(mean, count)
+        std = np.sqrt(np.add.reduceat(dev * dev, start) / count)
+        return dict(zip(ids.astype(int).tolist(), zip(((lo + hi) / 2.0).tolist(), std.tolist())))
+
+    def param_means(
+        self, param: str, config_ids: Optional[Sequence[int]] = None, repeats: Optional[int] = None
+    ) -> Tuple[List[float], List[float]]:
+        # mean over configs (all, or the given ones) of the per-config mean best length, for
+        # every value of one parameter
+        if param not in PARAMS:
+            raise ValueError(f"param must be one of {PARAMS}")
+        where, params = self._runs_where(config_ids, repeats)
+        rows = self.query(
+            f"SELECT c.{param} AS x, AVG(s.mean) AS y FROM configs c JOIN"
+            f" (SELECT r.config_id, AVG(r.best_length) AS mean FROM runs r JOIN configs c USING (config_id)"
+            f"{where} GROUP BY r.config_id) s"
+            f" USING (config_id) GROUP BY c.{param} ORDER BY c.{param}",
+            params,
+        )
+        return [r["x"] for r in rows], [r["y"] for r in rows]
+
+    def history(
+        self, config_id: int, column: str = "best_length", repeats: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        # (iters, values) with one row per run, aligned on iterations (NaN where a run has no entry)
+        if column not in ("best_length", "iter_best", "iter_mean", "iter_worst"):
+            raise ValueError(f"unknown history column {column}")
+        data = np.array(
+            self.query(
+                f"SELECT run_id, iter, {column} FROM histories WHERE config_id = ? AND run_id < ?",
+                (config_id, _ALL_RUNS if repeats is None else repeats),
+            ),
+            dtype=np.float64,
+        ).reshape(-1, 3)
+        runs, run_idx = np.unique(data[:, 0], return_inverse=True)
+        iters, iter_idx = np.unique(data[:, 1], return_inverse=True)
+        values = np.full((len(runs), len(iters)), np.nan)
+        values[run_idx, iter_idx] = data[:, 2]
+        return iters.astype(np.int64), values
+
+    def best_tour(self, config_id: int, repeats: Optional[int] = None) -> Tuple[List[int], float]:
+        row = self.query(
+            "SELECT tour, length FROM tours WHERE config_id = ? AND run_id < ? ORDER BY length LIMIT 1",
+            (config_id, _ALL_RUNS if repeats is None else repeats),
+        )
+        if not row:
+            raise KeyError(config_id)
+        return np.frombuffer(row[0]["tour"], dtype="<i4").tolist(), row[0]["length"]
+
+    def profile(self, config_id: int, run_id: int) -> List[Dict[str, float]]:
+        # per-iteration profile rows of one run (ACOResult.profile), empty without --profile
+        rows = self.query(
+            f"SELECT iter, {', '.join(PROFILE_COLUMNS)} FROM profiles WHERE config_id = ? AND run_id = ? ORDER BY iter",
+            (config_id, run_id),
+        )
+        return [dict(row) for row in rows]
+
+    def find_result(self, cfg: ACOConfig) -> Optional[ACOResult]:
+        # the stored run of this instance with the config and seed of cfg, rebuilt as an ACOResult
+        found = self.query(
+            "SELECT r.config_id, r.run_id, r.best_length, r.elapsed_s, r.iterations, r.evaluations,"
+            " r.stop_reason, r.profile_totals, t.tour FROM runs r JOIN configs c USING (config_id)"
+            " JOIN tours t USING (config_id, run_id) WHERE c.instance = ? AND c.config = ? AND r.seed IS ?",
+            (self.instance, config_json(cfg, with_seed=False), None if cfg.seed is None else str(cfg.seed)),
+        )
+        if not found:
+            return None
+        row = found[0]
+        hist = self.query(
+            "SELECT iter, best_length, iter_best, iter_mean, iter_worst FROM histories"
+            " WHERE config_id = ? AND run_id = ? ORDER BY iter",
+            (row["config_id"], row["run_id"]),
+        )
+        totals = json.loads(row["profile_totals"]) if row["profile_totals"] is not None else None
+        profile = self.profile(row["config_id"], row["run_id"])
+        return ACOResult(
+            best_tour=np.frombuffer(row["tour"], dtype="<i4").tolist(),
+            best_length=row["best_length"],
+            best_history=[h["best_length"] for h in hist],
+            elapsed_s=row["elapsed_s"],
+            iter_best=[h["iter_best"] for h in hist],
+            iter_mean=[h["iter_mean"] for h in hist],
+            iter_worst=[h["iter_worst"] for h in hist],
+            history_iters=[h["iter"] for h in hist],
+            sampling_s=totals["sampling_s"] if totals is not None else None,
+            profile=profile or None,
+            profile_totals=totals,
+            stop_reason=row["stop_reason"],
+            iterations=row["iterations"],
+            evaluations=row["evaluations"],
+        )
+
+class StoreCache:
+    # the ResultCache interface over a ResultStore, so a sqlite sweep resumes from its own runs
+    # table instead of a directory of JSON files; new results reach the store through
+    # ResultStore.add_run, so put has nothing to do
+    def __init__(self, store: ResultStore):
+        self.store = store
+
+    def get(self, cfg: ACOConfig) -> Optional[ACOResult]:
+        return self.store.find_result(cfg)
+
+    def put(self, cfg: ACOConfig, res: ACOResult) -> None:
+        pass
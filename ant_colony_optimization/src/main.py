@@ -4,17 +4,19 @@ from pathlib import Path
 import argparse
 import csv
 
-from src.aco.io import load_nodes
-from src.aco.problem import build_problem
+from src.aco.io import load_coords
+from src.aco.problem import build_compact_problem
+from src.aco.tsplib import is_tsplib, load_problem
 from src.aco.solver import ACOConfig, ACOSolver
+from src.aco.islands import IslandModel, island_configs
 from src.aco.plotting import plot_tour, plot_convergence
 
-def save_history_csv(path: Path, history: list[float]) -> None:
+def save_history_csv(path: Path, history: list[float], iters: list[int]) -> None:
     with path.open("w", newline="", encoding="utf-8") as f:
         w = csv.writer(f)
         w.writerow(["iter", "best_length"])
-        for i, v in enumerate(history):
-            w.writerow([i, v])
+        for i, v in zip(iters, history):
+            w.writerow([i - 1, v])
 
 def save_best_tour_csv(path: Path, labels: list[int], length: float) -> None:
     with path.open("w", newline="", encoding="utf-8") as f:
@@ -42,13 +44,66 @@ def main() -> None:
     ap.add_argument("--beta", type=float, default=5.0)
     ap.add_argument("--rho", type=float, default=0.3)
     ap.add_argument("--p_random", type=float, default=0.01)
+    ap.add_argument("--engine", type=str, choices=["python", "numpy", "batched"], default="numpy")
+    ap.add_argument("--seed", type=int, default=None)
+    ap.add_argument("--n_candidates", type=int, default=0)
+    ap.add_argument("--compact", action="store_true",
+                    help="coordinate arrays + on-demand float32 distances (large instances)")
+    ap.add_argument("--cache_dir", type=str, default=None,
+                    help="directory of the memory-mapped distance matrix cache")
+    ap.add_argument("--variant", type=str, choices=["as", "rank", "mmas", "acs"], default="as")
+    ap.add_argument("--rank_w", type=int, default=6)
+    ap.add_argument("--mmas_gb_every", type=int, default=0)
+    ap.add_argument("--mmas_stagnation", type=int, default=100)
+    ap.add_argument("--q0", type=float, default=0.9)
+    ap.add_argument("--xi", type=float, default=0.1)
+    ap.add_argument("--local_search", type=str, choices=["none", "2opt", "oropt", "2opt+oropt"], default="none")
+    ap.add_argument("--ls_scope", type=str, choices=["best", "all"], default="best")
+    ap.add_argument("--ls_neighbors", type=int, default=10)
+    ap.add_argument("--workers", type=int, default=0,
+                    help="worker processes constructing the colony in parallel (0/1 = in-process)")
+    ap.add_argument("--sampler", type=str, choices=["cumsum", "alias"], default="cumsum")
+    ap.add_argument("--time_limit_s", type=float, default=0.0, help="wall-clock budget (0 = off)")
+    ap.add_argument("--max_evals", type=int, default=0, help="budget of constructed tours (0 = off)")
+    ap.add_argument("--patience", type=int, default=0, help="iterations without improvement (0 = off)")
+    ap.add_argument("--target_length", type=float, default=None)
+    ap.add_argument("--stagnation", type=str, choices=["none", "branching", "entropy"], default="none")
+    ap.add_argument("--stagnation_threshold", type=float, default=2.5)
+    ap.add_argument("--checkpoint", type=str, default=None, help="checkpoint file (.npz)")
+    ap.add_argument("--checkpoint_every", type=int, default=0,
+                    help="save the solver state every this many iterations (0 = off)")
+    ap.add_argument("--resume", action="store_true",
+                    help="continue from --checkpoint if the file exists")
+    ap.add_argument("--history", type=str, choices=["full", "decimate", "reservoir"], default="full")
+    ap.add_argument("--history_points", type=int, default=10_000,
+                    help="history rows kept by --history decimate/reservoir")
+    ap.add_argument("--progress", type=int, default=0,
+                    help="print progress every this many iterations (0 = off)")
+    ap.add_argument("--profile", action="store_true",
+                    help="per-phase timers and construction counters (profile.csv)")
+    ap.add_argument("--islands", type=int, default=0,
+                    help="independent colonies in separate processes (0/1 = single colony)")
+    ap.add_argument("--migrate_every", type=int, default=10,
+                    help="iterations between exchanges of the island model")
+    ap.add_argument("--migration", type=str, choices=["best", "pheromone"], default="best",
+                    help="islands share their best tours or blend their trails")
+    ap.add_argument("--migration_weight", type=float, default=0.1,
+                    help="share of the neighbour's trails blended in by --migration pheromone")
     args = ap.parse_args()
 
+    if args.compact and is_tsplib(args.data_file):
+        ap.error("--compact supports only 'label x y' files")
+    if args.islands > 1 and (args.checkpoint or args.workers > 1):
+        ap.error("--islands cannot be combined with --checkpoint or --workers")
+
     out_dir = Path(args.out_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    nodes = load_nodes(args.data_file)
-    problem = build_problem(nodes)
+    if args.compact:
+        labels, xy = load_coords(args.data_file)
+        problem = build_compact_problem(labels, xy, n_candidates=args.n_candidates)
+    else:
+        problem = load_problem(args.data_file, cache_dir=args.cache_dir, n_candidates=args.n_candidates)
 
     cfg = ACOConfig(
         m=args.m,
@@ -57,21 +112,71 @@ def main() -> None:
         beta=args.beta,
         rho=args.rho,
         p_random=args.p_random,
+        engine=args.engine,
+        seed=args.seed,
+        n_candidates=args.n_candidates,
+        variant=args.variant,
+        rank_w=args.rank_w,
+        mmas_gb_every=args.mmas_gb_every,
+        mmas_stagnation=args.mmas_stagnation,
+        q0=args.q0,
+        xi=args.xi,
+        local_search=args.local_search,
+        ls_scope=args.ls_scope,
+        ls_neighbors=args.ls_neighbors,
+        workers=args.workers,
+        sampler=args.sampler,
+        profile=args.profile,
+        time_limit_s=args.time_limit_s,
+        max_evals=args.max_evals,
+        patience=args.patience,
+        target_length=args.target_length,
+        stagnation=args.stagnation,
+        stagnation_threshold=args.stagnation_threshold,
+        checkpoint_path=args.checkpoint,
+        checkpoint_every=args.checkpoint_every,
+        history=args.history,
+        history_points=args.history_points,
     )
-    solver = ACOSolver(problem, cfg)
-    res = solver.solve()
+    if args.islands > 1:
+        def on_exchange(rnd: int, best: dict) -> None:
+            if args.progress > 0:
+                lengths = " ".join(f"{v:.3f}" for v in best.values())
+                print(f"exchange {rnd} (iter {rnd * args.migrate_every}): {lengths}")
+
+        model = IslandModel(problem, island_configs(cfg, args.islands), args.migrate_every,
+                            args.migration, args.migration_weight)
+        islands = model.solve(on_exchange)
+        res = islands.best
+        for k, r in enumerate(islands.results):
+            print(f"Island {k}: best={r.best_length:.6f} adopted={islands.adopted[k]} stopped={r.stop_reason}")
+    else:
+        solver = ACOSolver(problem, cfg)
+        if args.resume and args.checkpoint and Path(args.checkpoint).exists():
+            solver.load_checkpoint(args.checkpoint)
+            print(f"Resumed from {args.checkpoint} at iteration {solver.iteration}")
+        for stats in solver.iterate():
+            if args.progress > 0 and stats["iter"] % args.progress == 0:
+                print(f"iter {stats['iter']}: best={stats['best_length']:.3f} "
+                      f"iter_best={stats['iter_best']:.3f} elapsed={stats['elapsed_s']:.1f}s")
+        res = solver.result()
 
     labels = [problem.nodes[i].label for i in res.best_tour]
     save_best_tour_csv(out_dir / "best_tour.csv", labels, res.best_length)
-    save_history_csv(out_dir / "convergence.csv", res.best_history)
+    save_history_csv(out_dir / "convergence.csv", res.best_history, res.history_iters)
 
     plot_tour(problem, res.best_tour, out_dir / "best_tour.png",
               title=f"Best length = {res.best_length:.3f}")
     plot_convergence(res.best_history, out_dir / "convergence.png",
-                     title="Convergence")
+                     title="Convergence", iters=res.history_iters)
 
     print(f"Best length: {res.best_length:.6f}")
     print(f"Elapsed [s]: {res.elapsed_s:.3f}")
+    print(f"Stopped: {res.stop_reason} after {res.iterations} iterations")
+    if res.profile_totals is not None:
+        save_runs_csv(out_dir / "profile.csv", res.profile)
+        for key, value in res.profile_totals.items():
+            print(f"  {key}: {value:.3f}" if key.endswith("_s") else f"  {key}: {value}")
     print(f"Best tour (labels): {labels}")
 
     run_summary = {
@@ -82,8 +187,13 @@ def main() -> None:
         "beta": args.beta,
         "rho": args.rho,
         "p_random": args.p_random,
+        "variant": args.variant,
+        "local_search": args.local_search,
+        "islands": max(args.islands, 1),
         "best_length": res.best_length,
         "elapsed_s": res.elapsed_s,
+        "iterations": res.iterations,
+        "stop_reason": res.stop_reason,
     }
     save_runs_csv(out_dir / "run_summary.csv", [run_summary])
 
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from src.aco.checkpoint import CheckpointWriter, load_checkpoint
+from src.aco.pheromone import PheromoneMatrix
+from src.aco.solver import ACOConfig, ACOSolver
+from src.aco.tsplib import load_problem
+from src.tests.test_engines import DATA
+
+
+@pytest.fixture(scope="module")
+def problem():
+    return load_problem(DATA)
+
+
+def config(tmp_path, **kwargs):
+    base = dict(m=8, T=12, alpha=1.0, beta=3.0, rho=0.2, p_random=0.0, variant="mmas", seed=7,
+                checkpoint_path=str(tmp_path / "run.npz"), checkpoint_every=4)
+    return ACOConfig(**{**base, **kwargs})
+
+
+def test_resumed_run_matches_uninterrupted_run(problem, tmp_path):
+    full = ACOSolver(problem, config(tmp_path, checkpoint_path=None)).solve()
+    with ACOSolver(problem, config(tmp_path, T=8)) as first:
+        first.solve()
+    with ACOSolver(problem, config(tmp_path)) as resumed:
+        resumed.load_checkpoint(str(tmp_path / "run.npz"))
+        result = resumed.solve()
+
+    assert result.best_history == full.best_history
+    assert result.best_tour == full.best_tour
+
+
+def test_resume_rejects_a_different_configuration(problem, tmp_path):
+    with ACOSolver(problem, config(tmp_path, T=4)) as solver:
+        solver.solve()
+    with pytest.raises(ValueError, match="alpha, rho"):
+        ACOSolver(problem, config(tmp_path, alpha=2.0, rho=0.1)).load_checkpoint(str(tmp_path / "run.npz"))
+
+
+def test_writer_saves_a_copy_and_reuses_its_buffer(tmp_path):
+    pher = PheromoneMatrix(6, 1.0)
+    writer = CheckpointWriter(tmp_path / "pher.npz")
+    writer.submit({"pher_raw": pher.raw}, copies=("pher_raw",))
+    # the matrix may change as soon as submit returns
+    pher.deposit(np.array([[0, 1, 2, 3, 4, 5]]), [5.0])
+    writer.flush()
+    assert np.all(load_checkpoint(tmp_path / "pher.npz")["pher_raw"] == 1.0)
+    assert pher.raw[0, 1] == 6.0
+
+    buffer = writer._buffers["pher_raw"][0]
+    writer.submit({"pher_raw": pher.raw}, copies=("pher_raw",))
+    writer.close()
+    assert load_checkpoint(tmp_path / "pher.npz")["pher_raw"][0, 1] == 6.0
+    # nothing was being written, so the same buffer was used again
+    assert len(writer._buffers["pher_raw"]) == 1 and writer._buffers["pher_raw"][0] is buffer
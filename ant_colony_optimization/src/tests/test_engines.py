@@ -0,0 +1,127 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import List, Sequence
+
+import random
+
+import numpy as np
+import pytest
+
+from src.aco.ant import construct_tour, construct_tour_np, construct_tours_batched
+from src.aco.solver import ACOConfig, ACOSolver
+from src.aco.tsplib import load_problem
+
+DATA = Path(__file__).resolve().parents[2] / "data" / "A-n32-k5.txt"
+ALPHA, BETA = 1.0, 5.0
+M = 6
+
+class Replay:
+    # feeds a fixed sequence of uniforms to both random APIs, so the engines can be compared
+    # draw for draw: the python engine through the random module, the others as a Generator
+    def __init__(self, values: Sequence[float]):
+        self.values = list(values)
+        self.pos = 0
+
+    def _take(self, k: int) -> np.ndarray:
+        out = np.array(self.values[self.pos:self.pos + k])
+        assert len(out) == k, "replay exhausted"
+        self.pos += k
+        return out
+
+    def random(self, size: int | None = None) -> float | np.ndarray:
+        return float(self._take(1)[0]) if size is None else self._take(size)
+
+    def integers(self, n: int, size: int | None = None) -> int | np.ndarray:
+        u = self.random(size)
+        return int(u * n) if size is None else (u * n).astype(np.intp)
+
+    def randrange(self, n: int) -> int:
+        return int(self.random() * n)
+
+@pytest.fixture(scope="module")
+def problem():
+    return load_problem(str(DATA))
+
+@pytest.fixture(scope="module")
+def trails(problem):
+    # non-uniform symmetric trails, so the pheromone term matters
+    rng = np.random.default_rng(7)
+    t = rng.uniform(0.1, 2.0, size=(problem.n, problem.n))
+    return (t + t.T) / 2.0
+
+def python_tours(problem, pher, streams: List[List[float]], monkeypatch, candidate_lists=None) -> List[List[int]]:
+    tours = []
+    for stream in streams:
+        replay = Replay(stream)
+        monkeypatch.setattr(random, "random", replay.random)
+        monkeypatch.setattr(random, "randrange", replay.randrange)
+        tours.append(construct_tour(
+            n=problem.n, dist=problem.dist, pher=pher.tolist(), alpha=ALPHA, beta=BETA, p_random=0.0,
+            candidate_lists=candidate_lists,
+        ))
+        monkeypatch.undo()
+    return tours
+
+def sequential_streams(u: np.ndarray, m: int, n: int) -> List[List[float]]:
+    # construct_tour_np: every ant takes its start and its n - 1 steps in turn
+    return [u[a * n:(a + 1) * n].tolist() for a in range(m)]
+
+def batched_streams(u: np.ndarray, m: int, n: int) -> List[List[float]]:
+    # construct_tours_batched: m starts, then one draw per ant and step
+    return [[u[a]] + [u[m + (k - 1) * m + a] for k in range(1, n)] for a in range(m)]
+
+@pytest.mark.parametrize("n_candidates", [0, 5])
+def test_numpy_engine_matches_python(problem, trails, monkeypatch, n_candidates):
+    n = problem.n
+    u = np.random.default_rng(1).random(M * n)
+    choice = trails ** ALPHA * problem.heuristic(BETA)
+    cand = problem.candidate_lists(n_candidates) if n_candidates else None
+    cand_choice = np.take_along_axis(choice, cand, axis=1) if n_candidates else None
+
+    replay = Replay(u)
+    tours = [construct_tour_np(n, choice, 0.0, replay, cand=cand, cand_choice=cand_choice) for _ in range(M)]
+    expected = python_tours(problem, trails, sequential_streams(u, M, n), monkeypatch,
+                            None if cand is None else cand.tolist())
+
+    assert tours == expected
+    assert [problem.tour_length(t) for t in tours] == [problem.tour_length(t) for t in expected]
+
+@pytest.mark.parametrize("n_candidates", [0, 5])
+def test_batched_engine_matches_python(problem, trails, monkeypatch, n_candidates):
+    n = problem.n
+    u = np.random.default_rng(2).random(M * n)
+    choice = trails ** ALPHA * problem.heuristic(BETA)
+    cand = problem.candidate_lists(n_candidates) if n_candidates else None
+    cand_choice = np.take_along_axis(choice, cand, axis=1) if n_candidates else None
+
+    tours = construct_tours_batched(M, n, choice, 0.0, Replay(u), cand=cand, cand_choice=cand_choice)
+    expected = python_tours(problem, trails, batched_streams(u, M, n), monkeypatch,
+                            None if cand is None else cand.tolist())
+
+    assert tours.tolist() == expected
+    np.testing.assert_allclose(problem.tour_lengths(tours), [problem.tour_length(t) for t in expected])
+
+@pytest.mark.parametrize("engine,n_candidates", [("python", 0), ("python", 8), ("numpy", 0), ("batched", 0), ("numpy", 8), ("batched", 8)])
+def test_seeded_solver_is_reproducible(problem, engine, n_candidates):
+    cfg = ACOConfig(m=10, T=15, alpha=ALPHA, beta=BETA, rho=0.3, p_random=0.01, engine=engine,
+                    n_candidates=n_candidates, seed=123)
+    first = ACOSolver(problem, cfg).solve()
+    # the python engine must not depend on the state the random module was left in
+    random.random()
+    second = ACOSolver(problem, cfg).solve()
+
+    assert first.best_tour == second.best_tour
+    assert first.best_length == second.best_length
+    assert first.best_history == second.best_history
+    assert sorted(first.best_tour) == list(range(problem.n))
+    assert first.best_length == pytest.approx(problem.tour_length(first.best_tour))
+
+@pytest.mark.parametrize("engine", ["numpy", "batched"])
+def test_parallel_profile_includes_worker_counters(problem, engine):
+    # with p_random = 1 every move is random, so the count does not depend on the streams
+    kwargs = dict(m=8, T=3, alpha=ALPHA, beta=BETA, rho=0.3, p_random=1.0, engine=engine, seed=5, profile=True)
+    serial = ACOSolver(problem, ACOConfig(**kwargs)).solve().profile_totals
+    with ACOSolver(problem, ACOConfig(**kwargs, workers=2)) as solver:
+        parallel = solver.solve().profile_totals
+
+    assert parallel["random_moves"] == serial["random_moves"] > 0
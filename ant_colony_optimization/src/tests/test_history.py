@@ -0,0 +1,44 @@
+import numpy as np
+
+from src.aco.plotting import _bucket_band, band_stats
+from src.aco.profiling import Profiler
+from src.aco.sampling import Sampler
+
+
+def test_band_is_built_on_the_union_of_iterations():
+    x, mean, lo, hi = band_stats([[5.0, 4.0, 3.0], [6.0, 2.0]], iters=[[1, 4, 9], [1, 3]])
+
+    assert x.tolist() == [1, 3, 4, 9]
+    # the first run still holds 5 at iteration 3, the second one holds 2 from there on
+    assert mean.tolist() == [5.5, 3.5, 3.0, 2.5]
+    assert lo.tolist() == [5.0, 2.0, 2.0, 2.0]
+    assert hi.tolist() == [6.0, 5.0, 4.0, 3.0]
+
+
+def test_profiler_rows_are_bounded_but_totals_are_not():
+    profiler = Profiler(1000, "decimate", 16)
+    sampler = Sampler(timed=True)
+    for it in range(1, 1001):
+        sampler.random_moves += 2
+        profiler.end_iteration(it, sampler)
+
+    rows = profiler.history
+    assert len(rows) <= 17
+    assert rows[-1]["iter"] == 1000
+    assert np.all(np.diff([r["iter"] for r in rows]) > 0)
+    assert profiler.totals()["random_moves"] == 2000
+
+
+def test_band_downsampling_keeps_the_extremes():
+    rng = np.random.default_rng(0)
+    x = np.arange(1, 10_001)
+    mean = rng.random(len(x))
+    lo, hi = mean - rng.random(len(x)), mean + rng.random(len(x))
+    lo[4321], hi[8765] = -50.0, 50.0
+
+    bx, bmean, blo, bhi = _bucket_band(x, mean, lo, hi, 200)
+
+    assert len(bx) <= 200
+    assert bx[0] == 1 and bx[-1] == 10_000
+    assert blo.min() == -50.0 and bhi.max() == 50.0
+    assert np.all(blo <= bmean) and np.all(bmean <= bhi)
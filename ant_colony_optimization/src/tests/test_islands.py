@@ -0,0 +1,58 @@
+import pytest
+
+from src.aco.islands import IslandModel, island_configs
+from src.aco.solver import ACOConfig, ACOSolver
+from src.aco.tsplib import load_problem
+from src.tests.test_engines import DATA
+
+ISLANDS = 3
+
+
+@pytest.fixture(scope="module")
+def problem():
+    return load_problem(DATA)
+
+
+def configs(T=10):
+    cfg = ACOConfig(m=4, T=T, alpha=1.0, beta=3.0, rho=0.2, p_random=0.05, seed=11)
+    return island_configs(cfg, ISLANDS)
+
+
+def test_seeded_island_runs_are_reproducible(problem):
+    first = IslandModel(problem, configs(), migrate_every=3).solve()
+    second = IslandModel(problem, configs(), migrate_every=3).solve()
+
+    assert [r.best_history for r in first.results] == [r.best_history for r in second.results]
+    assert [r.best_tour for r in first.results] == [r.best_tour for r in second.results]
+    assert first.adopted == second.adopted
+
+
+def test_best_tours_are_exchanged_every_migrate_every_iterations(problem):
+    rounds = []
+    result = IslandModel(problem, configs(), migrate_every=3).solve(
+        on_exchange=lambda rnd, best: rounds.append((rnd, dict(best)))
+    )
+
+    # T = 10: exchanges after iterations 3, 6 and 9
+    assert [rnd for rnd, _ in rounds] == [1, 2, 3]
+    assert result.exchanges == 3
+    assert sum(result.adopted) > 0
+    for rnd, offered in rounds:
+        it = 3 * rnd
+        for idx, res in enumerate(result.results):
+            # from the next iteration on every island is at least as good as the previous
+            # island of the ring was at the exchange
+            neighbour = offered[(idx - 1) % ISLANDS]
+            assert res.best_history[it] <= min(offered[idx], neighbour)
+
+
+def test_islands_without_migration_match_plain_runs(problem):
+    cfgs = configs()
+    result = IslandModel(problem, cfgs, migrate_every=cfgs[0].T + 1).solve()
+
+    assert result.exchanges == 0
+    assert result.adopted == [0] * ISLANDS
+    for cfg, res in zip(cfgs, result.results):
+        plain = ACOSolver(problem, cfg).solve()
+        assert res.best_history == plain.best_history
+        assert res.best_tour == plain.best_tour
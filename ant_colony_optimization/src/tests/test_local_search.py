@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from src.aco.local_search import improve_tour, or_opt, two_opt
+
+
+def instance(n, seed):
+    xy = np.random.default_rng(seed).random((n, 2))
+    dist = np.sqrt(((xy[:, None] - xy[None]) ** 2).sum(axis=-1))
+    neighbors = [np.argsort(dist[i])[1:8].tolist() for i in range(n)]
+    return dist, neighbors
+
+
+def length(tour, dist):
+    return float(dist[tour, np.roll(tour, -1)].sum())
+
+
+def circle(n):
+    # cities on a circle: the optimal tour visits them in angular order
+    angles = 2.0 * np.pi * np.arange(n) / n
+    xy = np.stack([np.cos(angles), np.sin(angles)], axis=1)
+    dist = np.sqrt(((xy[:, None] - xy[None]) ** 2).sum(axis=-1))
+    neighbors = [np.argsort(dist[i])[1:].tolist() for i in range(n)]
+    return dist, neighbors, length(list(range(n)), dist)
+
+
+@pytest.mark.parametrize("method", ["2opt", "oropt", "2opt+oropt"])
+@pytest.mark.parametrize("seed", range(10))
+def test_local_search_returns_a_permutation_that_is_never_longer(method, seed):
+    n = 5 + 7 * seed
+    dist, neighbors = instance(n, seed)
+    tour = np.random.default_rng(seed).permutation(n).tolist()
+    improved = improve_tour(tour, dist, neighbors, method)
+
+    assert sorted(improved) == list(range(n))
+    assert length(improved, dist) <= length(tour, dist) + 1e-9
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_two_opt_untangles_a_convex_instance(seed):
+    dist, neighbors, best = circle(24)
+    tour = np.random.default_rng(seed).permutation(24).tolist()
+
+    assert length(two_opt(tour, dist, neighbors), dist) == pytest.approx(best)
+
+
+@pytest.mark.parametrize("seg", [[5], [5, 6], [5, 6, 7]])
+@pytest.mark.parametrize("to", [1, 12, 20])
+def test_or_opt_puts_a_displaced_segment_back(seg, to):
+    dist, neighbors, best = circle(24)
+    # the optimal tour with seg cut out and put in again (reversed) elsewhere
+    rest = [c for c in range(24) if c not in seg]
+    tour = rest[:to] + seg[::-1] + rest[to:]
+    assert length(tour, dist) > best
+
+    improved = or_opt(tour, dist, neighbors)
+    assert sorted(improved) == list(range(24))
+    assert length(improved, dist) == pytest.approx(best)
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from src.aco.pheromone import CandidatePheromone, PheromoneMatrix
+
+N, M = 12, 5
+
+def dense_deposit(tau: np.ndarray, tours: np.ndarray, amounts: np.ndarray) -> None:
+    # the eager update the lazy matrix replaced
+    for tour, amount in zip(tours, amounts):
+        for a, b in zip(tour, np.roll(tour, -1)):
+            tau[a, b] += amount
+            tau[b, a] += amount
+
+def dense_blend(tau: np.ndarray, tour: np.ndarray, rate: float, target: float) -> None:
+    for a, b in zip(tour, np.roll(tour, -1)):
+        tau[a, b] = (1.0 - rate) * tau[a, b] + rate * target
+        tau[b, a] = (1.0 - rate) * tau[b, a] + rate * target
+
+@pytest.mark.parametrize("dtype,rtol", [(np.float64, 1e-12), (np.float32, 1e-5)])
+@pytest.mark.parametrize("min_scale", [None, 0.3])
+def test_lazy_matrix_matches_dense_update(dtype, rtol, min_scale):
+    rng = np.random.default_rng(0)
+    rho, tau0 = 0.2, 1.0
+    pher = PheromoneMatrix(N, tau0, dtype=dtype)
+    if min_scale is not None:
+        # fold the scale back into the values every few iterations
+        pher.min_scale = min_scale
+    tau = np.full((N, N), tau0)
+    renormalized = 0
+
+    for it in range(60):
+        pher.evaporate(rho)
+        tau *= 1.0 - rho
+        renormalized += pher.scale == 1.0
+
+        tours = np.array([rng.permutation(N) for _ in range(M)])
+        amounts = rng.uniform(0.01, 0.1, M)
+        pher.deposit(tours, amounts)
+        dense_deposit(tau, tours, amounts)
+
+        if it % 7 == 0:
+            pher.blend(tours[0], 0.1, tau0)
+            dense_blend(tau, tours[0], 0.1, tau0)
+        if it % 11 == 0:
+            pher.clamp(0.05, 0.5)
+            np.clip(tau, 0.05, 0.5, out=tau)
+
+        np.testing.assert_allclose(pher.values(), tau, rtol=rtol)
+        np.testing.assert_allclose(pher[3], tau[3], rtol=rtol)
+
+    if min_scale is not None:
+        assert renormalized > 5
+
+def test_scale_is_folded_back_before_underflow():
+    pher = PheromoneMatrix(4, 1.0)
+    tau = np.ones((4, 4))
+    folded = 0
+    for _ in range(300):
+        pher.evaporate(0.9)
+        tau *= 0.1
+        folded += pher.scale == 1.0
+        assert pher.scale >= pher.min_scale
+    # 1e-300 is still a normal float64, the scale alone would have underflowed long before
+    assert folded >= 1
+    np.testing.assert_allclose(pher.values(), tau, rtol=1e-9)
+
+def test_reset_restores_uniform_trails():
+    pher = PheromoneMatrix(5, 1.0)
+    pher.evaporate(0.5)
+    pher.deposit(np.array([[0, 1, 2, 3, 4]]), [1.0])
+    pher.reset(2.0)
+    np.testing.assert_array_equal(pher.values(), np.full((5, 5), 2.0))
+
+def test_candidate_trails_match_dense_matrix_on_candidate_edges():
+    rng = np.random.default_rng(3)
+    xy = rng.random((N, 2))
+    d = np.hypot(*(xy[:, None, :] - xy[None, :, :]).transpose(2, 0, 1))
+    np.fill_diagonal(d, np.inf)
+    cand = np.argsort(d, axis=1)[:, :4]
+    on_list = np.zeros((N, N), dtype=bool)
+    on_list[np.arange(N)[:, None], cand] = True
+
+    pher = CandidatePheromone(cand, 1.0, dtype=np.float64)
+    dense = PheromoneMatrix(N, 1.0)
+    rest = 1.0
+    for it in range(40):
+        pher.evaporate(0.3)
+        dense.evaporate(0.3)
+        rest *= 0.7
+        tours = np.array([rng.permutation(N) for _ in range(M)])
+        amounts = rng.uniform(0.01, 0.1, M)
+        pher.deposit(tours, amounts)
+        dense.deposit(tours, amounts)
+        if it % 5 == 0:
+            pher.blend(tours[0], 0.1, 1.0)
+            dense.blend(tours[0], 0.1, 1.0)
+
+        np.testing.assert_allclose(pher.candidate_values(cand), dense.candidate_values(cand), rtol=1e-12)
+        row = pher[2]
+        np.testing.assert_allclose(row[on_list[2]], dense[2][on_list[2]], rtol=1e-12)
+        off = ~on_list[2]
+        off[2] = False
+        np.testing.assert_allclose(row[off], rest, rtol=1e-12)
+
+    pher.clamp(0.2, 0.4)
+    assert 0.2 <= pher.rest * pher.scale <= 0.4
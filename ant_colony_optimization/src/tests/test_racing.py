@@ -0,0 +1,70 @@
+from typing import Dict, List
+
+import numpy as np
+import pytest
+
+from src.aco.solver import ACOConfig, ACOResult
+from src.experiment.racing import dominated, successive_halving
+
+CONFIGS = [ACOConfig(m=k + 1, T=0, alpha=1.0, beta=5.0, rho=0.3, p_random=0.0) for k in range(8)]
+
+
+def result(length: float) -> ACOResult:
+    return ACOResult(best_tour=[], best_length=length, best_history=[], elapsed_s=0.0,
+                     iter_best=[], iter_mean=[], iter_worst=[])
+
+
+class FakeEvaluate:
+    # config k has mean best length 100 + 10 k with a little noise; records every budget asked for
+    def __init__(self, noise: float = 1.0):
+        self.rng = np.random.default_rng(0)
+        self.noise = noise
+        self.calls: List[tuple] = []
+
+    def __call__(self, cfgs: List[ACOConfig], indices: List[int], repeats: int) -> Dict[int, List[ACOResult]]:
+        self.calls.append((len(cfgs), cfgs[0].T, repeats))
+        return {ci: [result(100.0 + 10.0 * ci + self.noise * self.rng.standard_normal()) for _ in range(repeats)]
+                for ci in indices}
+
+
+def test_race_halves_the_field_and_finds_the_best_config():
+    evaluate = FakeEvaluate()
+    rungs = successive_halving(CONFIGS, evaluate, min_T=10, max_T=80, min_repeats=2, max_repeats=8)
+
+    assert len(rungs[0].results) == 8
+    for rung, nxt in zip(rungs, rungs[1:]):
+        assert len(nxt.results) <= len(rung.results) // 2
+        assert set(nxt.results) == set(rung.survivors)
+        assert set(rung.survivors) <= set(sorted(rung.results)[: len(rung.results) // 2])
+    assert rungs[-1].survivors == [0]
+    assert all(T <= 80 and repeats <= 8 for _, T, repeats in evaluate.calls)
+
+
+def test_race_stops_at_the_budget_cap():
+    # identical configs never thin out below 1/eta; the race ends once max_T and max_repeats are reached
+    flat = lambda cfgs, indices, repeats: {ci: [result(100.0)] * repeats for ci in indices}
+    rungs = successive_halving(CONFIGS, flat, min_T=10, max_T=40, min_repeats=2, max_repeats=4, eta=2)
+
+    assert [(r.T, r.repeats) for r in rungs] == [(10, 2), (20, 4), (40, 4)]
+    assert len(rungs[-1].survivors) == 1
+
+
+def test_race_clamps_minimum_budget_above_the_maximum():
+    evaluate = FakeEvaluate()
+    rungs = successive_halving(CONFIGS, evaluate, min_T=50, max_T=20, min_repeats=6, max_repeats=3)
+
+    assert len(rungs) == 1
+    assert evaluate.calls == [(8, 20, 3)]
+    assert rungs[0].survivors == [0]
+
+
+def test_race_rejects_empty_budgets():
+    with pytest.raises(ValueError):
+        successive_halving(CONFIGS, FakeEvaluate(), min_T=0, max_T=20, min_repeats=2, max_repeats=4)
+
+
+def test_dominated_is_a_one_sided_test():
+    leader = [100.0, 101.0, 99.0, 100.5]
+    assert dominated([120.0, 121.0, 119.0, 120.5], leader)
+    assert not dominated([100.2, 101.1, 99.3, 100.4], leader)
+    assert not dominated([90.0, 91.0, 89.0, 90.5], leader)
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from src.aco.sampling import AliasTable, Sampler
+
+# 99.9% quantile of chi-square with 19 degrees of freedom
+CHI2_19 = 43.82
+
+
+def implied(table):
+    # probability of every column: its own share plus what the columns aliased to it give away
+    prob = np.array(table.prob)
+    p = prob.copy()
+    np.add.at(p, np.array(table.alias), 1.0 - prob)
+    return p / table.n
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_alias_table_reproduces_the_weights(seed):
+    rng = np.random.default_rng(seed)
+    w = rng.random(int(rng.integers(1, 60))) ** rng.integers(1, 8)
+    w[rng.random(len(w)) < 0.2] = 0.0
+    if w.sum() == 0.0:
+        w[0] = 1.0
+
+    assert np.allclose(implied(AliasTable(w)), w / w.sum(), rtol=0.0, atol=1e-12)
+
+
+def test_alias_table_of_zero_weights_is_uniform():
+    assert np.allclose(implied(AliasTable(np.zeros(7))), 1.0 / 7)
+
+
+def chi2(counts, p):
+    expected = p * counts.sum()
+    return float(((counts - expected) ** 2 / expected).sum())
+
+
+def test_alias_and_cumsum_draws_follow_the_same_distribution():
+    n, draws = 24, 40_000
+    rng = np.random.default_rng(3)
+    row = rng.random(n) ** 3 + 0.01
+    unvisited = np.ones(n, dtype=bool)
+    # city 5 is the current one, 0, 7 and 13 were visited before
+    unvisited[[0, 5, 7, 13]] = False
+    p = np.where(unvisited, row, 0.0) / row[unvisited].sum()
+
+    counts = {}
+    for method in ("cumsum", "alias"):
+        sampler = Sampler(method)
+        sampler.reset(ants=100)
+        counts[method] = np.bincount(
+            [sampler.row_choice(5, row, unvisited, int(unvisited.sum()), rng) for _ in range(draws)], minlength=n
+        )
+        assert sampler.method != "alias" or 5 in sampler._tables
+
+    free = p > 0.0
+    for method, c in counts.items():
+        assert c[~free].sum() == 0
+        assert chi2(c[free], p[free]) < CHI2_19
+    # both samples come from one distribution: the two-sample statistic stays small too
+    a, b = counts["alias"][free], counts["cumsum"][free]
+    assert float(((a - b) ** 2 / (a + b)).sum()) < CHI2_19
+
+
+def test_alias_tables_are_only_built_when_enough_ants_reuse_them():
+    rng = np.random.default_rng(0)
+    row = rng.random(50)
+    sampler = Sampler("alias")
+    sampler.reset(ants=4)
+    sampler.row_choice(0, row, np.ones(50, dtype=bool), 49, rng)
+    assert not sampler._tables
+
+    sampler.reset(ants=100)
+    sampler.row_choice(0, row, np.ones(50, dtype=bool), 49, rng)
+    assert list(sampler._tables) == [0]
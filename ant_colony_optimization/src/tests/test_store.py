@@ -0,0 +1,83 @@
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.aco.solver import ACOConfig, ACOResult
+from src.aco.tsplib import file_digest
+from src.experiment.store import ResultStore
+from src.tests.test_engines import DATA
+
+ROOT = Path(__file__).resolve().parents[2]
+
+CFG = ACOConfig(m=5, T=3, alpha=1.0, beta=5.0, rho=0.3, p_random=0.0)
+
+
+def result(length):
+    return ACOResult(best_tour=[0, 1, 2], best_length=length, best_history=[length + 1, length, length],
+                     elapsed_s=0.1, iter_best=[length] * 3, iter_mean=[length] * 3, iter_worst=[length] * 3,
+                     history_iters=[1, 2, 3])
+
+
+def test_queries_see_only_this_instance_and_the_current_repeats(tmp_path):
+    path = tmp_path / "results.sqlite"
+    with ResultStore(path, "a") as store:
+        cid = store.config_id(CFG, "tag")
+        for r, length in enumerate([10.0, 20.0, 30.0, 1.0]):
+            store.add_run(cid, r, r, result(length))
+    with ResultStore(path, "b") as store:
+        other = store.config_id(CFG, "tag")
+        store.add_run(other, 0, 0, result(100.0))
+        assert other != cid
+        assert [row["best_mean"] for row in store.summary()] == [100.0]
+
+    with ResultStore(path, "a") as store:
+        (row,) = store.summary([cid], repeats=3)
+        assert row["n_runs"] == 3
+        assert row["best_mean"] == 20.0
+        assert row["best_median"] == 20.0
+        assert store.param_means("rho", [cid], repeats=3) == ([0.3], [20.0])
+        iters, values = store.history(cid, repeats=2)
+        assert values.shape == (2, 3)
+        assert store.best_tour(cid, repeats=3)[1] == 10.0
+        assert store.best_tour(cid)[1] == 1.0
+
+
+def test_old_store_is_rejected(tmp_path):
+    path = tmp_path / "results.sqlite"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE configs (config_id INTEGER PRIMARY KEY, config TEXT UNIQUE)")
+    conn.close()
+    with pytest.raises(ValueError, match="another version"):
+        ResultStore(path, "a")
+
+
+def run_sweep(out_dir, *extra):
+    cmd = [sys.executable, "-m", "src.experiment.run_experiments", "--data_file", str(DATA),
+           "--out_dir", str(out_dir), "--m_list", "4", "--T_list", "5", "--repeats", "2",
+           "--store", "sqlite", "--plots", "none", *extra]
+    return subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True, check=False)
+
+
+def test_sqlite_sweep_writes_no_per_job_files_and_resumes_from_the_store(tmp_path):
+    first = run_sweep(tmp_path, "--profile")
+    assert first.returncode == 0, first.stderr
+    files = sorted(p.relative_to(tmp_path).as_posix() for p in tmp_path.rglob("*") if p.is_file())
+    assert not any(name.endswith(".json") for name in files)
+    assert not (tmp_path / "cache").exists()
+
+    with ResultStore(tmp_path / "results.sqlite", file_digest(DATA)) as store:
+        (row,) = store.summary()
+        assert len(store.profile(row["config_id"], 0)) == 5
+
+    second = run_sweep(tmp_path, "--profile")
+    assert second.returncode == 0, second.stderr
+    assert second.stdout.count("cached") == 2
+
+
+def test_race_rejects_the_sqlite_store(tmp_path):
+    result = run_sweep(tmp_path, "--mode", "race")
+    assert result.returncode != 0
+    assert "--store sqlite" in result.stderr
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from src.aco.solver import ACOConfig, ACOSolver
+from src.aco.termination import stagnation_measure
+from src.aco.tsplib import load_problem
+from src.tests.test_engines import DATA
+from src.tests.test_pheromone import dense_deposit
+
+MEASURES = ("branching", "entropy")
+
+
+@pytest.fixture(scope="module")
+def problem():
+    return load_problem(DATA)
+
+
+def converged(n, seed=0):
+    # what a converged colony leaves behind: the edges of one tour far above all others
+    tau = np.full((n, n), 1e-6)
+    dense_deposit(tau, np.random.default_rng(seed).permutation(n)[None], np.array([1.0]))
+    return tau
+
+
+def solver_with(problem, measure, tau, threshold):
+    cfg = ACOConfig(m=4, T=100, alpha=1.0, beta=3.0, rho=0.2, p_random=0.0, seed=1,
+                    stagnation=measure, stagnation_threshold=threshold, stagnation_every=1)
+    solver = ACOSolver(problem, cfg)
+    solver.pher.raw[:] = tau
+    solver.iteration = 1
+    return solver
+
+
+@pytest.mark.parametrize("measure", MEASURES)
+def test_uniform_trails_count_every_edge(measure):
+    assert stagnation_measure(measure, np.full((12, 12), 0.3)) == pytest.approx(11.0)
+
+
+@pytest.mark.parametrize("measure", MEASURES)
+def test_converged_trails_leave_two_edges_per_city(measure):
+    assert stagnation_measure(measure, converged(12)) == pytest.approx(2.0, abs=1e-3)
+
+
+@pytest.mark.parametrize("measure", MEASURES)
+def test_uniform_trails_do_not_stop_the_run(problem, measure):
+    solver = solver_with(problem, measure, np.full((problem.n, problem.n), 0.3), threshold=2.5)
+    assert solver.stop_reason(0.0) is None
+
+
+@pytest.mark.parametrize("measure", MEASURES)
+def test_converged_trails_stop_the_run_at_the_threshold(problem, measure):
+    tau = converged(problem.n)
+    value = stagnation_measure(measure, tau)
+
+    assert solver_with(problem, measure, tau, threshold=2.5).stop_reason(0.0) == "stagnation"
+    # the criterion is strict: a threshold at (or below) the measured value does not fire
+    assert solver_with(problem, measure, tau, threshold=value).stop_reason(0.0) is None
+
+
+def test_stagnation_is_only_checked_every_few_iterations(problem):
+    solver = solver_with(problem, "branching", converged(problem.n), threshold=2.5)
+    solver.cfg.stagnation_every = 10
+    solver.iteration = 7
+    assert solver.stop_reason(0.0) is None
+    solver.iteration = 10
+    assert solver.stop_reason(0.0) == "stagnation"
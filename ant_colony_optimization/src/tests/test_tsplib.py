@@ -0,0 +1,49 @@
+import numpy as np
+
+from src.aco.tsplib import load_tsplib_problem
+
+ULYSSES16 = """NAME: ulysses16
+TYPE: TSP
+DIMENSION: 16
+EDGE_WEIGHT_TYPE: GEO
+NODE_COORD_SECTION
+1 38.24 20.42
+2 39.57 26.15
+3 40.56 25.32
+4 36.26 23.12
+5 33.48 10.54
+6 37.56 12.19
+7 38.42 13.11
+8 37.52 20.44
+9 41.23 9.10
+10 41.17 13.05
+11 36.08 -5.21
+12 38.47 15.13
+13 38.15 15.35
+14 37.51 15.17
+15 35.49 14.32
+16 39.36 19.56
+EOF
+"""
+
+# optimal tour from ulysses16.opt.tour
+OPT_TOUR = [1, 14, 13, 12, 7, 6, 15, 5, 11, 9, 10, 16, 3, 2, 4, 8]
+
+
+def test_geo_distances_match_tsplib_optimum(tmp_path):
+    path = tmp_path / "ulysses16.tsp"
+    path.write_text(ULYSSES16)
+    problem = load_tsplib_problem(path)
+    assert problem.tour_length([i - 1 for i in OPT_TOUR]) == 6859
+    assert np.array_equal(problem.dist_array(), problem.dist_array().T)
+
+
+def test_geo_uses_tsplib_pi(tmp_path):
+    # a pair whose distance is 11819 with math.pi instead of PI = 3.141592
+    path = tmp_path / "pair.tsp"
+    path.write_text(
+        "NAME: pair\nTYPE: TSP\nDIMENSION: 2\nEDGE_WEIGHT_TYPE: GEO\n"
+        "NODE_COORD_SECTION\n1 52.39 -13.48\n2 -40.23 45.23\nEOF\n"
+    )
+    problem = load_tsplib_problem(path)
+    assert problem.dist_array()[0, 1] == 11818
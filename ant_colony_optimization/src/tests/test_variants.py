@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from src.aco.solver import ACOConfig, ACOSolver
+from src.aco.tsplib import load_problem
+from src.tests.test_engines import DATA
+from src.tests.test_pheromone import dense_blend, dense_deposit
+
+
+@pytest.fixture(scope="module")
+def problem():
+    return load_problem(DATA)
+
+
+def config(variant, **kwargs):
+    base = dict(m=8, T=30, alpha=1.0, beta=3.0, rho=0.2, p_random=0.0, variant=variant, seed=5)
+    return ACOConfig(**{**base, **kwargs})
+
+
+def test_mmas_keeps_the_trails_within_the_limits(problem):
+    # a short stagnation limit also exercises the re-initialization at tau_max
+    solver = ACOSolver(problem, config("mmas", mmas_stagnation=3, mmas_gb_every=4))
+    for _ in range(30):
+        solver.step()
+        tau = solver.pher.values()
+        assert solver.tau_min > 0.0
+        assert tau.min() >= solver.tau_min * (1.0 - 1e-12)
+        assert tau.max() <= solver.tau_max * (1.0 + 1e-12)
+
+
+def test_rank_deposits_on_the_best_ranked_tours_and_the_best_so_far(problem):
+    cfg = config("rank", rank_w=4)
+    solver = ACOSolver(problem, cfg)
+    for _ in range(5):
+        tau = solver.pher.values()
+        ants, _ = solver.step()
+
+        ranked = sorted(ants, key=lambda a: a.length)[: cfg.rank_w - 1]
+        tours = np.array([a.tour for a in ranked] + [solver.best_tour])
+        amounts = np.array(
+            [(cfg.rank_w - r) * cfg.deposit_q / a.length for r, a in enumerate(ranked, start=1)]
+            + [cfg.rank_w * cfg.deposit_q / solver.best_length]
+        )
+        expected = tau * (1.0 - cfg.rho)
+        dense_deposit(expected, tours, amounts)
+        # every other edge only evaporated
+        assert np.allclose(solver.pher.values(), expected, rtol=1e-12, atol=0.0)
+
+
+def test_acs_decays_the_trails_of_each_tour_during_construction(problem):
+    cfg = config("acs", xi=0.3)
+    solver = ACOSolver(problem, cfg)
+    # one full iteration first, so that the trails are no longer all at tau0
+    solver.step()
+
+    tau = solver.pher.values()
+    choice, cand_choice = solver._build_choice()
+    tours = solver._construct_sequential(choice, cand_choice)
+    for tour in tours:
+        dense_blend(tau, np.array(tour), cfg.xi, solver.tau0)
+
+    assert np.allclose(solver.pher.values(), tau, rtol=1e-12, atol=0.0)
+    # the ants see the decayed trails: the choice matrix followed every local update
+    eta = problem.heuristic(cfg.beta)
+    edges = np.array([(a, b) for tour in tours for a, b in zip(tour, np.roll(tour, -1))])
+    src, dst = edges[:, 0], edges[:, 1]
+    assert np.allclose(choice[src, dst], tau[src, dst] ** cfg.alpha * eta[src, dst], rtol=1e-12)
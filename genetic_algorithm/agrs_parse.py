@@ -7,12 +7,21 @@ def parse_arguments():
     parser.add_argument('--Pm', type=float, default=0.05, help="Prawdopodobieństwo mutacji")
     parser.add_argument('--N', type=int, default=30, help="Wielkość populacji")
     parser.add_argument('--T', type=int, default=300, help="Liczba iteracji")
-    parser.add_argument('--selection_method', type=str, choices=["roulette", "ranking", "tournament"],
+    parser.add_argument('--selection_method', type=str, choices=["roulette", "ranking", "tournament", "sus"],
                         default="roulette", help="Metoda selekcji nowego rodzica")
     parser.add_argument('--crossover_method', type=str, choices=["one_point", "two_point", "uniform"],
                         default="one_point", help="Metoda krzyżowania w procesie tworzenia potomstwa")
     parser.add_argument('--mutation_method', type=str, choices=["single_bit_flip", "all_bit_inversion"],
                         default="single_bit_flip", help="Metoda mutacji genów w chromosomie")
+    parser.add_argument('--engine', type=str, choices=["python", "numpy", "packed"], default="python",
+                        help="Reprezentacja populacji: listy Pythona, macierz NumPy (N x liczba przedmiotów) "
+                             "lub chromosomy upakowane bitowo (duże instancje)")
+    parser.add_argument('--fitness_cache', type=int, default=0,
+                        help="Rozmiar pamięci podręcznej LRU wartości funkcji przystosowania "
+                             "(liczba chromosomów, domyślnie 0 = wyłączona; tylko silnik python)")
+    parser.add_argument('--delta_fitness', action='store_true',
+                        help="Przyrostowe liczenie funkcji przystosowania: chromosomy przechowują sumę wag "
+                             "i wartości aktualizowaną przez operatory (tylko silnik python)")
     parser.add_argument('--data_file', type=str, default="data/problem plecakowy dane CSV tabulatory.csv",
                         help="Plik csv z dostępnymi do włożenia do plecaka przedmiotami")
 
@@ -30,4 +39,10 @@ def parse_arguments():
     if args.T <= 0:
         parser.error("Liczba iteracji musi być większa od 0.")
 
+    if args.delta_fitness and args.engine != "python":
+        parser.error("Przyrostowe liczenie funkcji przystosowania wymaga silnika python.")
+
+    if args.fitness_cache < 0:
+        parser.error("Rozmiar pamięci podręcznej nie może być ujemny.")
+
     return args
\ No newline at end of file
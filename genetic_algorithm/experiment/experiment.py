@@ -2,15 +2,22 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+import numpy as np
 import pandas as pd
 import random
 import time
 import matplotlib.pyplot as plt
 
 from agrs_parse import parse_arguments
-from genetic import generate_population
+from genetic import generate_population, calculate_fitness
+from fitness_cache import FitnessCache
+from genetic_delta import delta_items, chromosome_totals, fitness_from_totals, evolve_delta
+from genetic_matrix import generate_population_matrix, fitness_matrix, evolve_matrix
+from genetic_packed import (
+    pack_items, generate_population_packed, fitness_packed, evolve_packed, unpack_chromosome
+)
 from utils import (
-    clear_number, fitness, selection, crossover, mutate
+    clear_number, fitness, fitness_function, selection, crossover, mutate, auto_tournament_size
 )
 
 MAX_WEIGHT = 6_404_180
@@ -78,38 +85,111 @@ def plot_mean_best_history(all_runs, outdir):
     plt.close()
 
 
-def run_single(items_array, args):
+def run_single_matrix(items_array, args):
+    # numpy and packed engines: the whole generation is one matrix
+    start = time.time()
+    rng = np.random.default_rng()
+    tournament_size = auto_tournament_size(args.N)
+    n_items = len(items_array)
+
+    if args.engine == "packed":
+        items = pack_items(items_array)
+        generate, evaluate, evolve = generate_population_packed, fitness_packed, evolve_packed
+        decode = lambda chromosome: unpack_chromosome(chromosome, n_items)
+    else:
+        items = items_array
+        generate, evaluate, evolve = generate_population_matrix, fitness_matrix, evolve_matrix
+        decode = lambda chromosome: chromosome.tolist()
+
+    population = generate(args.N, n_items, rng)
+    fitness_values = evaluate(population, items, MAX_WEIGHT)
+
+    best_history = np.empty(args.T)
+    avg_history = np.empty(args.T)
+    worst_history = np.empty(args.T)
+
+    for t in range(args.T):
+        population, fitness_values = evolve(
+            population, fitness_values, items, MAX_WEIGHT, args, tournament_size, rng
+        )
+
+        best_history[t] = fitness_values.max()
+        valid = fitness_values[fitness_values > 0]
+        avg_history[t] = valid.mean() if len(valid) else 0
+        worst_history[t] = valid.min() if len(valid) else 0
+
+    best_idx = int(np.argmax(fitness_values))
+    valid_idx = np.flatnonzero(fitness_values > 0)
+
+    if len(valid_idx):
+        worst_idx = valid_idx[np.argmin(fitness_values[valid_idx])]
+        worst_value = fitness_values[worst_idx]
+        worst_chrom = decode(population[worst_idx])
+    else:
+        worst_value = 0
+        worst_chrom = None
+
+    exec_time = time.time() - start
+
+    return {
+        "best_value": fitness_values[best_idx],
+        "best_chrom": decode(population[best_idx]),
+        "worst_value": worst_value,
+        "worst_chrom": worst_chrom,
+        "best_history": best_history.tolist(),
+        "avg_history": avg_history.tolist(),
+        "worst_history": worst_history.tolist(),
+        "time": exec_time,
+    }
+
+def run_single(items_array, args, fitness_fn=calculate_fitness):
+    # fitness_fn: custom fitness of the python engine, with the signature of calculate_fitness
+    # (not used with --delta_fitness, which only works for the knapsack fitness)
+    if args.engine in ("numpy", "packed"):
+        return run_single_matrix(items_array, args)
+
     start = time.time()
 
     population = generate_population(args.N, len(items_array))
-    fitness_values = fitness(population, items_array, MAX_WEIGHT)
+    if args.delta_fitness:
+        items = delta_items(items_array)
+        totals = [chromosome_totals(chromosome, items) for chromosome in population]
+        fitness_values = fitness_from_totals(totals, MAX_WEIGHT)
+    else:
+        fitness_fn = fitness_function(args.fitness_cache, fitness_fn)
+        fitness_values = fitness(population, items_array, MAX_WEIGHT, fitness_fn)
 
     best_history = []
     avg_history = []
     worst_history = []
 
-    for _ in range(args.T):
-        parents = selection(population, fitness_values, args.selection_method)
+    for generation in range(args.T):
+        if args.delta_fitness:
+            population, totals, fitness_values = evolve_delta(
+                population, totals, fitness_values, items, MAX_WEIGHT, args, generation
+            )
+        else:
+            parents = selection(population, fitness_values, args.selection_method)
 
-        children = []
-        for i in range(0, len(parents), 2):
-            p1 = parents[i]
-            p2 = parents[(i + 1) % len(parents)]
+            children = []
+            for i in range(0, len(parents), 2):
+                p1 = parents[i]
+                p2 = parents[(i + 1) % len(parents)]
 
-            if random.random() < args.Pc:
-                c1, c2 = crossover(p1, p2, args.crossover_method)
-            else:
-                c1, c2 = p1[:], p2[:]
+                if random.random() < args.Pc:
+                    c1, c2 = crossover(p1, p2, args.crossover_method)
+                else:
+                    c1, c2 = p1[:], p2[:]
 
-            children.append(c1)
-            children.append(c2)
+                children.append(c1)
+                children.append(c2)
 
-        for i in range(len(children)):
-            if random.random() < args.Pm:
-                children[i] = mutate(children[i], args.mutation_method)
+            for i in range(len(children)):
+                if random.random() < args.Pm:
+                    children[i] = mutate(children[i], args.mutation_method)
 
-        population = children
-        fitness_values = fitness(population, items_array, MAX_WEIGHT)
+            population = children
+            fitness_values = fitness(population, items_array, MAX_WEIGHT, fitness_fn)
 
         best_history.append(max(fitness_values))
         valid = [f for f in fitness_values if f > 0]
@@ -132,7 +212,7 @@ def run_single(items_array, args):
 
     exec_time = time.time() - start
 
-    return {
+    result = {
         "best_value": best_value,
         "best_chrom": best_chrom,
         "worst_value": worst_value,
@@ -142,6 +222,9 @@ def run_single(items_array, args):
         "worst_history": worst_history,
         "time": exec_time,
     }
+    if isinstance(fitness_fn, FitnessCache):
+        result.update(fitness_fn.stats())
+    return result
 
 if __name__ == "__main__":
     args = parse_arguments()
@@ -166,6 +249,11 @@ if __name__ == "__main__":
         print(f"Run {r+1}/{RUNS} ...")
         res = run_single(items_array, args)
         all_runs.append(res)
+        if "cache_hits" in res:
+            print(
+                f"  fitness cache: {res['cache_hits']} hits, {res['cache_misses']} misses "
+                f"({res['cache_hit_rate']:.1%}), {res['cache_evictions']} evictions"
+            )
 
         plot_progress(
             r + 1,
@@ -198,6 +286,9 @@ if __name__ == "__main__":
             r["best_history"],
             r["avg_history"],
             r["worst_history"],
+            r.get("cache_hits", 0),
+            r.get("cache_misses", 0),
+            r.get("cache_evictions", 0),
         ])
 
     df = pd.DataFrame(rows, columns=[
@@ -217,6 +308,9 @@ if __name__ == "__main__":
         "best_history",
         "avg_history",
         "worst_history",
+        "cache_hits",
+        "cache_misses",
+        "cache_evictions",
     ])
 
     csv_path = os.path.join(
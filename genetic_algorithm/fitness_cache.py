@@ -0,0 +1,49 @@
+from collections import OrderedDict
+
+from genetic import calculate_fitness
+
+class FitnessCache:
+    # memoizes a fitness function with the signature of calculate_fitness (chromosome, items,
+    # max_weight); chromosomes are keyed by their bytes, so the items and the capacity must not
+    # change while the cache is in use. At most maxsize entries are kept, the least recently
+    # used one is evicted first.
+    def __init__(self, maxsize, fitness_fn=calculate_fitness):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be greater than 0")
+        self.maxsize = maxsize
+        self.fitness_fn = fitness_fn
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __call__(self, chromosome, items, max_weight):
+        key = bytes(chromosome)
+        value = self.entries.get(key)
+        if value is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        value = self.fitness_fn(chromosome, items, max_weight)
+        self.entries[key] = value
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        return value
+
+    def __len__(self):
+        return len(self.entries)
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {
+            "cache_hits": self.hits,
+            "cache_misses": self.misses,
+            "cache_evictions": self.evictions,
+            "cache_hit_rate": self.hit_rate(),
+        }
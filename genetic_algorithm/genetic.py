@@ -1,4 +1,6 @@
 import random
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
 
 def generate_population(population_size, n_items):
     population = []
@@ -19,62 +21,55 @@ def calculate_fitness(chromosome, items, max_weight):
     else:
         return 0
 
+def cumulative_pick(cumulative, r):
+    # index of the interval of the cumulative sums that contains r; draws that reach the total
+    # through rounding fall into the last interval of non-zero width
+    return bisect_right(cumulative, r, 0, bisect_left(cumulative, cumulative[-1]))
+
 def roulette_selection(population, fitness_values, n_selected=1):
-    total_fitness = sum(fitness_values)
+    cumulative = list(accumulate(fitness_values))
 
     # if every chromosome in the generated population has 0 fitness function value
     # then every chromosome has equal 1/N probability to bo chosen
-    if total_fitness == 0:
-        probabilities = [1 / len(population)] * len(population)
-    else:
-        probabilities = [f / total_fitness for f in fitness_values]
-
-    # creates array of intervals from 0 to 1 for each chromosome represented in the roulette wheel
-    # f.e. 0.0 0.1, 0.1 0.4, 0.4 0.6 etc.
-    intervals = []
-    intervals_sum = 0
-    for p in probabilities:
-        intervals.append((intervals_sum, intervals_sum + p))
-        intervals_sum += p
+    if cumulative[-1] == 0:
+        cumulative = list(range(1, len(population) + 1))
 
-    #chooses random chromosome according to calculated probability
-    selected = []
-    for _ in range(n_selected):
-        r = random.random()
-        for idx, (low, high) in enumerate(intervals):
-            if low <= r < high:
-                selected.append(population[idx])
-                break
-        else:
-            # protection against missing selection due to numerical instability
-            selected.append(population[-3])
-
-    return selected
+    # chooses random chromosome according to calculated probability, binary search in the
+    # roulette wheel of cumulative fitness
+    total = cumulative[-1]
+    return [population[cumulative_pick(cumulative, random.random() * total)] for _ in range(n_selected)]
 
 def ranking_selection(population, fitness_values, n_selected=1):
-    indexed = list(zip(population, fitness_values))
-    indexed.sort(key=lambda x: x[1])
-
-    ranks = list(range(1, len(indexed) + 1))
-    total_rank = sum(ranks)
-
-    probabilities = [r / total_rank for r in ranks]
-    intervals = []
-    s = 0
-    for p in probabilities:
-        intervals.append((s, s + p))
-        s += p
+    order = sorted(range(len(population)), key=fitness_values.__getitem__)
+
+    # the worst chromosome has rank 1, the best rank N
+    cumulative = list(accumulate(range(1, len(order) + 1)))
+    total = cumulative[-1]
+    return [population[order[cumulative_pick(cumulative, random.random() * total)]] for _ in range(n_selected)]
+
+def stochastic_universal_sampling(population, fitness_values, n_selected=1):
+    # n_selected equally spaced pointers with one random offset on the roulette wheel, picked in
+    # a single pass; every chromosome is selected floor or ceil of its expected number of times
+    total = sum(fitness_values)
+    weights = fitness_values if total > 0 else [1] * len(population)
+    total = total if total > 0 else len(population)
+    step = total / n_selected
+    pointer = random.random() * step
 
     selected = []
-    for _ in range(n_selected):
-        r = random.random()
-        for idx, (low, high) in enumerate(intervals):
-            if low <= r < high:
-                selected.append(indexed[idx][0])
-                break
-        else:
-            selected.append(indexed[-1][0])
-
+    cumulative = 0
+    for chromosome, weight in zip(population, weights):
+        cumulative += weight
+        while pointer < cumulative and len(selected) < n_selected:
+            selected.append(chromosome)
+            pointer += step
+    # pointers lost to rounding at the end of the wheel
+    last = max(i for i, weight in enumerate(weights) if weight > 0)
+    selected += [population[last]] * (n_selected - len(selected))
+
+    # the pointers visit the population in order, shuffling avoids pairing copies of the same
+    # chromosome for crossover
+    random.shuffle(selected)
     return selected
 
 def tournament_selection(population, fitness_values, n_selected=1, tournament_size=4):
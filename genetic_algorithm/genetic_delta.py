@@ -0,0 +1,153 @@
+import math
+import random
+
+from utils import selection
+
+# Delta fitness evaluation for the list engine: every chromosome carries its (total weight,
+# total value), the operators update these totals from the genes they change instead of
+# rescanning the chromosome. The operators draw the same random numbers as the ones in
+# genetic.py, so a run with delta evaluation follows the same trajectory as a full one.
+# With integral weights and values the totals are kept as Python ints and stay exact; with
+# fractional ones every update adds a rounding error, so the totals are recomputed with
+# math.fsum every RESYNC_EVERY generations.
+RESYNC_EVERY = 50
+
+def delta_items(items):
+    # (weights, values, weight of all items, value of all items, exact), as ints when every
+    # weight and value is integral, plain floats otherwise
+    weights = items[:, 0].tolist()
+    values = items[:, 1].tolist()
+    exact = all(float(x).is_integer() for x in weights + values)
+    if exact:
+        weights = [int(x) for x in weights]
+        values = [int(x) for x in values]
+        return weights, values, sum(weights), sum(values), True
+    return weights, values, math.fsum(weights), math.fsum(values), False
+
+def chromosome_totals(chromosome, items):
+    # full O(n_items) pass, for the initial population and the periodic resync
+    weights, values, _, _, exact = items
+    add = sum if exact else math.fsum
+    chosen = [idx for idx, gene in enumerate(chromosome) if gene == 1]
+    return add(weights[idx] for idx in chosen), add(values[idx] for idx in chosen)
+
+def fitness_from_totals(totals, max_weight):
+    return [value if weight <= max_weight else 0 for weight, value in totals]
+
+def segment_delta(source, target, items, start, end):
+    # change of the totals of target after taking genes [start, end) from source
+    weights, values, _, _, _ = items
+    delta_weight = 0
+    delta_value = 0
+    for idx in range(start, end):
+        d = source[idx] - target[idx]
+        if d:
+            delta_weight += d * weights[idx]
+            delta_value += d * values[idx]
+    return delta_weight, delta_value
+
+def shifted(totals, delta, sign=1):
+    return totals[0] + sign * delta[0], totals[1] + sign * delta[1]
+
+def one_point_crossover_delta(parent1, parent2, totals1, totals2, items):
+    n = len(parent1)
+    pivot = random.randint(1, n - 1)
+    child1 = parent1[:pivot] + parent2[pivot:]
+    child2 = parent2[:pivot] + parent1[pivot:]
+    # the shorter side of the pivot: child1 is parent1 with the tail of parent2 or parent2
+    # with the head of parent1
+    if n - pivot <= pivot:
+        delta = segment_delta(parent2, parent1, items, pivot, n)
+        return child1, child2, shifted(totals1, delta), shifted(totals2, delta, -1)
+    delta = segment_delta(parent1, parent2, items, 0, pivot)
+    return child1, child2, shifted(totals2, delta), shifted(totals1, delta, -1)
+
+def two_point_crossover_delta(parent1, parent2, totals1, totals2, items):
+    n = len(parent1)
+    pivot1, pivot2 = sorted(random.sample(range(1, n), 2))
+    child1 = parent1[:pivot1] + parent2[pivot1:pivot2] + parent1[pivot2:]
+    child2 = parent2[:pivot1] + parent1[pivot1:pivot2] + parent2[pivot2:]
+    # the middle segment or the two outer ones, whichever is shorter
+    if 2 * (pivot2 - pivot1) <= n:
+        delta = segment_delta(parent2, parent1, items, pivot1, pivot2)
+        return child1, child2, shifted(totals1, delta), shifted(totals2, delta, -1)
+    head = segment_delta(parent1, parent2, items, 0, pivot1)
+    tail = segment_delta(parent1, parent2, items, pivot2, n)
+    delta = head[0] + tail[0], head[1] + tail[1]
+    return child1, child2, shifted(totals2, delta), shifted(totals1, delta, -1)
+
+def uniform_crossover_delta(parent1, parent2, totals1, totals2, items):
+    weights, values, _, _, _ = items
+    mask = [random.randint(0, 1) for _ in range(len(parent1))]
+    child1, child2 = parent1[:], parent2[:]
+    delta_weight = 0
+    delta_value = 0
+    for i in range(len(parent1)):
+        if mask[i] == 1:
+            child1[i] = parent2[i]
+            child2[i] = parent1[i]
+            d = parent2[i] - parent1[i]
+            if d:
+                delta_weight += d * weights[i]
+                delta_value += d * values[i]
+    delta = delta_weight, delta_value
+    return child1, child2, shifted(totals1, delta), shifted(totals2, delta, -1)
+
+def mutate_single_gene_delta(chromosome, totals, items):
+    weights, values, _, _, _ = items
+    idx = random.randrange(len(chromosome))
+    chromosome[idx] = 1 - chromosome[idx]
+    sign = 1 if chromosome[idx] == 1 else -1
+    return chromosome, (totals[0] + sign * weights[idx], totals[1] + sign * values[idx])
+
+def chromosome_all_gene_inversion_delta(chromosome, totals, items):
+    _, _, total_weight, total_value, _ = items
+    for idx in range(len(chromosome)):
+        chromosome[idx] = 1 - chromosome[idx]
+    return chromosome, (total_weight - totals[0], total_value - totals[1])
+
+def crossover_delta(parent1, parent2, totals1, totals2, items, method):
+    if method == 'one_point':
+        return one_point_crossover_delta(parent1, parent2, totals1, totals2, items)
+    elif method == 'two_point':
+        return two_point_crossover_delta(parent1, parent2, totals1, totals2, items)
+    elif method == 'uniform':
+        return uniform_crossover_delta(parent1, parent2, totals1, totals2, items)
+    else:
+        raise ValueError('Method must be one of "one_point", "two_point", "uniform"')
+
+def mutate_delta(chromosome, totals, items, method):
+    if method == 'single_bit_flip':
+        return mutate_single_gene_delta(chromosome, totals, items)
+    elif method == 'all_bit_inversion':
+        return chromosome_all_gene_inversion_delta(chromosome, totals, items)
+    else:
+        raise ValueError('Method must be one of "single_bit_flip", "all_bit_inversion"')
+
+def evolve_delta(population, totals, fitness_values, items, max_weight, args, generation=0):
+    # one generation of the list engine; selection picks indices, so the totals follow
+    # their chromosomes
+    parents = selection(list(range(len(population))), fitness_values, args.selection_method)
+    children = []
+    children_totals = []
+    for i in range(0, len(parents), 2):
+        a = parents[i]
+        b = parents[(i + 1) % len(parents)]
+
+        if random.random() < args.Pc:
+            child1, child2, totals1, totals2 = crossover_delta(
+                population[a], population[b], totals[a], totals[b], items, args.crossover_method
+            )
+        else:
+            child1, child2, totals1, totals2 = population[a][:], population[b][:], totals[a], totals[b]
+
+        children += [child1, child2]
+        children_totals += [totals1, totals2]
+
+    for i in range(len(children)):
+        if random.random() < args.Pm:
+            children[i], children_totals[i] = mutate_delta(children[i], children_totals[i], items, args.mutation_method)
+
+    if not items[4] and (generation + 1) % RESYNC_EVERY == 0:
+        children_totals = [chromosome_totals(chromosome, items) for chromosome in children]
+    return children, children_totals, fitness_from_totals(children_totals, max_weight)
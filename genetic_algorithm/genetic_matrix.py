@@ -0,0 +1,112 @@
+import numpy as np
+
+# Population engine working on the whole generation at once: the population is an (N, n_items)
+# uint8 matrix, fitness is one matrix-vector product and the operators are mask operations.
+
+def generate_population_matrix(population_size, n_items, rng):
+    return rng.integers(0, 2, size=(population_size, n_items), dtype=np.uint8)
+
+def fitness_matrix(population, items, max_weight):
+    weights = population @ items[:, 0]
+    values = population @ items[:, 1]
+    return np.where(weights <= max_weight, values, 0)
+
+def cumulative_picks(cumulative, r):
+    # like genetic.cumulative_pick for a whole array of draws
+    last = np.searchsorted(cumulative, cumulative[-1], side="left")
+    return np.minimum(np.searchsorted(cumulative, r, side="right"), last)
+
+def roulette_indices(fitness_values, n_selected, rng):
+    total = fitness_values.sum()
+    # every chromosome with 0 fitness -> equal 1/N probability
+    if total == 0:
+        return rng.integers(0, len(fitness_values), n_selected)
+    cumulative = np.cumsum(fitness_values)
+    return cumulative_picks(cumulative, rng.random(n_selected) * cumulative[-1])
+
+def ranking_indices(fitness_values, n_selected, rng):
+    order = np.argsort(fitness_values, kind="stable")
+    # the worst chromosome has rank 1, the best rank N
+    cumulative = np.cumsum(np.arange(1, len(order) + 1))
+    return order[cumulative_picks(cumulative, rng.random(n_selected) * cumulative[-1])]
+
+def sus_indices(fitness_values, n_selected, rng):
+    # stochastic universal sampling: equally spaced pointers with one random offset, shuffled so
+    # that copies of a chromosome are not paired with each other
+    cumulative = np.cumsum(fitness_values) if fitness_values.sum() > 0 else np.arange(1, len(fitness_values) + 1)
+    pointers = (rng.random() + np.arange(n_selected)) * (cumulative[-1] / n_selected)
+    return rng.permutation(cumulative_picks(cumulative, pointers))
+
+def tournament_indices(fitness_values, n_selected, tournament_size, rng):
+    # participants of a tournament are distinct, as with random.sample in the list engine: the
+    # tournament_size smallest of N random keys per row are a uniform sample without replacement
+    tournament_size = min(tournament_size, len(fitness_values))
+    keys = rng.random((n_selected, len(fitness_values)))
+    participants = np.argpartition(keys, tournament_size - 1, axis=1)[:, :tournament_size]
+    best = np.argmax(fitness_values[participants], axis=1)
+    return participants[np.arange(n_selected), best]
+
+def selection_matrix(population, fitness_values, method, tournament_size, rng):
+    n = len(population)
+    if method == "roulette":
+        idx = roulette_indices(fitness_values, n, rng)
+    elif method == "ranking":
+        idx = ranking_indices(fitness_values, n, rng)
+    elif method == "tournament":
+        idx = tournament_indices(fitness_values, n, tournament_size, rng)
+    elif method == "sus":
+        idx = sus_indices(fitness_values, n, rng)
+    else:
+        raise ValueError('Method must be one of "roulette", "ranking", "tournament", "sus"')
+    return population[idx]
+
+def crossover_masks(n_pairs, n_items, method, rng):
+    # True where the first child takes the gene of the second parent
+    genes = np.arange(n_items)
+    if method == "one_point":
+        pivot = rng.integers(1, n_items, n_pairs)
+        return genes >= pivot[:, None]
+    elif method == "two_point":
+        first = rng.integers(1, n_items, n_pairs)
+        second = rng.integers(1, n_items - 1, n_pairs)
+        # two different pivots from 1..n_items-1
+        second += second >= first
+        low, high = np.minimum(first, second), np.maximum(first, second)
+        return (genes >= low[:, None]) & (genes < high[:, None])
+    elif method == "uniform":
+        return rng.integers(0, 2, size=(n_pairs, n_items), dtype=np.uint8).astype(bool)
+    else:
+        raise ValueError('Method must be one of "one_point", "two_point", "uniform"')
+
+def crossover_matrix(parents, Pc, method, rng):
+    # parents are paired like in main.py: (0, 1), (2, 3), ..., with an odd last one paired
+    # with the first; a pair that does not cross over is copied
+    first = np.arange(0, len(parents), 2)
+    second = (first + 1) % len(parents)
+    p1, p2 = parents[first], parents[second]
+
+    mask = crossover_masks(len(first), parents.shape[1], method, rng)
+    mask &= (rng.random(len(first)) < Pc)[:, None]
+
+    children = np.empty((2 * len(first), parents.shape[1]), dtype=parents.dtype)
+    children[0::2] = np.where(mask, p2, p1)
+    children[1::2] = np.where(mask, p1, p2)
+    return children
+
+def mutate_matrix(children, Pm, method, rng):
+    mutated = rng.random(len(children)) < Pm
+    if method == "single_bit_flip":
+        rows = np.flatnonzero(mutated)
+        children[rows, rng.integers(0, children.shape[1], len(rows))] ^= 1
+    elif method == "all_bit_inversion":
+        children[mutated] ^= 1
+    else:
+        raise ValueError('Method must be one of "single_bit_flip", "all_bit_inversion"')
+    return children
+
+def evolve_matrix(population, fitness_values, items, max_weight, args, tournament_size, rng):
+    # one generation: selection, crossover, mutation and the fitness of the children
+    parents = selection_matrix(population, fitness_values, args.selection_method, tournament_size, rng)
+    children = crossover_matrix(parents, args.Pc, args.crossover_method, rng)
+    children = mutate_matrix(children, args.Pm, args.mutation_method, rng)
+    return children, fitness_matrix(children, items, max_weight)
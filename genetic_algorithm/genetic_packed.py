@@ -0,0 +1,105 @@
+import numpy as np
+
+from genetic_matrix import selection_matrix
+
+# Bit-packed population: every chromosome is a row of ceil(n_items / 8) uint8 bytes, gene i is
+# bit 7 - i % 8 of byte i // 8 (np.packbits order); the padding bits of the last byte stay 0.
+# Crossover and mutation are bitwise masks, fitness comes from per-byte lookup tables.
+
+# rows of the (N, n_bytes) gather evaluated at once, bounds the temporary memory of fitness
+FITNESS_CHUNK = 1 << 20
+
+def padding_mask(n_items):
+    # valid bits of the last byte
+    used = n_items % 8 or 8
+    return np.uint8((0xFF << (8 - used)) & 0xFF)
+
+def pack_items(items):
+    # (weight table, value table, n_items); table[b, x] = sum over the items of byte b whose bit
+    # is set in x
+    n_items = len(items)
+    n_bytes = (n_items + 7) // 8
+    padded = np.zeros((n_bytes * 8, 2))
+    padded[:n_items] = items[:, :2]
+    bits = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).astype(np.float64)
+    weight_table = padded[:, 0].reshape(n_bytes, 8) @ bits.T
+    value_table = padded[:, 1].reshape(n_bytes, 8) @ bits.T
+    return weight_table, value_table, n_items
+
+def generate_population_packed(population_size, n_items, rng):
+    population = rng.integers(0, 256, size=(population_size, (n_items + 7) // 8), dtype=np.uint8)
+    population[:, -1] &= padding_mask(n_items)
+    return population
+
+def unpack_chromosome(chromosome, n_items):
+    return np.unpackbits(chromosome)[:n_items].tolist()
+
+def fitness_packed(population, packed_items, max_weight):
+    weight_table, value_table, _ = packed_items
+    n_bytes = population.shape[1]
+    byte_idx = np.arange(n_bytes)
+    weights = np.empty(len(population))
+    values = np.empty(len(population))
+    step = max(1, FITNESS_CHUNK // n_bytes)
+    for lo in range(0, len(population), step):
+        rows = population[lo:lo + step]
+        weights[lo:lo + step] = weight_table[byte_idx, rows].sum(axis=1)
+        values[lo:lo + step] = value_table[byte_idx, rows].sum(axis=1)
+    return np.where(weights <= max_weight, values, 0)
+
+def tail_masks(pivots, n_bytes):
+    # bytes with every gene from the pivot onwards set
+    byte_idx = np.arange(n_bytes)
+    pivot_byte = (pivots // 8)[:, None]
+    partial = (0xFF >> (pivots % 8)).astype(np.uint8)[:, None]
+    return np.where(byte_idx > pivot_byte, np.uint8(0xFF), np.where(byte_idx == pivot_byte, partial, np.uint8(0)))
+
+def crossover_masks_packed(n_pairs, n_items, method, rng):
+    # bits set where the first child takes the gene of the second parent
+    n_bytes = (n_items + 7) // 8
+    if method == "one_point":
+        return tail_masks(rng.integers(1, n_items, n_pairs), n_bytes)
+    elif method == "two_point":
+        first = rng.integers(1, n_items, n_pairs)
+        second = rng.integers(1, n_items - 1, n_pairs)
+        second += second >= first
+        low, high = np.minimum(first, second), np.maximum(first, second)
+        return tail_masks(low, n_bytes) & ~tail_masks(high, n_bytes)
+    elif method == "uniform":
+        return rng.integers(0, 256, size=(n_pairs, n_bytes), dtype=np.uint8)
+    else:
+        raise ValueError('Method must be one of "one_point", "two_point", "uniform"')
+
+def crossover_packed(parents, n_items, Pc, method, rng):
+    # same pairing as crossover_matrix
+    first = np.arange(0, len(parents), 2)
+    second = (first + 1) % len(parents)
+    p1, p2 = parents[first], parents[second]
+
+    mask = crossover_masks_packed(len(first), n_items, method, rng)
+    mask[rng.random(len(first)) >= Pc] = 0
+
+    children = np.empty((2 * len(first), parents.shape[1]), dtype=np.uint8)
+    children[0::2] = (p1 & ~mask) | (p2 & mask)
+    children[1::2] = (p2 & ~mask) | (p1 & mask)
+    return children
+
+def mutate_packed(children, n_items, Pm, method, rng):
+    mutated = rng.random(len(children)) < Pm
+    if method == "single_bit_flip":
+        rows = np.flatnonzero(mutated)
+        genes = rng.integers(0, n_items, len(rows))
+        children[rows, genes // 8] ^= (0x80 >> (genes % 8)).astype(np.uint8)
+    elif method == "all_bit_inversion":
+        children[mutated] ^= np.uint8(0xFF)
+        children[mutated, -1] &= padding_mask(n_items)
+    else:
+        raise ValueError('Method must be one of "single_bit_flip", "all_bit_inversion"')
+    return children
+
+def evolve_packed(population, fitness_values, packed_items, max_weight, args, tournament_size, rng):
+    n_items = packed_items[2]
+    parents = selection_matrix(population, fitness_values, args.selection_method, tournament_size, rng)
+    children = crossover_packed(parents, n_items, args.Pc, args.crossover_method, rng)
+    children = mutate_packed(children, n_items, args.Pm, args.mutation_method, rng)
+    return children, fitness_packed(children, packed_items, max_weight)
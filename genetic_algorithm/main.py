@@ -1,11 +1,17 @@
 import random
 
+import numpy as np
 import pandas as pd
 
 from agrs_parse import parse_arguments
 from genetic import generate_population
+from genetic_delta import delta_items, chromosome_totals, fitness_from_totals, evolve_delta
+from genetic_matrix import generate_population_matrix, fitness_matrix, evolve_matrix
+from genetic_packed import (
+    pack_items, generate_population_packed, fitness_packed, evolve_packed, unpack_chromosome
+)
 from utils import (
-    clear_number, fitness, selection, crossover, mutate
+    clear_number, fitness, fitness_function, selection, crossover, mutate, auto_tournament_size
 )
 
 MAX_WEIGHT = 6_404_180
@@ -18,36 +24,81 @@ if __name__ == "__main__":
     items['Wartość (zł)'] = items['Wartość (zł)'].apply(clear_number)
     items_array = items[['Waga (kg)', 'Wartość (zł)']].to_numpy()
 
-    population = generate_population(args.N, len(items_array))
-    fitness_values = fitness(population, items_array, MAX_WEIGHT)
+    if args.engine == "numpy":
+        rng = np.random.default_rng()
+        population = generate_population_matrix(args.N, len(items_array), rng)
+        fitness_values = fitness_matrix(population, items_array, MAX_WEIGHT)
+        tournament_size = auto_tournament_size(args.N)
+
+        for _ in range(args.T):
+            population, fitness_values = evolve_matrix(
+                population, fitness_values, items_array, MAX_WEIGHT, args, tournament_size, rng
+            )
+
+        best_idx = int(np.argmax(fitness_values))
+        best_solution = population[best_idx].tolist()
+        best_value = fitness_values[best_idx]
+    elif args.engine == "packed":
+        rng = np.random.default_rng()
+        packed_items = pack_items(items_array)
+        population = generate_population_packed(args.N, len(items_array), rng)
+        fitness_values = fitness_packed(population, packed_items, MAX_WEIGHT)
+        tournament_size = auto_tournament_size(args.N)
+
+        for _ in range(args.T):
+            population, fitness_values = evolve_packed(
+                population, fitness_values, packed_items, MAX_WEIGHT, args, tournament_size, rng
+            )
+
+        best_idx = int(np.argmax(fitness_values))
+        best_solution = unpack_chromosome(population[best_idx], len(items_array))
+        best_value = fitness_values[best_idx]
+    elif args.delta_fitness:
+        items = delta_items(items_array)
+        population = generate_population(args.N, len(items_array))
+        totals = [chromosome_totals(chromosome, items) for chromosome in population]
+        fitness_values = fitness_from_totals(totals, MAX_WEIGHT)
+
+        for generation in range(args.T):
+            population, totals, fitness_values = evolve_delta(
+                population, totals, fitness_values, items, MAX_WEIGHT, args, generation
+            )
+
+        best_idx = max(range(len(population)), key=fitness_values.__getitem__)
+        best_solution = population[best_idx]
+        best_value = fitness_values[best_idx]
+    else:
+        fitness_fn = fitness_function(args.fitness_cache)
+        population = generate_population(args.N, len(items_array))
+        fitness_values = fitness(population, items_array, MAX_WEIGHT, fitness_fn)
 
-    for _ in range(args.T):
-        parents = selection(population, fitness_values, args.selection_method)
-        children = []
-        for i in range(0, len(parents), 2):
-            parent1 = parents[i]
-            # if there is odd number of specimens in the population, last specimen will reproduce with the first one
-            # list wrapping
-            parent2 = parents[(i + 1) % len(parents)]
+        for _ in range(args.T):
+            parents = selection(population, fitness_values, args.selection_method)
+            children = []
+            for i in range(0, len(parents), 2):
+                parent1 = parents[i]
+                # if there is odd number of specimens in the population, last specimen will reproduce with the first one
+                # list wrapping
+                parent2 = parents[(i + 1) % len(parents)]
 
-            if random.random() < args.Pc:
-                child1, child2 = crossover(parent1, parent2, args.crossover_method)
-            else:
-                child1, child2 = parent1[:], parent2[:]
+                if random.random() < args.Pc:
+                    child1, child2 = crossover(parent1, parent2, args.crossover_method)
+                else:
+                    child1, child2 = parent1[:], parent2[:]
 
-            children.append(child1)
-            children.append(child2)
+                children.append(child1)
+                children.append(child2)
 
-        for i in range(len(children)):
-            if random.random() < args.Pm:
-                children[i] = mutate(children[i], args.mutation_method)
+            for i in range(len(children)):
+                if random.random() < args.Pm:
+                    children[i] = mutate(children[i], args.mutation_method)
 
-        population = children
-        fitness_values = fitness(population, items_array, MAX_WEIGHT)
+            population = children
+            fitness_values = fitness(population, items_array, MAX_WEIGHT, fitness_fn)
 
-    best_idx = max(range(len(population)), key=fitness_values.__getitem__)
-    best_solution = population[best_idx]
-    best_value = fitness_values[best_idx]
+        best_idx = max(range(len(population)), key=fitness_values.__getitem__)
+        best_solution = population[best_idx]
+        best_value = fitness_values[best_idx]
 
     print("Najlepsza wartość plecaka:", best_value)
     print("Najlepszy chromosom:", best_solution)
\ No newline at end of file
@@ -0,0 +1,98 @@
+import random
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from genetic import generate_population
+from genetic_delta import RESYNC_EVERY, chromosome_totals, delta_items, evolve_delta, fitness_from_totals
+from utils import crossover, fitness, mutate, selection
+
+N_ITEMS = 40
+
+
+def knapsack(integral):
+    rng = np.random.default_rng(0)
+    items = rng.integers(1, 10_000, size=(N_ITEMS, 2)).astype(float)
+    if not integral:
+        items += rng.random((N_ITEMS, 2))
+    return items, items[:, 0].sum() / 2
+
+
+def full_generation(population, fitness_values, items, max_weight, args):
+    # the loop of main.py with full evaluation
+    parents = selection(population, fitness_values, args.selection_method)
+    children = []
+    for i in range(0, len(parents), 2):
+        parent1, parent2 = parents[i], parents[(i + 1) % len(parents)]
+        if random.random() < args.Pc:
+            child1, child2 = crossover(parent1, parent2, args.crossover_method)
+        else:
+            child1, child2 = parent1[:], parent2[:]
+        children += [child1, child2]
+    for i in range(len(children)):
+        if random.random() < args.Pm:
+            children[i] = mutate(children[i], args.mutation_method)
+    return children, fitness(children, items, max_weight)
+
+
+@pytest.mark.parametrize("selection_method", ["roulette", "ranking", "tournament", "sus"])
+@pytest.mark.parametrize("crossover_method", ["one_point", "two_point", "uniform"])
+@pytest.mark.parametrize("mutation_method", ["single_bit_flip", "all_bit_inversion"])
+def test_delta_run_follows_the_full_run(selection_method, crossover_method, mutation_method):
+    items_array, max_weight = knapsack(integral=True)
+    args = SimpleNamespace(selection_method=selection_method, crossover_method=crossover_method,
+                           mutation_method=mutation_method, Pc=0.8, Pm=0.3)
+
+    random.seed(5)
+    population = generate_population(21, N_ITEMS)
+    fitness_values = fitness(population, items_array, max_weight)
+    full = [fitness_values]
+    for _ in range(30):
+        population, fitness_values = full_generation(population, fitness_values, items_array, max_weight, args)
+        full.append(fitness_values)
+    full_population = population
+
+    random.seed(5)
+    items = delta_items(items_array)
+    population = generate_population(21, N_ITEMS)
+    totals = [chromosome_totals(chromosome, items) for chromosome in population]
+    fitness_values = fitness_from_totals(totals, max_weight)
+    delta = [fitness_values]
+    for generation in range(30):
+        population, totals, fitness_values = evolve_delta(
+            population, totals, fitness_values, items, max_weight, args, generation
+        )
+        delta.append(fitness_values)
+        # integral totals never drift
+        assert totals == [chromosome_totals(chromosome, items) for chromosome in population]
+
+    assert delta == full
+    assert population == full_population
+
+
+def test_fractional_totals_are_resynced():
+    items_array, max_weight = knapsack(integral=False)
+    items = delta_items(items_array)
+    assert not items[4]
+    args = SimpleNamespace(selection_method="roulette", crossover_method="uniform",
+                           mutation_method="all_bit_inversion", Pc=1.0, Pm=0.5)
+
+    random.seed(3)
+    population = generate_population(20, N_ITEMS)
+    totals = [chromosome_totals(chromosome, items) for chromosome in population]
+    fitness_values = fitness_from_totals(totals, max_weight)
+    drifted = False
+    for generation in range(2 * RESYNC_EVERY):
+        population, totals, fitness_values = evolve_delta(
+            population, totals, fitness_values, items, max_weight, args, generation
+        )
+        exact = [chromosome_totals(chromosome, items) for chromosome in population]
+        if (generation + 1) % RESYNC_EVERY == 0:
+            assert totals == exact
+        else:
+            drifted |= totals != exact
+            assert np.allclose(totals, exact, rtol=1e-12)
+        assert fitness_values == fitness_from_totals(totals, max_weight)
+    # the updates do round, otherwise the resync would not be needed
+    assert drifted
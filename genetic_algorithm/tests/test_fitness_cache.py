@@ -0,0 +1,56 @@
+import pytest
+
+from agrs_parse import parse_arguments
+from fitness_cache import FitnessCache
+from utils import fitness, fitness_function
+
+
+class CountingFitness:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, chromosome, items, max_weight):
+        self.calls.append(tuple(chromosome))
+        # 0 for overweight chromosomes is a value like any other
+        return 0 if sum(chromosome) > max_weight else sum(chromosome)
+
+
+def test_hits_and_misses_are_counted():
+    fn = CountingFitness()
+    cache = FitnessCache(10, fn)
+    population = [[1, 0, 1], [0, 0, 0], [1, 0, 1], [1, 1, 1], [0, 0, 0]]
+
+    assert fitness(population, None, 2, cache) == [2, 0, 2, 0, 0]
+    assert fn.calls == [(1, 0, 1), (0, 0, 0), (1, 1, 1)]
+    assert cache.stats() == {"cache_hits": 2, "cache_misses": 3, "cache_evictions": 0, "cache_hit_rate": 0.4}
+    assert len(cache) == 3
+
+
+def test_the_least_recently_used_chromosome_is_evicted_first():
+    fn = CountingFitness()
+    cache = FitnessCache(2, fn)
+    a, b, c = [1, 0], [0, 1], [1, 1]
+
+    cache(a, None, 5)
+    cache(b, None, 5)
+    # a is used again, so b is now the least recently used one
+    cache(a, None, 5)
+    cache(c, None, 5)
+    assert cache.evictions == 1
+    assert list(cache.entries) == [bytes(a), bytes(c)]
+
+    cache(a, None, 5)
+    cache(b, None, 5)
+    assert fn.calls == [(1, 0), (0, 1), (1, 1), (0, 1)]
+    assert (cache.hits, cache.misses, cache.evictions) == (2, 4, 2)
+    assert list(cache.entries) == [bytes(a), bytes(b)]
+
+
+def test_the_cache_is_opt_in(monkeypatch):
+    monkeypatch.setattr("sys.argv", ["main.py"])
+    assert parse_arguments().fitness_cache == 0
+    fn = CountingFitness()
+    assert fitness_function(0, fn) is fn
+    assert isinstance(fitness_function(5, fn), FitnessCache)
+    with pytest.raises(ValueError):
+        FitnessCache(0, fn)
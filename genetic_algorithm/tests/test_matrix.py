@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from genetic import calculate_fitness
+from genetic_matrix import fitness_matrix, generate_population_matrix, tournament_indices
+
+
+@pytest.mark.parametrize("integral", [True, False])
+def test_fitness_matches_the_list_engine(integral):
+    rng = np.random.default_rng(0)
+    items = rng.integers(1, 1000, size=(40, 2)).astype(float)
+    if not integral:
+        items += rng.random((40, 2))
+    max_weight = items[:, 0].sum() / 2
+    population = generate_population_matrix(200, 40, rng)
+
+    expected = [calculate_fitness(list(row), items.tolist(), max_weight) for row in population]
+    assert np.allclose(fitness_matrix(population, items, max_weight), expected, rtol=1e-12)
+    # both feasible and overweight chromosomes are covered
+    assert 0 < np.count_nonzero(expected) < len(expected)
+
+
+def test_a_tournament_of_the_whole_population_picks_the_best():
+    rng = np.random.default_rng(1)
+    fitness_values = rng.permutation(30).astype(float)
+    # with replacement some tournaments would miss the best chromosome
+    assert np.all(tournament_indices(fitness_values, 500, 30, rng) == np.argmax(fitness_values))
+
+
+def test_tournament_participants_are_distinct():
+    rng = np.random.default_rng(2)
+    # pairs of distinct participants: the worst chromosome never wins, the middle one wins
+    # only against it (1/3 of the pairs)
+    picks = tournament_indices(np.array([0.0, 1.0, 2.0]), 30_000, 2, rng)
+    counts = np.bincount(picks, minlength=3) / len(picks)
+
+    assert counts[0] == 0.0
+    assert counts[1] == pytest.approx(1 / 3, abs=0.01)
+    assert counts[2] == pytest.approx(2 / 3, abs=0.01)
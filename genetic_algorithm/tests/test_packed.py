@@ -0,0 +1,96 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from genetic import calculate_fitness
+from genetic_matrix import crossover_matrix, fitness_matrix
+from genetic_packed import (
+    crossover_packed, evolve_packed, fitness_packed, generate_population_packed, mutate_packed, pack_items,
+    padding_mask, unpack_chromosome
+)
+
+# lengths below, at and across byte boundaries (two-point crossover needs at least 3 genes)
+LENGTHS = [3, 7, 8, 9, 13, 64, 101]
+
+
+def unpack(population, n_items):
+    return np.unpackbits(population, axis=1)[:, :n_items]
+
+
+def padding_is_clear(population, n_items):
+    return not np.any(population[:, -1] & ~padding_mask(n_items))
+
+
+@pytest.mark.parametrize("n_items", LENGTHS)
+def test_packed_fitness_matches_the_unpacked_engines(n_items):
+    rng = np.random.default_rng(n_items)
+    items = rng.integers(1, 1000, size=(n_items, 2)) + rng.random((n_items, 2))
+    max_weight = items[:, 0].sum() / 2
+    population = generate_population_packed(300, n_items, rng)
+    assert padding_is_clear(population, n_items)
+
+    packed = fitness_packed(population, pack_items(items), max_weight)
+    assert np.allclose(packed, fitness_matrix(unpack(population, n_items), items, max_weight), rtol=1e-12)
+    expected = [calculate_fitness(unpack_chromosome(row, n_items), items.tolist(), max_weight) for row in population]
+    assert np.allclose(packed, expected, rtol=1e-12)
+
+
+@pytest.mark.parametrize("method", ["one_point", "two_point"])
+@pytest.mark.parametrize("n_items", LENGTHS)
+def test_point_crossover_matches_the_unpacked_engine(method, n_items):
+    parents = generate_population_packed(51, n_items, np.random.default_rng(0))
+    # same draws in the same order: the children must be the same
+    children = crossover_packed(parents, n_items, 0.7, method, np.random.default_rng(1))
+    expected = crossover_matrix(unpack(parents, n_items), 0.7, method, np.random.default_rng(1))
+
+    assert children.shape == (52, parents.shape[1])
+    assert padding_is_clear(children, n_items)
+    assert np.array_equal(unpack(children, n_items), expected)
+
+
+@pytest.mark.parametrize("n_items", LENGTHS)
+def test_uniform_crossover_only_swaps_genes(n_items):
+    parents = generate_population_packed(50, n_items, np.random.default_rng(0))
+    children = crossover_packed(parents, n_items, 1.0, "uniform", np.random.default_rng(1))
+    p1, p2 = parents[0::2], parents[1::2]
+    c1, c2 = children[0::2], children[1::2]
+
+    assert children.shape == parents.shape
+    assert padding_is_clear(children, n_items)
+    # every gene comes from one parent and the other child gets the other one
+    assert np.array_equal(c1 & c2, p1 & p2)
+    assert np.array_equal(c1 | c2, p1 | p2)
+
+
+@pytest.mark.parametrize("n_items", LENGTHS)
+def test_mutation_keeps_the_length_and_the_padding(n_items):
+    rng = np.random.default_rng(n_items)
+    population = generate_population_packed(40, n_items, rng)
+
+    flipped = mutate_packed(population.copy(), n_items, 1.0, "single_bit_flip", rng)
+    assert flipped.shape == population.shape
+    assert padding_is_clear(flipped, n_items)
+    # exactly one gene of every chromosome changed
+    assert np.all((unpack(flipped, n_items) != unpack(population, n_items)).sum(axis=1) == 1)
+
+    inverted = mutate_packed(population.copy(), n_items, 1.0, "all_bit_inversion", rng)
+    assert padding_is_clear(inverted, n_items)
+    assert np.array_equal(unpack(inverted, n_items), 1 - unpack(population, n_items))
+
+
+@pytest.mark.parametrize("n_items", [13, 101])
+def test_a_generation_keeps_the_population_shape(n_items):
+    rng = np.random.default_rng(0)
+    items = rng.integers(1, 1000, size=(n_items, 2)).astype(float)
+    packed_items = pack_items(items)
+    max_weight = items[:, 0].sum() / 2
+    population = generate_population_packed(30, n_items, rng)
+    fitness_values = fitness_packed(population, packed_items, max_weight)
+    args = SimpleNamespace(selection_method="tournament", crossover_method="two_point",
+                           mutation_method="all_bit_inversion", Pc=0.8, Pm=0.5)
+
+    for _ in range(10):
+        population, fitness_values = evolve_packed(population, fitness_values, packed_items, max_weight, args, 3, rng)
+        assert population.shape == (30, (n_items + 7) // 8)
+        assert padding_is_clear(population, n_items)
@@ -0,0 +1,74 @@
+import random
+
+import numpy as np
+import pytest
+
+from genetic import cumulative_pick, roulette_selection, stochastic_universal_sampling
+from genetic_matrix import roulette_indices, sus_indices
+
+FITNESS = [0, 5, 1, 3, 0, 11]
+
+
+def shares(picks, n):
+    return np.bincount(picks, minlength=n) / len(picks)
+
+
+def test_cumulative_pick_finds_the_interval():
+    cumulative = [2, 2, 5, 9, 9]
+    assert [cumulative_pick(cumulative, r) for r in (0.0, 1.9, 2.0, 4.99, 5.0, 8.5)] == [0, 0, 2, 2, 3, 3]
+    # a draw that reaches the total through rounding falls into the last non-empty interval
+    assert cumulative_pick(cumulative, 9.0) == 3
+
+
+def test_roulette_is_proportional_to_fitness():
+    random.seed(0)
+    picks = roulette_selection(list(range(6)), FITNESS, 60_000)
+    assert shares(picks, 6) == pytest.approx(np.array(FITNESS) / 20, abs=0.01)
+
+    picks = roulette_indices(np.array(FITNESS), 60_000, np.random.default_rng(0))
+    assert shares(picks, 6) == pytest.approx(np.array(FITNESS) / 20, abs=0.01)
+
+
+def test_sus_is_proportional_to_fitness():
+    random.seed(1)
+    picks = [i for _ in range(3000) for i in stochastic_universal_sampling(list(range(6)), FITNESS, 6)]
+    assert shares(picks, 6) == pytest.approx(np.array(FITNESS) / 20, abs=0.01)
+
+    rng = np.random.default_rng(1)
+    picks = np.concatenate([sus_indices(np.array(FITNESS), 6, rng) for _ in range(3000)])
+    assert shares(picks, 6) == pytest.approx(np.array(FITNESS) / 20, abs=0.01)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_sus_with_as_many_pointers_as_chromosomes_gives_floor_or_ceil_copies(seed):
+    random.seed(seed)
+    expected = np.array(FITNESS) / 20 * 6
+    counts = np.bincount(stochastic_universal_sampling(list(range(6)), FITNESS, 6), minlength=6)
+    assert counts.sum() == 6
+    assert np.all((counts == np.floor(expected)) | (counts == np.ceil(expected)))
+
+    counts = np.bincount(sus_indices(np.array(FITNESS), 6, np.random.default_rng(seed)), minlength=6)
+    assert np.all((counts == np.floor(expected)) | (counts == np.ceil(expected)))
+
+
+def test_zero_fitness_everywhere_selects_uniformly():
+    random.seed(2)
+    zeros = [0] * 5
+    assert shares(roulette_selection(list(range(5)), zeros, 50_000), 5) == pytest.approx(np.full(5, 0.2), abs=0.01)
+    # every chromosome gets exactly one of the five pointers
+    assert sorted(stochastic_universal_sampling(list(range(5)), zeros, 5)) == [0, 1, 2, 3, 4]
+
+    rng = np.random.default_rng(2)
+    assert shares(roulette_indices(np.zeros(5), 50_000, rng), 5) == pytest.approx(np.full(5, 0.2), abs=0.01)
+    assert sorted(sus_indices(np.zeros(5), 5, rng)) == [0, 1, 2, 3, 4]
+
+
+@pytest.mark.parametrize("fitness_value", [0, 7])
+def test_a_single_chromosome_is_always_selected(fitness_value):
+    random.seed(3)
+    assert roulette_selection(["x"], [fitness_value], 4) == ["x"] * 4
+    assert stochastic_universal_sampling(["x"], [fitness_value], 4) == ["x"] * 4
+
+    rng = np.random.default_rng(3)
+    assert roulette_indices(np.array([fitness_value]), 4, rng).tolist() == [0] * 4
+    assert sus_indices(np.array([fitness_value]), 4, rng).tolist() == [0] * 4
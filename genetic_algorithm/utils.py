@@ -3,8 +3,10 @@ import math
 from genetic import (
     one_point_crossover, two_point_crossover, uniform_crossover,
     mutate_single_gene, chromosome_all_gene_inversion, roulette_selection, ranking_selection, tournament_selection,
+    stochastic_universal_sampling,
     calculate_fitness
 )
+from fitness_cache import FitnessCache
 
 def clear_number(text):
     return float(str(text).replace(" ", ""))
@@ -12,13 +14,20 @@ def clear_number(text):
 def auto_tournament_size(population_size):
     return max(2, int(math.log2(population_size)))
 
-def fitness(population, items, max_weight):
+def fitness(population, items, max_weight, fitness_fn=calculate_fitness):
+    # fitness_fn: any function with the signature of calculate_fitness, f.e. a FitnessCache
     fitness_values = [
-        calculate_fitness(chromosome, items, max_weight)
+        fitness_fn(chromosome, items, max_weight)
         for chromosome in population
     ]
     return fitness_values
 
+def fitness_function(cache_size, fitness_fn=calculate_fitness):
+    # fitness_fn memoized in an LRU cache of cache_size chromosomes, 0 disables the cache
+    if cache_size > 0:
+        return FitnessCache(cache_size, fitness_fn)
+    return fitness_fn
+
 def selection(population, fitness_values, method):
     population_size = len(population)
 
@@ -29,8 +38,10 @@ def selection(population, fitness_values, method):
     elif method == "tournament":
         ts = auto_tournament_size(population_size)
         return tournament_selection(population, fitness_values, population_size, ts)
+    elif method == "sus":
+        return stochastic_universal_sampling(population, fitness_values, population_size)
     else:
-        raise ValueError('Method must be one of "roulette", "ranking", "tournament"')
+        raise ValueError('Method must be one of "roulette", "ranking", "tournament", "sus"')
 
 def crossover(parent1, parent2, method):
     if method == 'one_point':